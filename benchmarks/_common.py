@@ -0,0 +1,18 @@
+"""Timing helper shared by the benchmark scripts.
+
+The scripts are run from the repository root with the package importable
+(e.g. ``pip install -e .``), as ``python benchmarks/<script>.py``.
+"""
+import time
+from typing import Callable
+
+
+def bench(label: str, func: Callable[[], object], repeat: int = 3) -> float:
+    # Best wall-clock time of func() over repeat runs, printed in ms
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<10} {best * 1000:9.1f} ms")
+    return best
@@ -0,0 +1,61 @@
+"""Compare the CSV tokenizer against the previous per-character implementation."""
+from typing import List
+
+from _common import bench
+from dapo.utils.csv_utils import iter_csv_records, parse_csv_line
+
+
+def legacy_parse_csv_line(line: str, delimiter: str = ",", quotechar: str = '"') -> List[str]:
+    fields: List[str] = []
+    current: List[str] = []
+    in_quotes = False
+    i = 0
+    length = len(line)
+
+    while i < length:
+        ch = line[i]
+
+        if ch == quotechar:
+            if in_quotes and i + 1 < length and line[i + 1] == quotechar:
+                current.append(quotechar)
+                i += 2
+                continue
+            in_quotes = not in_quotes
+            i += 1
+            continue
+
+        if not in_quotes and ch == delimiter:
+            fields.append("".join(current))
+            current = []
+            i += 1
+            continue
+
+        current.append(ch)
+        i += 1
+
+    fields.append("".join(current))
+    return [f.strip() for f in fields]
+
+
+def main() -> None:
+    n = 50_000
+    datasets = {
+        "unquoted": [f"{i},Alice {i},{i * 1.5},2024-01-{i % 28 + 1:02d},true" for i in range(n)],
+        "quoted": [f'{i},"Smith, John",{i * 1.5},"He said ""hi""",true' for i in range(n)],
+        "examples": open("examples/datasets/job_descriptions_small.csv", encoding="utf-8").read().splitlines() * 20,
+    }
+
+    for name, lines in datasets.items():
+        print(f"{name} ({len(lines)} lines)")
+        old = bench("legacy", lambda: list(map(legacy_parse_csv_line, lines)))
+        new = bench("current", lambda: list(map(parse_csv_line, lines)))
+        print(f"  speedup    {old / new:9.1f}x")
+
+    text = "".join(f'{i},"line one\nline two",x\n' for i in range(n))
+    records = list(iter_csv_records(text.splitlines(keepends=True)))
+    assert len(records) == n and records[0][1] == "line one\nline two"
+    print(f"multi-line records: {len(records)} parsed correctly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare DataKit.group_by against the previous per-group implementation."""
+import random
+from typing import Any, Dict, List
+
+from _common import bench
+from dapo import DataKit
+from dapo.core.cache import set_cache_size
+
+
+def legacy_group_by(dk: DataKit, column: str, agg: Dict[str, str]) -> DataKit:
+    group_col_idx = dk._col_pos(column)
+
+    groups: Dict[Any, List[int]] = {}
+    for i in range(dk._n_rows):
+        key = dk._data[group_col_idx][i]
+        if key not in groups:
+            groups[key] = []
+        groups[key].append(i)
+
+    result_columns = [column] + [f"{op}_{target_col}" for target_col, op in agg.items()]
+    result_data: List[List[Any]] = [[] for _ in result_columns]
+
+    for key, indices in groups.items():
+        result_data[0].append(key)
+
+        for idx, (target_col, operation) in enumerate(agg.items()):
+            src_col_idx = dk._col_pos(target_col)
+            values = [dk._data[src_col_idx][i] for i in indices]
+
+            if operation == "count":
+                val = len(values)
+            elif operation == "sum":
+                val = sum(values)
+            elif operation == "mean":
+                val = sum(values) / len(values) if values else 0
+            elif operation == "max":
+                val = max(values) if values else None
+            elif operation == "min":
+                val = min(values) if values else None
+            else:
+                raise ValueError(f"Unknown aggregation: {operation}")
+
+            result_data[idx + 1].append(val)
+
+    return DataKit(_data=result_data, _columns=result_columns, _n_rows=len(groups))
+
+
+def main() -> None:
+    # Time the computation itself; repeats would otherwise be answered from the result cache
+    set_cache_size(0)
+    random.seed(0)
+    n = 500_000
+    agg = {"salary": "sum", "age": "mean", "id": "count", "score": "max"}
+
+    for n_groups in (10, 1_000, 100_000):
+        dk = DataKit.from_columns({
+            "id": list(range(n)),
+            "key": [f"k{random.randrange(n_groups)}" for _ in range(n)],
+            "salary": [random.random() * 1e5 for _ in range(n)],
+            "age": [random.randrange(18, 70) for _ in range(n)],
+            "score": [random.random() for _ in range(n)],
+        })
+        print(f"{n} rows, {n_groups} groups")
+        old = bench("legacy", lambda: legacy_group_by(dk, "key", agg))
+        new = bench("current", lambda: dk.group_by("key", agg))
+        print(f"  speedup    {old / new:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
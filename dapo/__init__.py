@@ -1,4 +1,5 @@
 from dapo.core.datakit import DataKit
 from dapo.core.data_column import DataColumn
+from dapo.core.expressions import col, lit
 
-__all__ = ["DataKit", "DataColumn"]
\ No newline at end of file
+__all__ = ["DataKit", "DataColumn", "col", "lit"]
\ No newline at end of file
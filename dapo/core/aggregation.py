@@ -0,0 +1,199 @@
+import re
+from itertools import compress
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+from ..core.backend import group_sums
+from ..core.data_column import DataColumn
+from ..core.stats import quantile
+
+# Single-pass hash aggregation: every row is mapped to a dense group id once, then each
+# aggregation walks (group id, value) pairs and updates per-group running accumulators.
+# Nulls are left out before that, so every aggregation sees present values only, and a
+# group without any gets the aggregation's empty result (0 for count and sum, else None).
+
+
+def group_codes(key_columns: Sequence[Sequence[Any]]) -> Tuple[List[int], List[Hashable]]:
+    # Group ids are assigned in order of first appearance. "category" keys are grouped by
+    # their int codes, which are decoded only once per group at the end.
+    dictionaries = [col._categories if getattr(col, "dtype", None) == "category" else None for col in key_columns]
+    if len(key_columns) == 1 and dictionaries[0] is not None:
+        groups = key_columns[0]._category_groups()
+        if groups is not None:
+            return groups
+    columns = [col if d is None else col._values for col, d in zip(key_columns, dictionaries)]
+
+    index: Dict[Hashable, int] = {}
+    if len(columns) == 1:
+        keys = columns[0]
+    else:
+        keys = zip(*columns)
+    codes = [index.setdefault(key, len(index)) for key in keys]
+
+    if dictionaries == [None] * len(dictionaries):
+        return codes, list(index)
+    if len(columns) == 1:
+        return codes, [dictionaries[0][key] for key in index]
+    return codes, [
+        tuple(key if d is None else d[key] for key, d in zip(group, dictionaries))
+        for group in index
+    ]
+
+
+def skip_nulls(codes: List[int], values: Sequence[Any]) -> Tuple[List[int], Sequence[Any]]:
+    # The (group id, value) pairs whose value is not null
+    if not isinstance(values, DataColumn):
+        values = DataColumn._wrap(list(values))
+    if not values.null_count():
+        return codes, values
+    return list(compress(codes, values._null_mask(negate=True))), values._present()
+
+
+def _agg_count(codes: List[int], values: Sequence[Any], n_groups: int) -> List[int]:
+    counts = [0] * n_groups
+    for g in codes:
+        counts[g] += 1
+    return counts
+
+
+def _agg_sum(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    vectorized = group_sums(codes, values, n_groups)
+    if vectorized is not None:
+        return vectorized[0]
+    sums = [0] * n_groups
+    for g, v in zip(codes, values):
+        sums[g] += v
+    return sums
+
+
+def _agg_mean(codes: List[int], values: Sequence[Any], n_groups: int) -> List[float]:
+    vectorized = group_sums(codes, values, n_groups)
+    if vectorized is not None:
+        sums, counts = vectorized
+    else:
+        sums = [0] * n_groups
+        counts = [0] * n_groups
+        for g, v in zip(codes, values):
+            sums[g] += v
+            counts[g] += 1
+    return [s / c if c else None for s, c in zip(sums, counts)]
+
+
+def _agg_min(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    mins = _agg_first(codes, values, n_groups)
+    for g, v in zip(codes, values):
+        if v < mins[g]:
+            mins[g] = v
+    return mins
+
+
+def _agg_max(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    maxs = _agg_first(codes, values, n_groups)
+    for g, v in zip(codes, values):
+        if v > maxs[g]:
+            maxs[g] = v
+    return maxs
+
+
+def _welford(codes: List[int], values: Sequence[Any], n_groups: int) -> Tuple[List[int], List[float]]:
+    counts = [0] * n_groups
+    means = [0.0] * n_groups
+    m2 = [0.0] * n_groups
+    for g, v in zip(codes, values):
+        n = counts[g] + 1
+        counts[g] = n
+        delta = v - means[g]
+        means[g] += delta / n
+        m2[g] += delta * (v - means[g])
+    return counts, m2
+
+
+def _agg_var(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    # Sample variance (ddof=1); None for single-row groups
+    counts, m2 = _welford(codes, values, n_groups)
+    return [s / (n - 1) if n > 1 else None for n, s in zip(counts, m2)]
+
+
+def _agg_std(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    return [v ** 0.5 if v is not None else None for v in _agg_var(codes, values, n_groups)]
+
+
+def _agg_nunique(codes: List[int], values: Sequence[Any], n_groups: int) -> List[int]:
+    counts = [0] * n_groups
+    for g, _ in set(zip(codes, values)):
+        counts[g] += 1
+    return counts
+
+
+def _agg_first(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    # Walking backwards, the earliest value of each group is written last
+    firsts = dict(zip(reversed(codes), reversed(list(values))))
+    return [firsts.get(g) for g in range(n_groups)]
+
+
+def _agg_last(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    lasts = dict(zip(codes, values))
+    return [lasts.get(g) for g in range(n_groups)]
+
+
+def _buckets(codes: List[int], values: Sequence[Any], n_groups: int) -> List[List[Any]]:
+    buckets: List[List[Any]] = [[] for _ in range(n_groups)]
+    for g, v in zip(codes, values):
+        buckets[g].append(v)
+    return buckets
+
+
+def _agg_median(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+    return [quantile(bucket, 0.5) for bucket in _buckets(codes, values, n_groups)]
+
+
+def _percentile_aggregation(percent: float) -> Callable[[List[int], Sequence[Any], int], List[Any]]:
+    q = percent / 100
+
+    def _agg_percentile(codes: List[int], values: Sequence[Any], n_groups: int) -> List[Any]:
+        return [quantile(bucket, q) for bucket in _buckets(codes, values, n_groups)]
+
+    return _agg_percentile
+
+
+AGGREGATIONS: Dict[str, Callable[[List[int], Sequence[Any], int], List[Any]]] = {
+    "count": _agg_count,
+    "count_non_null": _agg_count,
+    "sum": _agg_sum,
+    "mean": _agg_mean,
+    "min": _agg_min,
+    "max": _agg_max,
+    "var": _agg_var,
+    "std": _agg_std,
+    "nunique": _agg_nunique,
+    "first": _agg_first,
+    "last": _agg_last,
+    "median": _agg_median,
+}
+
+
+# "p90", "p99.9", ...: percentiles of each group
+_PERCENTILE_OP = re.compile(r"p(\d+(?:\.\d+)?)")
+
+
+def get_aggregation(operation: str) -> Callable[[List[int], Sequence[Any], int], List[Any]]:
+    if operation in AGGREGATIONS:
+        return AGGREGATIONS[operation]
+    match = _PERCENTILE_OP.fullmatch(operation)
+    if match and float(match.group(1)) <= 100:
+        return _percentile_aggregation(float(match.group(1)))
+    raise ValueError(f"Unknown aggregation: {operation}")
+
+
+# Aggregations over rows rather than values: nulls count like any other row
+ROW_AGGREGATIONS = ("count",)
+
+
+def aggregation_input(operation: str, codes: List[int], values: Sequence[Any]) -> Tuple[List[int], Sequence[Any]]:
+    # The (group id, value) pairs that the operation aggregates
+    if operation in ROW_AGGREGATIONS:
+        return codes, values
+    return skip_nulls(codes, values)
+
+
+def aggregate(codes: List[int], values: Sequence[Any], n_groups: int, operation: str) -> List[Any]:
+    return get_aggregation(operation)(*aggregation_input(operation, codes, values), n_groups)
@@ -0,0 +1,166 @@
+import operator
+from array import array
+from math import floor
+from typing import Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+from ..core.stats import _check_quantile, _interpolate
+
+# Vectorized kernels for typed (int64 / float64) columns, used when NumPy is importable.
+# Every kernel returns exactly what the pure-Python code would, or None to hand the work
+# back to it: integer results that could leave int64 (or lose precision as float64) fall
+# back, so do float sums, whose rounding depends on the order of additions.
+
+BACKENDS = ("python", "numpy")
+NUMPY_DTYPES = {"int64": "int64", "float64": "float64", "bool": "bool"}
+
+_NUMERIC = ("int64", "float64")
+_INT64_MAX = 2 ** 63 - 1
+_FLOAT_EXACT = 2 ** 53
+
+_backend = "numpy" if np is not None else "python"
+
+
+def require_numpy() -> Any:
+    if np is None:
+        raise ImportError("NumPy is required for this operation; install it with 'pip install numpy'")
+    return np
+
+
+def set_backend(name: str) -> None:
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {BACKENDS}")
+    if name == "numpy":
+        require_numpy()
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def _numeric_array(values: Any) -> Optional[Any]:
+    # A view of the column's buffer; it must not outlive the kernel. Columns with nulls
+    # take the Python path.
+    if _backend != "numpy" or getattr(values, "dtype", None) not in _NUMERIC or values.null_count():
+        return None
+    return values._numpy_view()
+
+
+def compress(buf: Any, valid: bytearray) -> Optional[Any]:
+    # The items of a typed array.array whose validity byte is set, as a new array.array
+    if _backend != "numpy" or not len(buf):
+        return None
+    kept = np.frombuffer(buf, dtype=buf.typecode)[np.frombuffer(valid, dtype=bool)]
+    result = array(buf.typecode)
+    result.frombytes(kept.tobytes())
+    return result
+
+
+def _max_abs(arr: Any) -> int:
+    if not arr.size:
+        return 0
+    return max(abs(int(arr.max())), abs(int(arr.min())))
+
+
+# ELEMENTWISE
+_OPS = {"add": operator.add, "sub": operator.sub, "mul": operator.mul, "div": operator.truediv}
+
+
+def _exact(op: str, left: Any, right: Any) -> bool:
+    # Whether NumPy's result equals Python's for these operands
+    ints = [side for side in (left, right) if side.dtype.kind == "i"]
+    if not ints:
+        return True
+    if op == "div" or len(ints) == 1:
+        # Integers are converted to float64 first, which is exact up to 2 ** 53
+        return all(_max_abs(side) <= _FLOAT_EXACT for side in ints)
+    a, b = _max_abs(left), _max_abs(right)
+    return (a * b if op == "mul" else a + b) <= _INT64_MAX
+
+
+def binary_op(op: str, column: Any, other: Any) -> Optional[Any]:
+    left = _numeric_array(column)
+    if left is None or not left.size:
+        return None
+    if type(other) in (int, float):
+        if type(other) is int and abs(other) > _INT64_MAX:
+            return None
+        right = np.array(other, dtype="int64" if type(other) is int else "float64")
+    else:
+        right = _numeric_array(other)
+        if right is None:
+            return None
+
+    if op == "div" and (right == 0).any():
+        # The Python path raises its usual error
+        return None
+    if not _exact(op, left, right):
+        return None
+    with np.errstate(all="ignore"):
+        return _OPS[op](left, right)
+
+
+# REDUCTIONS
+def column_sum(column: Any) -> Optional[int]:
+    arr = _numeric_array(column)
+    if arr is None or arr.dtype.kind != "i":
+        return None
+    if len(arr) * _max_abs(arr) > _INT64_MAX:
+        return None
+    return int(arr.sum())
+
+
+def column_extreme(column: Any, largest: bool) -> Optional[Any]:
+    arr = _numeric_array(column)
+    if arr is None or not arr.size:
+        return None
+    if arr.dtype.kind == "f" and np.isnan(arr).any():
+        # min()/max() with NaN depend on the position of the NaN
+        return None
+    return (arr.max() if largest else arr.min()).item()
+
+
+def quantiles(column: Any, qs: Sequence[float]) -> Optional[List[Any]]:
+    # Same ranks and interpolation as stats.quantiles, with one partition for all of them
+    for q in qs:
+        _check_quantile(q)
+    arr = _numeric_array(column)
+    if arr is None or not arr.size:
+        return None
+    if arr.dtype.kind == "f" and np.isnan(arr).any():
+        return None
+
+    n = len(arr)
+    positions = [q * (n - 1) for q in qs]
+    ranks = {floor(pos) for pos in positions}
+    ranks |= {k + 1 for k in ranks if k + 1 < n}
+    partitioned = np.partition(arr, sorted(ranks))
+
+    result = []
+    for pos in positions:
+        k = floor(pos)
+        high = partitioned[k + 1].item() if k + 1 < n else None
+        result.append(_interpolate(partitioned[k].item(), high, pos - k))
+    return result
+
+
+# GROUPED
+def group_sums(codes: List[int], values: Any, n_groups: int) -> Optional[Tuple[List[Any], List[int]]]:
+    # Per-group sums and counts; bincount adds the weights in row order, like the Python loop
+    arr = _numeric_array(values)
+    if arr is None:
+        return None
+    if arr.dtype.kind == "i" and len(arr) * _max_abs(arr) > _FLOAT_EXACT:
+        return None
+    groups = np.asarray(codes, dtype=np.intp)
+    sums = np.bincount(groups, weights=arr, minlength=n_groups)
+    counts = np.bincount(groups, minlength=n_groups).tolist()
+    if arr.dtype.kind == "i":
+        return sums.astype(np.int64).tolist(), counts
+    return sums.tolist(), counts
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+from itertools import count
+from typing import Any, Callable, Hashable
+
+# Every DataColumn carries a version number that changes on each write. Versions come from
+# one process-wide counter, so a version identifies a column's contents exactly, and a
+# result computed from a column can be cached under it: after any change the column has
+# a new version, old entries are simply never asked for again and age out of the LRU.
+
+_versions = count(1)
+
+
+def next_version() -> int:
+    return next(_versions)
+
+
+class LRUCache:
+    # Safe to share between threads (the async readers run work on executor threads).
+    # compute() runs outside the lock, so two threads may compute the same entry once each.
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if self.maxsize <= 0:
+            return compute()
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > max(self.maxsize, 0):
+                self._entries.popitem(last=False)
+        return value
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+RESULT_CACHE = LRUCache()
+
+
+def set_cache_size(maxsize: int) -> None:
+    # 0 turns result caching off
+    RESULT_CACHE.resize(maxsize)
+
+
+def clear_cache() -> None:
+    RESULT_CACHE.clear()
+
+
+def _detached(value: Any) -> Any:
+    # Callers may modify what they get back; never hand out the cached object itself
+    if isinstance(value, (list, dict)):
+        return value.copy()
+    return value
+
+
+def memoize(method: Callable[..., Any]) -> Callable[..., Any]:
+    # For DataColumn methods whose result depends only on the column's contents
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        key = (self._version, method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return _detached(RESULT_CACHE.get_or_compute(key, lambda: method(self, *args, **kwargs)))
+
+    return wrapper
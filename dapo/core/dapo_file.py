@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import json
+import lzma
+import math
+import mmap
+import sys
+import zlib
+from array import array
+from itertools import compress
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..core.data_column import _TYPECODES, DataColumn
+from ..core.expressions import And, Column, Compare, Expr, IsIn, Or
+
+# A .dapo file holds the encoded column chunks between a short header and a JSON schema:
+#
+#   DAPO <version> 0 0 0 | chunks ... | schema (JSON) | schema length (8 bytes LE) | DAPO
+#
+# Rows are cut into chunks of the same size in every column. Each chunk is stored (and
+# optionally compressed) on its own, together with its min and max in the schema, so a
+# reader decodes only the columns it asks for and skips the chunks a filter rules out.
+# The schema comes last so that the writer can stream the columns chunk by chunk.
+# A typed chunk with nulls also stores its validity mask (one byte per row, 0 = null),
+# encoded like the values; chunks without nulls have none.
+
+MAGIC = b"DAPO"
+# Version 2 added validity masks; version 1 files have no nulls in typed columns
+FORMAT_VERSION = 2
+CHUNK_ROWS = 65536
+
+_HEADER = MAGIC + bytes([FORMAT_VERSION, 0, 0, 0])
+_TRAILER_SIZE = 8 + len(MAGIC)
+
+# Typed and "category" chunks are the raw array bytes; "object" chunks are JSON text,
+# which round-trips exactly these types
+_JSON_TYPES = {type(None), bool, int, float, str}
+
+_COMPRESSORS: Dict[str, Callable[[Any], bytes]] = {"zlib": zlib.compress, "lzma": lzma.compress}
+_DECOMPRESSORS: Dict[str, Callable[[Any], bytes]] = {"zlib": zlib.decompress, "lzma": lzma.decompress}
+
+Compression = Union[None, str, Dict[str, Optional[str]]]
+
+
+def _codecs(columns: List[str], compression: Compression) -> List[Optional[str]]:
+    if compression is None or isinstance(compression, str):
+        codecs = [compression] * len(columns)
+    else:
+        for name in compression:
+            if name not in columns:
+                raise KeyError(f"Unknown column '{name}'")
+        codecs = [compression.get(name) for name in columns]
+
+    for codec in codecs:
+        if codec is not None and codec not in _COMPRESSORS:
+            raise ValueError(f"Unknown compression '{codec}', expected one of {tuple(_COMPRESSORS)}")
+    return codecs
+
+
+def _chunk_bounds(
+    column: DataColumn,
+    chunk: Union[list, array],
+    valid: Optional[bytearray] = None,
+) -> Optional[List[Any]]:
+    # [min, max] of the non-null values of a chunk, or None if there are none or they do not compare
+    dtype = column.dtype
+    if valid is not None:
+        chunk = array(chunk.typecode, compress(chunk, valid))
+    if dtype == "category":
+        categories = column._categories
+        chunk = [categories[code] for code in set(chunk)]
+    elif dtype == "bool":
+        chunk = list(map(bool, chunk))
+
+    if dtype == "float64":
+        # A NaN anywhere makes min/max unreliable; sum() turns NaN whenever one is present
+        if math.isnan(sum(chunk)):
+            chunk = [v for v in chunk if v == v]
+    elif dtype != "int64":
+        chunk = [v for v in chunk if v is not None and v == v]
+
+    if not chunk:
+        return None
+    try:
+        return [min(chunk), max(chunk)]
+    except TypeError:
+        return None
+
+
+def _encode_chunk(name: str, dtype: str, chunk: Union[list, array]) -> Any:
+    if dtype != "object":
+        return memoryview(chunk).cast("B")
+    unsupported = set(map(type, chunk)) - _JSON_TYPES
+    if unsupported:
+        kind = unsupported.pop().__name__
+        raise TypeError(f"Column '{name}' holds {kind} values, which cannot be stored in a .dapo file")
+    return json.dumps(chunk, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def write_dapo(
+    path: str,
+    columns: List[str],
+    data: List[DataColumn],
+    n_rows: int,
+    compression: Compression = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> None:
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be a positive integer")
+    codecs = _codecs(columns, compression)
+
+    schema: Dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "n_rows": n_rows,
+        "chunk_rows": chunk_rows,
+        "columns": [],
+    }
+    with open(path, "wb") as f:
+        f.write(_HEADER)
+        offset = len(_HEADER)
+
+        for name, column, codec in zip(columns, data, codecs):
+            entry: Dict[str, Any] = {"name": name, "dtype": column.dtype, "compression": codec}
+            if column.dtype == "category":
+                entry["categories"] = list(column._categories)
+            entry["chunks"] = chunks = []
+
+            values = column._values
+            for start in range(0, n_rows, chunk_rows):
+                chunk = values[start:start + chunk_rows]
+                valid = column._valid[start:start + chunk_rows] if column._valid is not None else None
+                if valid is not None and 0 not in valid:
+                    valid = None
+
+                parts = [_encode_chunk(name, column.dtype, chunk)]
+                if valid is not None:
+                    parts.append(valid)
+                placed = []
+                for payload in parts:
+                    if codec is not None:
+                        payload = _COMPRESSORS[codec](payload)
+                    f.write(payload)
+                    placed.append({"offset": offset, "size": len(payload)})
+                    offset += len(payload)
+
+                part = dict(placed[0], rows=len(chunk), bounds=_chunk_bounds(column, chunk, valid))
+                if valid is not None:
+                    part["validity"] = placed[1]
+                chunks.append(part)
+            schema["columns"].append(entry)
+
+        footer = json.dumps(schema, ensure_ascii=False).encode()
+        f.write(footer)
+        f.write(len(footer).to_bytes(8, "little"))
+        f.write(MAGIC)
+
+
+class DapoFile:
+    # A memory-mapped .dapo file. Opening it reads only the schema; each column is
+    # decoded from its chunks when it is asked for.
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError(f"'{path}' is not a .dapo file") from None
+        try:
+            self.schema = self._read_schema()
+        except Exception:
+            self.close()
+            raise
+        self._entries = {entry["name"]: entry for entry in self.schema["columns"]}
+
+    def _read_schema(self) -> Dict[str, Any]:
+        mm = self._mm
+        if len(mm) < len(_HEADER) + _TRAILER_SIZE or mm[:len(MAGIC)] != MAGIC or mm[-len(MAGIC):] != MAGIC:
+            raise ValueError(f"'{self.path}' is not a .dapo file")
+        if mm[len(MAGIC)] > FORMAT_VERSION:
+            raise ValueError(f"'{self.path}' uses .dapo format version {mm[len(MAGIC)]}, newer than {FORMAT_VERSION}")
+
+        end = len(mm) - _TRAILER_SIZE
+        size = int.from_bytes(mm[end:end + 8], "little")
+        return json.loads(mm[end - size:end])
+
+    @property
+    def columns(self) -> List[str]:
+        return [entry["name"] for entry in self.schema["columns"]]
+
+    @property
+    def n_rows(self) -> int:
+        return self.schema["n_rows"]
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self) -> "DapoFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown column '{name}'") from None
+
+    def _n_chunks(self) -> int:
+        columns = self.schema["columns"]
+        return len(columns[0]["chunks"]) if columns else 0
+
+    def chunks_matching(self, where: Optional[Expr]) -> List[int]:
+        # Positions of the chunks that may hold rows matching where (all of them without one)
+        chunks = range(self._n_chunks())
+        if where is None:
+            return list(chunks)
+        return [i for i in chunks if _may_match(where, lambda name: self._entry(name)["chunks"][i]["bounds"])]
+
+    def read_column(self, name: str, chunks: Optional[List[int]] = None) -> DataColumn:
+        if self._mm is None:
+            raise ValueError("Cannot read columns from a closed DapoFile")
+        entry = self._entry(name)
+        dtype, codec = entry["dtype"], entry["compression"]
+        parts = entry["chunks"] if chunks is None else [entry["chunks"][i] for i in chunks]
+
+        if dtype == "object":
+            values: List[Any] = []
+            for part in parts:
+                values.extend(json.loads(self._payload(part, codec)))
+            return DataColumn._from_storage(values, "object")
+
+        storage = array(_TYPECODES[dtype])
+        for part in parts:
+            if codec is None:
+                # Straight from the mapped pages into the array, without an intermediate bytes
+                with memoryview(self._mm) as view, view[part["offset"]:part["offset"] + part["size"]] as raw:
+                    storage.frombytes(raw)
+            else:
+                storage.frombytes(self._payload(part, codec))
+        if self.schema["byteorder"] != sys.byteorder:
+            storage.byteswap()
+
+        if dtype == "category":
+            return DataColumn._from_codes(storage, entry["categories"])
+
+        valid = None
+        if any("validity" in part for part in parts):
+            valid = bytearray()
+            for part in parts:
+                if "validity" in part:
+                    valid += self._payload(part["validity"], codec)
+                else:
+                    valid += b"\x01" * part["rows"]
+        return DataColumn._from_storage(storage, dtype, valid)
+
+    def _payload(self, part: Dict[str, Any], codec: Optional[str]) -> bytes:
+        data = self._mm[part["offset"]:part["offset"] + part["size"]]
+        return _DECOMPRESSORS[codec](data) if codec is not None else data
+
+
+def _may_match(expr: Expr, bounds: Callable[[str], Optional[List[Any]]]) -> bool:
+    # False only when a chunk's [min, max] per column prove that none of its rows match expr
+    if isinstance(expr, Or):
+        return _may_match(expr.left, bounds) or _may_match(expr.right, bounds)
+    if isinstance(expr, And):
+        return _may_match(expr.left, bounds) and _may_match(expr.right, bounds)
+    if isinstance(expr, IsIn) and isinstance(expr.expr, Column):
+        found = bounds(expr.expr.name)
+        return any(_may_hold(found, "==", value) for value in expr.values)
+    if isinstance(expr, Compare):
+        found = expr._column_literal()
+        if found is not None:
+            column, symbol, value = found
+            return _may_hold(bounds(column.name), symbol, value)
+    return True
+
+
+def _may_hold(bounds: Optional[List[Any]], symbol: str, value: Any) -> bool:
+    # Nulls and NaN are left out of the bounds, and they can still satisfy "!="
+    if bounds is None or symbol == "!=":
+        return True
+    lo, hi = bounds
+    try:
+        if symbol == "==":
+            return lo <= value <= hi
+        if symbol == "<":
+            return lo < value
+        if symbol == "<=":
+            return lo <= value
+        if symbol == ">":
+            return hi > value
+        return hi >= value
+    except TypeError:
+        return True
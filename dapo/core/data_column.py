@@ -1,100 +1,801 @@
-from typing import TypeVar, List, Union
+import operator
+import sys
+from array import array
+from collections import Counter
+from itertools import compress, islice, repeat
+from typing import TypeVar, Dict, List, Tuple, Union, MutableSequence, Iterable, Optional, Any
+
+from ..core import backend
+from ..core.cache import memoize, next_version
+from ..core.sorting import argsort, sort_values, top_k
+from ..core.stats import ColumnStats, quantile, quantiles
 
 _T = TypeVar("_T")
 
-class DataColumn(List[_T]):
-    def _validate_length(self, other: List[_T]) -> None:
-        if len(self) != len(other):
-            raise ValueError(f"Column length mismatch: {len(self)} != {len(other)}")
+# array.array typecodes for the typed storages; "object" columns keep a plain list.
+# "category" columns store strings (and None) as int codes into a dictionary of distinct
+# values, which is shared between copies of a column and only ever appended to.
+_TYPECODES = {"int64": "q", "float64": "d", "bool": "b", "category": "i"}
+_PY_TYPES = {int: "int64", float: "float64", bool: "bool"}
 
-    def column_sum(self, values: List[_T]):
-        column_sum = 0
-        for i in values: column_sum += i
-        return column_sum
+# Typed storages keep nulls out of the buffer: a validity mask (a bytearray with one byte
+# per buffer slot, 1 = value, 0 = null) marks them, and their slots hold 0. Columns
+# without nulls have no mask. "object" and "category" columns store None as a value.
+_MASKED = ("int64", "float64", "bool")
+# Flips a 0/1 validity mask into a 0/1 null mask
+_FLIP = bytes([1, 0]) + bytes(254)
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
 
-    def sort(self, reverse: bool = False) -> "DataColumn":
-        if len(self) <= 1:
+DTYPES = ("int64", "float64", "bool", "category", "object")
+
+# from_csv stores a string column as "category" when it has at most this many distinct
+# values per row, and no more than CATEGORY_MAX_VALUES in all. Above that the dictionary
+# costs about as much as it saves.
+CATEGORY_MAX_RATIO = 0.05
+CATEGORY_MAX_VALUES = 10_000
+
+
+def infer_dtype(values: Iterable[Any]) -> str:
+    # Nulls fit every dtype, so they do not take part
+    types = set(map(type, values))
+    types.discard(type(None))
+    if len(types) != 1:
+        return "object"
+    return _PY_TYPES.get(types.pop(), "object")
+
+
+def _fits(dtype: str, value: Any) -> bool:
+    if dtype == "object" or value is None:
+        return True
+    if dtype == "category":
+        return type(value) is str
+    if _PY_TYPES.get(type(value)) != dtype:
+        return False
+    return dtype != "int64" or _INT64_MIN <= value <= _INT64_MAX
+
+
+def _make_storage(values: List[Any], dtype: str) -> Tuple[Union[list, array], Optional[bytearray]]:
+    # (buffer, validity mask) for values that fit dtype
+    if dtype == "object":
+        return list(values), None
+    if None not in values:
+        return array(_TYPECODES[dtype], values), None
+    valid = bytearray(v is not None for v in values)
+    return array(_TYPECODES[dtype], [0 if v is None else v for v in values]), valid
+
+
+def _or_null(value: Any, valid: int) -> Any:
+    return value if valid else None
+
+
+def _compress_valid(buf: array, valid: bytearray) -> array:
+    # The items of a typed buffer whose validity byte is set
+    kept = backend.compress(buf, valid)
+    if kept is not None:
+        return kept
+    if valid.count(0) * 8 >= len(valid):
+        return array(buf.typecode, compress(buf, valid))
+    # Few nulls: copy the runs between them slice by slice
+    kept = array(buf.typecode)
+    find = valid.find
+    start = 0
+    null = find(0)
+    while null >= 0:
+        kept += buf[start:null]
+        start = null + 1
+        null = find(0, start)
+    kept += buf[start:]
+    return kept
+
+
+def _trim(valid: Optional[bytearray]) -> Optional[bytearray]:
+    # Validity masks are dropped once they have no nulls left to mark
+    return valid if valid is not None and 0 in valid else None
+
+
+def _compose(outer: Union[range, List[int]], rows: Union[range, List[int]]) -> Union[range, List[int]]:
+    # Positions in the underlying buffer of rows picked from a view. rows holds valid
+    # positions into outer, so two ranges compose by index arithmetic.
+    if isinstance(rows, range) and isinstance(outer, range):
+        if not rows:
+            return range(0)
+        start, step = outer[rows.start], outer.step * rows.step
+        return range(start, start + step * len(rows), step)
+    return list(map(outer.__getitem__, rows))
+
+
+class DataColumn(MutableSequence[_T]):
+    # A column is a buffer (array.array or list), optionally seen through a row selection
+    # (a range or a list of buffer positions). Buffers are shared between columns until
+    # one of them is written to: writers first copy any buffer they do not own.
+    # _version changes on every write (see core/cache.py); reductions are memoized on it.
+    def __init__(self, values: Iterable[_T] = (), dtype: Optional[str] = None) -> None:
+        self._sel: Union[range, List[int], None] = None
+        self._owned = True
+        self._version = next_version()
+        self._categories: Optional[List[Any]] = None
+        self._category_codes: Optional[Dict[Any, int]] = None
+        self._valid: Optional[bytearray] = None
+
+        if isinstance(values, DataColumn):
+            if dtype is None or dtype == values._dtype:
+                copied = values.copy()
+                self._buf, self._valid = copied._buf, copied._valid
+                self._dtype = values._dtype
+                self._categories, self._category_codes = values._categories, values._category_codes
+                return
+            values = list(values)
+        elif not isinstance(values, (list, array)):
+            values = list(values)
+
+        if dtype is None:
+            dtype = infer_dtype(values)
+        elif dtype not in DTYPES:
+            raise ValueError(f"Unknown dtype '{dtype}', expected one of {DTYPES}")
+        elif dtype != "object" and not all(_fits(dtype, v) for v in values):
+            raise TypeError(f"Values do not fit into a '{dtype}' column")
+
+        self._dtype = dtype
+        if dtype == "category":
+            self._categories, self._category_codes = [], {}
+            self._buf = self._encode_many(values)
             return
+        try:
+            self._buf, self._valid = _make_storage(values, dtype)
+        except OverflowError:
+            self._dtype = "object"
+            self._buf = list(values)
 
-        def _partition(low: int, high: int) -> int:
-            pivot = self[high]
-            i = low - 1
+    @classmethod
+    def _from_storage(
+        cls,
+        storage: Union[list, array],
+        dtype: str,
+        valid: Optional[bytearray] = None,
+    ) -> "DataColumn":
+        column = cls.__new__(cls)
+        column._buf = storage
+        column._valid = valid
+        column._sel = None
+        column._owned = True
+        column._dtype = dtype
+        column._version = next_version()
+        column._categories = column._category_codes = None
+        return column
 
-            if not reverse:
-                for j in range(low, high):
-                    if self[j] <= pivot:
-                        i += 1
-                        self[i], self[j] = self[j], self[i]
-            else:
-                for j in range(low, high):
-                    if self[j] >= pivot:
-                        i += 1
-                        self[i], self[j] = self[j], self[i]
-
-            i += 1
-            self[i], self[high] = self[high], self[i]
-            return i
-
-        def _quick_sort(low: int, high: int) -> None:
-            if low < high:
-                p = _partition(low, high)
-                _quick_sort(low, p - 1)
-                _quick_sort(p + 1, high)
-
-        _quick_sort(0, len(self) - 1)
+    @classmethod
+    def _from_numpy(cls, arr: Any) -> "DataColumn":
+        # One bulk copy into typed storage; other dtypes become "object" columns
+        np = backend.require_numpy()
+        arr = np.asarray(arr)
+        if arr.ndim != 1:
+            raise ValueError(f"Expected a one-dimensional array, got {arr.ndim} dimensions")
+
+        kind = arr.dtype.kind
+        if kind == "b":
+            dtype = "bool"
+        elif kind == "f":
+            dtype = "float64"
+        elif kind == "i" or (kind == "u" and (not arr.size or arr.max() <= _INT64_MAX)):
+            dtype = "int64"
+        else:
+            return cls(arr.tolist())
+
+        storage = array(_TYPECODES[dtype])
+        storage.frombytes(memoryview(np.ascontiguousarray(arr, dtype=backend.NUMPY_DTYPES[dtype])).cast("B"))
+        return cls._from_storage(storage, dtype)
+
+    @classmethod
+    def _wrap(cls, values: Iterable[_T]) -> "DataColumn":
+        # Like DataColumn(values), but an "object" list is adopted instead of copied
+        if isinstance(values, DataColumn):
+            return values
+        if not isinstance(values, list):
+            return cls(values)
+        dtype = infer_dtype(values)
+        if dtype == "object":
+            return cls._from_storage(values, dtype)
+        return cls(values, dtype=dtype)
+
+    @classmethod
+    def _from_values(cls, values: List[Any], dtype: str) -> "DataColumn":
+        # Like DataColumn(values, dtype), for values already known to fit dtype (or be None)
+        try:
+            storage, valid = _make_storage(values, dtype)
+        except OverflowError:
+            return cls._from_storage(values, "object")
+        return cls._from_storage(storage, dtype, valid)
+
+    @classmethod
+    def _from_codes(cls, codes: array, categories: List[Any]) -> "DataColumn":
+        # A "category" column over existing codes into the given dictionary
+        column = cls._from_storage(codes, "category")
+        column._categories = categories
+        column._category_codes = {value: code for code, value in enumerate(categories)}
+        return column
+
+    def _like(self, storage: Union[list, array], valid: Optional[bytearray] = None) -> "DataColumn":
+        # A new column with this column's dtype (and category dictionary) over the storage
+        column = self._from_storage(storage, self._dtype, valid)
+        column._categories, column._category_codes = self._categories, self._category_codes
+        return column
+
+    @property
+    def dtype(self) -> str:
+        return self._dtype
+
+    @property
+    def categories(self) -> Optional[List[Any]]:
+        # The dictionary of a "category" column (it may hold values no row uses any more)
+        return list(self._categories) if self._dtype == "category" else None
+
+    def astype(self, dtype: str) -> "DataColumn":
+        return DataColumn(self, dtype=dtype)
+
+    # CATEGORIES
+    def _encode_many(self, values: Iterable[Any]) -> array:
+        lookup = self._category_codes
+        known = len(lookup)
+        codes = array("i", [lookup.setdefault(v, len(lookup)) for v in values])
+        if len(lookup) > known:
+            self._categories.extend(islice(lookup, known, None))
+        return codes
+
+    def _stored(self, value: Any) -> Any:
+        # Buffer representation of a value that fits the dtype
+        if self._dtype != "category":
+            return value
+        return self._encode_many((value,))[0]
+
+    def _code(self, value: Any) -> int:
+        # -1 for values that are not in the dictionary
+        try:
+            return self._category_codes.get(value, -1)
+        except TypeError:
+            return -1
+
+    def _category_ranks(self, descending: bool, nulls: str) -> List[int]:
+        # Per-row sort keys: the rank of each row's category, nulls placed as requested
+        categories = self._categories
+        present = [code for code, value in enumerate(categories) if value is not None]
+        present.sort(key=categories.__getitem__, reverse=descending)
+        ranks = [-1 if nulls == "first" else len(present)] * len(categories)
+        for rank, code in enumerate(present):
+            ranks[code] = rank
+        return list(map(ranks.__getitem__, self._values))
+
+    def _packed_codes(self, codes: Optional[array] = None) -> Optional[bytes]:
+        # With at most 256 categories every code fits in its lowest byte. As one bytes
+        # object they can be searched, counted and translated at C speed.
+        if len(self._categories) > 256:
+            return None
+        if codes is None:
+            codes = self._values
+        width = codes.itemsize
+        return memoryview(codes).cast("B")[0 if sys.byteorder == "little" else width - 1::width].tobytes()
+
+    def _first_codes(self, packed: bytes) -> List[int]:
+        # The codes in use, in order of their first row
+        firsts = [(packed.find(code), code) for code in range(len(self._categories))]
+        return [code for pos, code in sorted(firsts) if pos >= 0]
+
+    def _category_groups(self) -> Optional[tuple]:
+        # (group id per row, value per group), ids numbered in order of first appearance
+        packed = self._packed_codes()
+        if packed is None:
+            return None
+        order = self._first_codes(packed)
+        table = bytearray(256)
+        for group, code in enumerate(order):
+            table[code] = group
+        return list(packed.translate(table)), [self._categories[code] for code in order]
+
+    def _category_mask(
+        self,
+        values: Iterable[Any],
+        rows: Optional[List[int]] = None,
+        negate: bool = False,
+    ) -> Union[bytes, List[bool]]:
+        # Per-row membership in values (truthy = match), tested on the int codes
+        wanted = {self._code(v) for v in values}
+        wanted.discard(-1)
+        codes = self._values if rows is None else self.take(rows)._buf
+
+        packed = self._packed_codes(codes)
+        if packed is not None:
+            table = bytes((code in wanted) != negate for code in range(256))
+            return packed.translate(table)
+
+        test = frozenset(wanted).__contains__
+        matches = map(test, codes)
+        return list(map(operator.not_, matches) if negate else matches)
+
+    def _auto_category(self) -> "DataColumn":
+        # This column as "category" if it holds few distinct strings, else unchanged
+        if self._dtype != "object" or not len(self):
+            return self
+        lookup: Dict[Any, int] = {}
+        try:
+            codes = array("i", [lookup.setdefault(v, len(lookup)) for v in self])
+        except TypeError:
+            return self
+        if len(lookup) > min(len(self) * CATEGORY_MAX_RATIO, CATEGORY_MAX_VALUES) or not all(_fits("category", v) for v in lookup):
+            return self
+        return self._from_codes(codes, list(lookup))
+
+    def _first_rows(self) -> List[int]:
+        # Position of the first occurrence of every distinct value
+        if self._dtype == "category":
+            packed = self._packed_codes()
+            if packed is not None:
+                return sorted(packed.find(code) for code in self._first_codes(packed))
+            values, n_distinct = self._values, len(self._categories)
+        else:
+            values, n_distinct = self, None
+
+        seen = set()
+        rows = []
+        for i, val in enumerate(values):
+            if val not in seen:
+                seen.add(val)
+                rows.append(i)
+                if len(seen) == n_distinct:
+                    break
+        return rows
+
+    # VIEWS
+    def _share(self) -> "DataColumn":
+        # Zero-copy duplicate; whichever side is written to first copies the buffer
+        column = self._like(self._buf, self._valid)
+        column._sel = self._sel
+        column._owned = self._owned = False
+        # Same contents, so the same cached results apply
+        column._version = self._version
+        return column
+
+    def _view(self, rows: Union[range, List[int]]) -> "DataColumn":
+        # Zero-copy selection of rows (a range or a list of row positions)
+        column = self._share()
+        column._sel = _compose(self._sel, rows) if self._sel is not None else rows
+        column._version = next_version()
+        return column
+
+    def _gather(self, positions: Iterable[int]) -> Tuple[Union[list, array], Optional[bytearray]]:
+        buf, valid = self._buf, self._valid
+        if valid is not None:
+            positions = positions if isinstance(positions, (range, list)) else list(positions)
+            valid = _trim(bytearray(map(valid.__getitem__, positions)))
+        gathered = map(buf.__getitem__, positions)
+        if self._dtype == "object":
+            return list(gathered), valid
+        return array(buf.typecode, gathered), valid
+
+    def _materialize(self) -> None:
+        sel = self._sel
+        if sel is None:
+            return
+        if isinstance(sel, range) and sel.step == 1:
+            if sel.start == 0 and sel.stop == len(self._buf):
+                self._sel = None
+                return
+            self._buf = self._buf[sel.start:sel.stop]
+            if self._valid is not None:
+                self._valid = _trim(self._valid[sel.start:sel.stop])
+        else:
+            self._buf, self._valid = self._gather(sel)
+        self._sel = None
+        self._owned = True
+
+    def _dead_fraction(self) -> float:
+        # Share of the underlying buffer that this view does not see
+        if self._sel is None or not self._buf:
+            return 0.0
+        return 1.0 - len(self._sel) / len(self._buf)
+
+    def _scatter(self, positions: Iterable[int], values: List[Any]) -> None:
+        if self._dtype != "object" and not all(_fits(self._dtype, v) for v in values):
+            self._promote()
+        if self._dtype == "category":
+            values = self._encode_many(values)
+        buf = self._writable()
+        valid = self._valid_for_write(None in values)
+        if valid is not None:
+            for row, value in zip(positions, values):
+                valid[row] = value is not None
+                buf[row] = 0 if value is None else value
+            return
+        for row, value in zip(positions, values):
+            buf[row] = value
+
+    def _writable(self) -> Union[list, array]:
+        self._version = next_version()
+        self._materialize()
+        if not self._owned:
+            self._buf = self._buf[:]
+            if self._valid is not None:
+                self._valid = self._valid[:]
+            self._owned = True
+        return self._buf
+
+    def _valid_for_write(self, nulls: bool) -> Optional[bytearray]:
+        # The validity mask that a write (after _writable()) must update along with the
+        # buffer: created when the first nulls arrive, None while there are none
+        if self._valid is None and nulls and self._dtype in _MASKED:
+            self._valid = bytearray(b"\x01") * len(self._buf)
+        return self._valid
+
+    @property
+    def _values(self) -> Union[list, array]:
+        # Flat storage for bulk reads; a view is materialized into its own buffer once
+        self._materialize()
+        return self._buf
+
+    @_values.setter
+    def _values(self, storage: Union[list, array]) -> None:
+        self._buf = storage
+        self._valid = None
+        self._sel = None
+        self._owned = True
+        self._version = next_version()
+
+    def _promote(self) -> None:
+        self._values = list(self)
+        self._dtype = "object"
+        self._categories = self._category_codes = None
+
+    # LIST PROTOCOL
+    def __len__(self) -> int:
+        return len(self._buf if self._sel is None else self._sel)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._view(range(len(self))[index])
+        if self._sel is not None:
+            index = self._sel[index]
+        if self._valid is not None and not self._valid[index]:
+            return None
+        if self._dtype == "bool":
+            return bool(self._buf[index])
+        if self._dtype == "category":
+            return self._categories[self._buf[index]]
+        return self._buf[index]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            values = list(value)
+            if index == slice(None):
+                replaced = DataColumn._wrap(values)
+                self._values, self._dtype = replaced._values, replaced._dtype
+                self._valid = replaced._valid
+                self._categories, self._category_codes = replaced._categories, replaced._category_codes
+                return
+            if self._dtype == "category" and all(_fits(self._dtype, v) for v in values):
+                self._writable()[index] = self._encode_many(values)
+                return
+            if self._dtype != "object":
+                if all(_fits(self._dtype, v) for v in values):
+                    buf = self._writable()
+                    valid = self._valid_for_write(None in values)
+                    if valid is not None:
+                        valid[index] = bytes(v is not None for v in values)
+                        values = [0 if v is None else v for v in values]
+                    buf[index] = array(buf.typecode, values)
+                    return
+                self._promote()
+            self._writable()[index] = values
+            return
+
+        if not _fits(self._dtype, value):
+            self._promote()
+        buf = self._writable()
+        valid = self._valid_for_write(value is None)
+        if valid is not None:
+            valid[index] = value is not None
+            if value is None:
+                value = 0
+        buf[index] = self._stored(value)
+
+    def __delitem__(self, index) -> None:
+        buf = self._writable()
+        if self._valid is not None:
+            del self._valid[index]
+        del buf[index]
+
+    def __iter__(self):
+        values = self._buf if self._sel is None else map(self._buf.__getitem__, self._sel)
+        if self._dtype == "bool":
+            values = map(bool, values)
+        elif self._dtype == "category":
+            return map(self._categories.__getitem__, values)
+        if self._valid is None:
+            return iter(values)
+        valid = self._valid if self._sel is None else map(self._valid.__getitem__, self._sel)
+        return map(_or_null, values, valid)
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+    def __contains__(self, value: Any) -> bool:
+        if self._dtype == "category":
+            return self._code(value) in self._values
+        buf = self._values
+        if self._valid is None:
+            return value in buf
+        if value is None:
+            return 0 in self._valid
+        return value in self._present()._buf
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, DataColumn):
+            if (
+                self._dtype == other._dtype
+                and self._categories is other._categories
+                and self._valid is None
+                and other._valid is None
+            ):
+                return self._values == other._values
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Versions are only unique within one process (columns come back from workers)
+        self.__dict__.update(state)
+        self._version = next_version()
+
+    def __add__(self, other: Iterable[_T]) -> "DataColumn":
+        column = self.copy()
+        column.extend(other)
+        return column
+
+    def __radd__(self, other: Iterable[_T]) -> "DataColumn":
+        column = DataColumn(other)
+        column.extend(self)
+        return column
+
+    def __iadd__(self, other: Iterable[_T]) -> "DataColumn":
+        self.extend(other)
         return self
 
-    def sort_order(self, reverse: bool = False) -> List[int]:
-        n = len(self)
-        if n <= 1:
-            return list(range(n))
+    def __mul__(self, n: int) -> "DataColumn":
+        buf = self._values
+        return self._like(buf * n, None if self._valid is None else self._valid * n)
+
+    __rmul__ = __mul__
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def insert(self, index: int, value: _T) -> None:
+        if not _fits(self._dtype, value):
+            self._promote()
+        buf = self._writable()
+        valid = self._valid_for_write(value is None)
+        if valid is not None:
+            valid.insert(index, value is not None)
+            if value is None:
+                value = 0
+        buf.insert(index, self._stored(value))
+
+    def append(self, value: _T) -> None:
+        self.insert(len(self), value)
+
+    def extend(self, values: Iterable[_T]) -> None:
+        if isinstance(values, DataColumn) and values._dtype == self._dtype:
+            if self._dtype != "category" or values._categories is self._categories:
+                other = values._values
+                other_valid = values._valid
+                buf = self._writable()
+                valid = self._valid_for_write(other_valid is not None)
+                if valid is not None:
+                    valid.extend(other_valid if other_valid is not None else b"\x01" * len(other))
+                buf.extend(other)
+                return
+            # Translate the other column's codes into this column's dictionary
+            remap = self._encode_many(values._categories)
+            self._writable().extend(array("i", map(remap.__getitem__, values._values)))
+            return
+        values = list(values)
+        if self._dtype != "object" and not all(_fits(self._dtype, v) for v in values):
+            self._promote()
+        if self._dtype == "category":
+            values = self._encode_many(values)
+        buf = self._writable()
+        valid = self._valid_for_write(None in values)
+        if valid is not None:
+            valid.extend(v is not None for v in values)
+            values = [0 if v is None else v for v in values]
+        buf.extend(values)
+
+    def pop(self, index: int = -1) -> _T:
+        buf = self._writable()
+        present = self._valid.pop(index) if self._valid is not None else 1
+        value = buf.pop(index)
+        if not present:
+            return None
+        if self._dtype == "category":
+            return self._categories[value]
+        return bool(value) if self._dtype == "bool" else value
+
+    def remove(self, value: _T) -> None:
+        if self._dtype == "category":
+            value = self._code(value)
+            if value < 0:
+                raise ValueError("DataColumn.remove(x): x not in column")
+        elif self._valid is not None:
+            del self[self.index(value)]
+            return
+        self._writable().remove(value)
 
-        indices = list(range(n))
+    def index(self, value: _T, *args: int) -> int:
+        if self._dtype == "category":
+            value = self._code(value)
+        buf = self._values
+        valid = self._valid
+        if valid is None:
+            return buf.index(value, *args)
+        if value is None:
+            return valid.index(0, *args)
+        # Null slots hold 0, so a match on 0 must also be a valid row
+        row = buf.index(value, *args)
+        while not valid[row]:
+            row = buf.index(value, row + 1, *args[1:])
+        return row
 
-        def merge_sort(idxs: List[int]) -> List[int]:
-            if len(idxs) <= 1:
-                return idxs
+    def count(self, value: _T) -> int:
+        if self._dtype == "category":
+            value = self._code(value)
+        buf = self._values
+        if self._valid is None:
+            return buf.count(value)
+        if value is None:
+            return self._valid.count(0)
+        matches = buf.count(value)
+        return matches - self._valid.count(0) if value == 0 else matches
 
-            mid = len(idxs) // 2
-            left = merge_sort(idxs[:mid])
-            right = merge_sort(idxs[mid:])
+    def clear(self) -> None:
+        self._values = self._buf[:0]
 
-            # merge step based on self[...] values
-            i = j = 0
-            merged: List[int] = []
+    def copy(self) -> "DataColumn":
+        if self._sel is None:
+            return self._like(self._buf[:], None if self._valid is None else self._valid[:])
+        return self._like(*self._gather(self._sel))
 
-            while i < len(left) and j < len(right):
-                lv = self[left[i]]
-                rv = self[right[j]]
+    def reverse(self) -> None:
+        buf = self._writable()
+        if self._valid is not None:
+            self._valid.reverse()
+        buf.reverse()
 
-                if not reverse:
-                    if lv <= rv:
-                        merged.append(left[i]); i += 1
-                    else:
-                        merged.append(right[j]); j += 1
-                else:
-                    if lv >= rv:
-                        merged.append(left[i]); i += 1
-                    else:
-                        merged.append(right[j]); j += 1
+    def take(self, indices: Iterable[int]) -> "DataColumn":
+        if self._sel is not None:
+            indices = map(self._sel.__getitem__, indices)
+        return self._like(*self._gather(indices))
 
-            if i < len(left):
-                merged.extend(left[i:])
-            if j < len(right):
-                merged.extend(right[j:])
+    def to_list(self) -> List[_T]:
+        return list(self)
 
-            return merged
+    # Columns used to subclass list; code that needs a real list (json.dumps, isinstance
+    # checks) converts explicitly, with the same name as NumPy's
+    tolist = to_list
 
-        return merge_sort(indices)
+    def _numpy_view(self) -> Any:
+        # Zero-copy ndarray over a typed buffer; it must not be kept past the current call
+        np = backend.require_numpy()
+        buf = self._values
+        if not buf:
+            return np.empty(0, dtype=backend.NUMPY_DTYPES[self._dtype])
+        return np.frombuffer(buf, dtype=backend.NUMPY_DTYPES[self._dtype])
+
+    def to_numpy(self) -> Any:
+        # Columns with nulls come back as object arrays holding None
+        np = backend.require_numpy()
+        if self._dtype not in backend.NUMPY_DTYPES or self.null_count():
+            return np.array(list(self), dtype=object)
+        arr = self._numpy_view()
+        arr.flags.writeable = False
+        # The array keeps reading this buffer, so the column copies it before its next write
+        self._owned = False
+        return arr
+
+    # NULLS
+    def null_count(self) -> int:
+        if self._dtype not in _MASKED:
+            return self.count(None)
+        self._materialize()
+        return 0 if self._valid is None else self._valid.count(0)
+
+    def _null_mask(self, negate: bool = False) -> Union[bytes, List[bool]]:
+        # Per-row flags, truthy for nulls (for values when negated)
+        buf = self._values
+        if self._valid is not None:
+            valid = bytes(self._valid)
+            return valid if negate else valid.translate(_FLIP)
+        if self._dtype == "category":
+            return self._category_mask([None], negate=negate)
+        if self._dtype == "object":
+            return bytes((v is None) != negate for v in buf)
+        return bytes([negate]) * len(buf)
+
+    def _present(self) -> "DataColumn":
+        # This column without its nulls (the column itself when it has none)
+        buf = self._values
+        if self._valid is not None:
+            return self._like(_compress_valid(buf, self._valid))
+        if self._dtype == "category":
+            null = self._code(None)
+            if null < 0 or null not in buf:
+                return self
+            return self._like(array("i", [code for code in buf if code != null]))
+        if self._dtype == "object" and None in buf:
+            return self._like([v for v in buf if v is not None])
+        return self
+
+    def fillna(self, value: Any) -> "DataColumn":
+        # A copy with every null replaced by value (the dtype widens to "object" if needed)
+        column = self.copy()
+        if value is None:
+            return column
+        rows = list(compress(range(len(column)), column._null_mask()))
+        if rows:
+            column._scatter(rows, [value] * len(rows))
+            if column._dtype in _MASKED:
+                column._valid = None
+        return column
+
+    def dropna(self) -> "DataColumn":
+        present = self._present()
+        return present.copy() if present is self else present
+
+    # ANALYSIS
+    def _validate_length(self, other: List[_T]) -> None:
+        if len(self) != len(other):
+            raise ValueError(f"Column length mismatch: {len(self)} != {len(other)}")
+
+    def column_sum(self, values: List[_T]):
+        return sum(values)
+
+    def sort(self, reverse: bool = False, nulls: str = "last") -> "DataColumn":
+        if self._dtype == "category":
+            self._values = self.take(self.argsort(reverse, nulls))._buf
+            return self
+        buf, valid = _make_storage(sort_values(self, reverse, nulls), self._dtype)
+        self._values = buf
+        self._valid = valid
+        return self
+
+    def argsort(self, reverse: bool = False, nulls: str = "last") -> List[int]:
+        return argsort([self], [reverse], nulls)
+
+    def sort_order(self, reverse: bool = False) -> List[int]:
+        return self.argsort(reverse)
 
+    def nlargest(self, n: int) -> "DataColumn":
+        return self.take(top_k([self], n, [True]))
+
+    def nsmallest(self, n: int) -> "DataColumn":
+        return self.take(top_k([self], n, [False]))
+
+    @memoize
     def sum(self, decimal_places: int = None, to_int: bool = False) -> int | float:
         POSSIBLE_TYPES = [float, int, complex]
-        if len(self) < 1:
+        if self._valid is not None and self._dtype != "bool":
+            # Null slots hold 0, so the whole buffer has the same sum as the present values
+            present = self._like(self._values)
+        else:
+            present = self._present()
+        if len(present) < 1:
             return 0
-        if type(self[0]) not in POSSIBLE_TYPES:
-            raise TypeError(f"Values in DataColumn not a numeric: {type(self[0])}")
+        if type(present[0]) not in POSSIBLE_TYPES:
+            raise TypeError(f"Values in DataColumn not a numeric: {type(present[0])}")
 
-        column_sum = self.column_sum(self)
+        column_sum = backend.column_sum(present)
+        if column_sum is None:
+            column_sum = self.column_sum(present)
 
         if to_int:
             column_sum = int(column_sum)
@@ -103,88 +804,97 @@ class DataColumn(List[_T]):
         
         return column_sum
     
+    @memoize
     def mean(self, decimal_places: int = None, to_int: bool = False) -> int | float:
-        POSSIBLE_TYPES = [float, int, complex]
-        if len(self) < 1:
+        n = len(self) - self.null_count()
+        if n < 1:
             return None
-        if type(self[0]) not in POSSIBLE_TYPES:
-            raise TypeError(f"Values in DataColumn not a numeric: {type(self[0])}")
 
+        # sum() checks that the values are numeric
         column_sum = self.sum()
-        column_mean = column_sum/len(self)
+        column_mean = column_sum/n
         if to_int:
-            column_mean = int(column_sum/len(self))
+            column_mean = int(column_sum/n)
         elif decimal_places != None:
-            column_mean = round(column_sum/len(self), decimal_places)
+            column_mean = round(column_sum/n, decimal_places)
         
         return column_mean
     
+    @memoize
     def median(self, decimal_places: int = None, to_int: bool = False) -> int | float:
-        n = len(self)
-        if n < 1:
+        median = self._quantiles([0.5])[0]
+        if median is None:
             return None
-        
-        s = self.sort()
-        median = (s[n//2-1]/2.0+s[n//2]/2.0, s[n//2])[n % 2]
+
         if to_int:
             median = int(median)
         elif decimal_places != None:
             median = round(median, decimal_places)
 
         return median
+
+    def _quantiles(self, qs: List[float]) -> List[Any]:
+        present = self._present()
+        values = backend.quantiles(present, qs)
+        if values is not None:
+            return values
+        if len(qs) == 1:
+            return [quantile(present, qs[0])]
+        return quantiles(present, qs)
+
+    @memoize
+    def quantile(self, q: float | List[float], decimal_places: int = None) -> Any:
+        # Never reorders the column: a single q uses selection, several q share one sort
+        values = self._quantiles([q] if isinstance(q, (int, float)) else list(q))
+
+        if decimal_places != None:
+            values = [round(v, decimal_places) if v is not None else None for v in values]
+
+        return values[0] if isinstance(q, (int, float)) else values
+
+    @memoize
+    def percentile(self, p: float | List[float], decimal_places: int = None) -> Any:
+        if isinstance(p, (int, float)):
+            return self.quantile(p / 100, decimal_places)
+        return self.quantile([x / 100 for x in p], decimal_places)
     
+    @memoize
     def mode(self) -> _T:
-        if not self:
+        present = self._present()
+        if not present:
             return None
 
-        frequency = {}
-        for item in self:
-            if item in frequency:
-                frequency[item] += 1
-            else:
-                frequency[item] = 1
-        
-        max_count = 0
-        mode = None
-        
-        for key, value in frequency.items():
-            if value > max_count:
-                max_count = value
-                mode = key
-                
-        return mode
+        if self._dtype == "category":
+            # Counting codes; ties still go to the value seen first
+            return self._categories[Counter(present._values).most_common(1)[0][0]]
+        return Counter(present).most_common(1)[0][0]
     
+    @memoize
     def min(self) -> _T:
-        if not self:
+        present = self._present()
+        if not present:
             return None
-        
-        minimum = self[0]
-        
-        for item in self:
-            if item < minimum:
-                minimum = item
-                
-        return minimum
+
+        value = backend.column_extreme(present, largest=False)
+        return value if value is not None else min(present)
     
+    @memoize
     def max(self) -> _T:
-        if not self:
+        present = self._present()
+        if not present:
             return None
-        
-        maximum = self[0]
-        
-        for item in self:
-            if item > maximum:
-                maximum = item
-                
-        return maximum
+
+        value = backend.column_extreme(present, largest=True)
+        return value if value is not None else max(present)
     
+    @memoize
     def std(self, decimal_places: int = None, to_int: bool = False) -> int | float:
-        n = len(self)
-        if n <= 1:
+        # Sample standard deviation (n - 1 in the denominator)
+        if len(self) <= 1:
+            return None
+        std = ColumnStats.from_values(self).std
+        if std is None:
             return None
-        mean = self.mean()
-        summ = self.column_sum([(value - mean)**2 for value in self])
-        std = (summ/n-1)**0.5
 
         if to_int:
             std = int(std)
@@ -192,32 +902,60 @@ class DataColumn(List[_T]):
             std = round(std, decimal_places)
 
         return std
+
+    @memoize
+    def describe(self, percentiles: Optional[List[float]] = None) -> Dict[str, Any]:
+        # count, nulls, mean, std, min and max in one pass, plus optional percentiles
+        stats = ColumnStats.from_values(self)
+        summary = stats.to_dict()
+        if percentiles:
+            if stats.numeric and stats.count:
+                values = self._quantiles([p / 100 for p in percentiles])
+            else:
+                values = [None] * len(percentiles)
+            for p, value in zip(percentiles, values):
+                summary[f"p{p:g}"] = value
+        return summary
     
-    def add(self, other: Union[int, float, List[int | float]]) -> "DataColumn":
-        if isinstance(other, list):
+    def _vectorized(self, op: str, other: Any) -> Optional["DataColumn"]:
+        if isinstance(other, (list, DataColumn)):
             self._validate_length(other)
-            return DataColumn([x + y for x, y in zip(self, other)])
-        return DataColumn([x + other for x in self])
+        result = backend.binary_op(op, self, other)
+        return None if result is None else self._from_numpy(result)
+
+    def _combine(self, op: Any, other: Any) -> "DataColumn":
+        # Element-wise op in Python; a null on either side gives a null
+        pairs = zip(self, other) if isinstance(other, (list, DataColumn)) else zip(self, repeat(other))
+        return DataColumn([None if x is None or y is None else op(x, y) for x, y in pairs])
+
+    def add(self, other: Union[int, float, List[int | float]]) -> "DataColumn":
+        result = self._vectorized("add", other)
+        if result is not None:
+            return result
+        return self._combine(operator.add, other)
 
     def sub(self, other: Union[int, float, List[int | float]]) -> "DataColumn":
-        if isinstance(other, list):
-            self._validate_length(other)
-            return DataColumn([x - y for x, y in zip(self, other)])
-        return DataColumn([x - other for x in self])
+        result = self._vectorized("sub", other)
+        if result is not None:
+            return result
+        return self._combine(operator.sub, other)
 
     def mul(self, other: Union[int, float, List[int | float]]) -> "DataColumn":
-        if isinstance(other, list):
-            self._validate_length(other)
-            return DataColumn([x * y for x, y in zip(self, other)])
-        return DataColumn([x * other for x in self])
+        result = self._vectorized("mul", other)
+        if result is not None:
+            return result
+        return self._combine(operator.mul, other)
     
     def div(self, other: Union[int, float, List[int | float]]) -> "DataColumn":
-        if isinstance(other, list):
-            self._validate_length(other)
+        # Divisors containing zero always take the Python path, which raises below
+        result = self._vectorized("div", other)
+        if result is not None:
+            return result
+        if isinstance(other, (list, DataColumn)):
             if any(y == 0 for y in other):
                  raise ValueError("Division by zero encountered in column operation.")
-            return DataColumn([x / y for x, y in zip(self, other)])
+            return self._combine(operator.truediv, other)
         
         if other == 0:
             raise ValueError("Cannot divide column by zero.")
-        return DataColumn([x / other for x in self])
\ No newline at end of file
+        return self._combine(operator.truediv, other)
\ No newline at end of file
@@ -1,18 +1,81 @@
 from __future__ import annotations
 
+import os
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Sequence, Iterator, Callable
+from itertools import chain, compress, islice
+from typing import IO, TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Sequence, Iterable, Iterator, Callable, Tuple
 
+from ..core.aggregation import aggregation_input, get_aggregation, group_codes
+from ..core.cache import RESULT_CACHE
+from ..core.dapo_file import CHUNK_ROWS, Compression, DapoFile, write_dapo
 from ..core.data_column import DataColumn
-from ..utils.csv_utils import read_csv, write_csv
-from ..utils.json_utils import read_json, write_json
-from ..utils.toon_utils import read_toon, write_toon 
+from ..core.dataset import (
+    FORMATS, PART_FILE, discover_files, files_matching, partition_dir, partition_dtype, partition_texts,
+    read_partition_dtypes, write_partition_dtypes,
+)
+from ..core.expressions import Column, Expr
+from ..core.indexes import HashIndex, create_index
+from ..core.sorting import argsort, top_k
+from ..core.join import coalesce, gather, join_indices
+from ..utils.async_utils import aiter_blocking, run_blocking
+from ..utils.csv_utils import read_csv_range, read_csv_records, sniff_delimiter, split_csv_ranges, write_csv
+from ..utils.json_utils import iter_json, write_json
+from ..utils.schema_utils import INFER_ROWS, TextSchema
+from ..utils.toon_utils import read_toon_records, write_toon, write_toon_rows
+
+if TYPE_CHECKING:
+    from ..core.lazy import LazyKit
+
+def _read_csv_range_columns(task: tuple) -> List[DataColumn[Any]]:
+    # Process-pool worker: parse one byte range of a CSV file into typed columns
+    path, start, end, delimiter, schema, encoding = task
+    n_cols = len(schema.names)
+    rows = list(read_csv_range(path, start, end, delimiter=delimiter, n_cols=n_cols, encoding=encoding, schema=schema))
+    if not rows:
+        return [_text_column(schema, pos, []) for pos in range(n_cols)]
+    return [_text_column(schema, pos, list(col)) for pos, col in enumerate(zip(*rows))]
+
+def _text_column(schema: TextSchema, pos: int, values: List[Any]) -> DataColumn[Any]:
+    # Values already converted by the schema; empty fields are None
+    dtype = schema.dtypes[pos]
+    if dtype == "category":
+        return DataColumn(values, dtype="category")
+    if dtype == "object":
+        return DataColumn._wrap(values)
+    return DataColumn._from_values(values, dtype)
+
+def _as_float(column: DataColumn[Any]) -> DataColumn[Any]:
+    return DataColumn._from_values([None if v is None else float(v) for v in column], "float64")
+
+def _read_dataset_file(task: tuple) -> "DataKit":
+    # Process-pool worker: read one file of a dataset
+    path, format, encoding, dtypes = task
+    if format == "csv":
+        return DataKit.from_csv(path, encoding=encoding, dtypes=dtypes)
+    if format == "json":
+        return DataKit.from_json(path, encoding=encoding)
+    if format == "toon":
+        return DataKit.from_toon(path, encoding=encoding, dtypes=dtypes)
+    return DataKit.from_dapo(path)
+
+def _partition_column(value: Any, dtype: str, n_rows: int) -> DataColumn[Any]:
+    # One file's value of a partition key, repeated for each of its rows. Text values
+    # become a one-entry "category" column.
+    if dtype in ("object", "category"):
+        return DataColumn._from_codes(array("i", [0]) * n_rows, [value])
+    return DataColumn._from_values([value] * n_rows, dtype)
 
 @dataclass
 class DataKit:
     _data: List[DataColumn[Any]] = field(default_factory=list)
     _columns: List[str] = field(default_factory=list)
     _n_rows: int = 0
+    _indexes: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._data = [DataColumn._wrap(col) for col in self._data]
 
     # HELPERS
     def _validate_length(self, other: DataColumn[Any]) -> None:
@@ -41,10 +104,20 @@ class DataKit:
         
         n_rows = lengths.pop()
         column_order = list(columns.keys())
-        cols_data = [list(columns[name]) for name in column_order]
+        cols_data = [DataColumn(columns[name]) for name in column_order]
 
         return cls(_data=cols_data, _columns=column_order, _n_rows=n_rows)
 
+    @classmethod
+    def from_numpy(cls, arrays: Dict[str, Any]) -> "DataKit":
+        # Numeric and bool arrays are copied into typed storage in bulk, without per-value work
+        cols_data = [DataColumn._from_numpy(arr) for arr in arrays.values()]
+        lengths = {len(col) for col in cols_data}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+
+        return cls(_data=cols_data, _columns=list(arrays), _n_rows=lengths.pop() if lengths else 0)
+
     @classmethod
     def from_rows(cls, rows: Sequence[Sequence[Any]]) -> "DataKit":
         if not rows:
@@ -52,7 +125,7 @@ class DataKit:
         
         header = [str(c) for c in rows[0]]
         n_cols = len(header)
-        cols_data: List[DataColumn[Any]] = [[] for _ in range(n_cols)]
+        cols_data: List[List[Any]] = [[] for _ in range(n_cols)]
         n_rows = 0
 
         for r in rows[1:]:
@@ -70,65 +143,344 @@ class DataKit:
         path: str,
         delimiter: Optional[str] = None,
         encoding: str = "utf-8",
+        workers: Optional[int] = None,
+        categorize: bool = True,
+        dtypes: Optional[Dict[str, str]] = None,
     ) -> "DataKit":
-        data: List[DataColumn[Any]] = []
-        columns: List[str] = []
-        first = True
-
-        for row_dict in read_csv(path, delimiter=delimiter, has_header=True, encoding=encoding):
-            if first:
-                columns = list(row_dict.keys())
-                first = False
-                data.append(columns)
-            data.append([row_dict[c] for c in columns])
-
-        return cls.from_rows(data)
+        if workers is not None and workers > 1:
+            kit = cls._from_csv_parallel(path, workers, delimiter=delimiter, encoding=encoding, dtypes=dtypes)
+        else:
+            kit = cls.concat(cls.iter_csv_batches(path, delimiter=delimiter, encoding=encoding, dtypes=dtypes))
+        return kit._categorize() if categorize else kit
+
+    def _categorize(self) -> "DataKit":
+        # Low-cardinality string columns are stored as "category" columns
+        self._data = [col._auto_category() for col in self._data]
+        return self
+
+    @classmethod
+    def _from_csv_parallel(
+        cls,
+        path: str,
+        workers: int,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> "DataKit":
+        if delimiter is None:
+            delimiter = sniff_delimiter(path)
+
+        # The schema is inferred once, up front, so that every range is typed alike
+        records = read_csv_records(path, delimiter=delimiter, has_header=True, encoding=encoding)
+        header = next(records, None)
+        sample = list(islice(records, INFER_ROWS))
+        records.close()
+        if header is None:
+            return cls()
+        schema = TextSchema.infer(header, sample, dtypes)
+
+        # A few ranges per worker keeps the pool busy when records are unevenly sized
+        _, ranges = split_csv_ranges(path, workers * 4, encoding=encoding)
+        if not ranges:
+            return cls(_data=[_text_column(schema, pos, []) for pos in range(len(header))], _columns=header)
+
+        tasks = [(path, start, end, delimiter, schema, encoding) for start, end in ranges]
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            chunks = pool.map(_read_csv_range_columns, tasks)
+            return cls.concat(
+                cls(_data=cols_data, _columns=list(header), _n_rows=len(cols_data[0]))
+                for cols_data in chunks
+            )
+
+    @classmethod
+    def open_csv(
+        cls,
+        path: str,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        mmap: bool = True,
+        index_path: Optional[str] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+        categorize: bool = True,
+    ) -> "DataKit":
+        if not mmap:
+            return cls.from_csv(path, delimiter=delimiter, encoding=encoding, categorize=categorize, dtypes=dtypes)
+
+        from ..core.mapped_csv import MappedCsvKit
+        return MappedCsvKit(
+            path, delimiter=delimiter, encoding=encoding, index_path=index_path, dtypes=dtypes, categorize=categorize,
+        )
+
+    @classmethod
+    def scan_csv(
+        cls,
+        path: str,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> "LazyKit":
+        from ..core.lazy import CsvScan, LazyKit
+        return LazyKit(CsvScan(path, delimiter=delimiter, encoding=encoding, dtypes=dtypes))
+
+    def lazy(self) -> "LazyKit":
+        from ..core.lazy import KitScan, LazyKit
+        return LazyKit(KitScan(self))
+
+    @classmethod
+    def iter_csv_batches(
+        cls,
+        path: str,
+        batch_size: int = 65536,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        usecols: Optional[List[str]] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> Iterator["DataKit"]:
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        records = read_csv_records(path, delimiter=delimiter, has_header=True, encoding=encoding, usecols=usecols)
+        header = next(records, None)
+        if header is None:
+            return
+
+        # Every batch is typed with the schema of the first rows, one column at a time
+        sample = list(islice(records, INFER_ROWS))
+        schema = TextSchema.infer(header, sample, dtypes)
+        records = chain(sample, records)
+
+        n_read = 0
+        while True:
+            chunk = list(islice(records, batch_size))
+            if not chunk and n_read:
+                return
+
+            texts = list(zip(*chunk)) or [() for _ in header]
+            cols_data = [
+                _text_column(schema, pos, schema.convert_column(pos, values, first_row=n_read))
+                for pos, values in enumerate(texts)
+            ]
+            yield cls(_data=cols_data, _columns=list(header), _n_rows=len(chunk))
+            n_read += len(chunk)
+
+            if len(chunk) < batch_size:
+                return
+
+    @classmethod
+    def concat(cls, kits: Iterable["DataKit"]) -> "DataKit":
+        result: Optional[DataKit] = None
+
+        for kit in kits:
+            if result is None:
+                result = cls(
+                    _data=[DataColumn(col) for col in kit._data],
+                    _columns=list(kit._columns),
+                    _n_rows=kit._n_rows,
+                )
+                continue
+
+            if kit._columns != result._columns:
+                raise ValueError(f"Column mismatch in concat: {kit._columns} != {result._columns}")
+            for pos, other in enumerate(kit._data):
+                col = result._data[pos]
+                if {col.dtype, other.dtype} == {"int64", "float64"}:
+                    # Text readers widen an inferred int64 column when floats turn up
+                    # later, so earlier batches may still be int64
+                    if col.dtype == "int64":
+                        col = result._data[pos] = _as_float(col)
+                    else:
+                        other = _as_float(other)
+                col.extend(other)
+            result._n_rows += kit._n_rows
+
+        return result if result is not None else cls()
     
+    @classmethod
+    def _from_records(cls, records: List[Dict[str, Any]], columns: List[str]) -> "DataKit":
+        data = [[rec.get(col_name) for rec in records] for col_name in columns]
+        return cls(_data=data, _columns=list(columns), _n_rows=len(records))
+
     @classmethod
     def from_json(
         cls,
         path: str,
         encoding: str = "utf-8",
     ) -> "DataKit":
-        records = read_json(path, encoding=encoding)
+        return cls.concat(cls.iter_json_batches(path, encoding=encoding))
 
-        if not records:
-            return cls(_data=[], _columns=[])
+    @classmethod
+    def iter_json_batches(
+        cls,
+        path: str,
+        batch_size: int = 65536,
+        encoding: str = "utf-8",
+    ) -> Iterator["DataKit"]:
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
 
-        columns: List[str] = list(records[0].keys())
+        records = iter_json(path, encoding=encoding)
+        first = next(records, None)
+        if first is None:
+            return
 
-        data: List[DataColumn[Any]] = [[] for _ in columns]
-        n_rows = 0
+        # Like from_json, the first record fixes the column set for every batch
+        columns: List[str] = list(first.keys())
+        records = chain([first], records)
 
-        for rec in records:
-            for col_idx, col_name in enumerate(columns):
-                data[col_idx].append(rec.get(col_name))
-            n_rows += 1
+        while True:
+            chunk = list(islice(records, batch_size))
+            if not chunk:
+                return
+            yield cls._from_records(chunk, columns)
 
-        return cls(_data=data, _columns=columns, _n_rows=n_rows)
+    # Async readers for event-loop code: parsing runs in an executor (the loop's default
+    # thread pool unless one is passed), so other tasks keep being served meanwhile
+    @classmethod
+    async def afrom_csv(
+        cls,
+        path: str,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        workers: Optional[int] = None,
+        categorize: bool = True,
+        dtypes: Optional[Dict[str, str]] = None,
+        executor: Optional[Executor] = None,
+    ) -> "DataKit":
+        return await run_blocking(
+            cls.from_csv, path, delimiter=delimiter, encoding=encoding, workers=workers,
+            categorize=categorize, dtypes=dtypes, executor=executor,
+        )
+
+    @classmethod
+    async def afrom_json(
+        cls,
+        path: str,
+        encoding: str = "utf-8",
+        executor: Optional[Executor] = None,
+    ) -> "DataKit":
+        return await run_blocking(cls.from_json, path, encoding=encoding, executor=executor)
+
+    @classmethod
+    def aiter_csv(
+        cls,
+        path: str,
+        batch_size: int = 65536,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        usecols: Optional[List[str]] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator["DataKit"]:
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        # One batch is parsed ahead while the caller works on the current one
+        return aiter_blocking(lambda: cls.iter_csv_batches(
+            path, batch_size=batch_size, delimiter=delimiter, encoding=encoding, usecols=usecols, dtypes=dtypes,
+        ))
 
     @classmethod
     def from_toon(
         cls,
         path: str,
         encoding: str = "utf-8",
+        dtypes: Optional[Dict[str, str]] = None,
     ) -> "DataKit":
-        records = read_toon(path, encoding=encoding)
+        columns, rows = read_toon_records(path, encoding=encoding)
 
-        if not records:
+        if not columns:
             return cls(_data=[], _columns=[])
 
-        columns: List[str] = list(records[0].keys())
+        schema = TextSchema.infer(columns, rows[:INFER_ROWS], dtypes)
+        texts = list(zip(*rows)) or [() for _ in columns]
+        data = [_text_column(schema, pos, schema.convert_column(pos, values)) for pos, values in enumerate(texts)]
+        return cls(_data=data, _columns=columns, _n_rows=len(rows))
 
-        data: List[DataColumn[Any]] = [[] for _ in columns]
-        n_rows = 0
+    @classmethod
+    def from_dapo(
+        cls,
+        path: str,
+        columns: Optional[List[str]] = None,
+        where: Optional[Expr] = None,
+    ) -> "DataKit":
+        # Only the requested columns (and those where reads) are decoded, and only from
+        # the chunks whose min/max do not rule where out
+        with DapoFile(path) as source:
+            names = source.columns if columns is None else list(columns)
+            needed = list(names)
+            if where is not None:
+                needed += [name for name in where.columns() if name not in needed]
+
+            chunks = source.chunks_matching(where)
+            data = [source.read_column(name, chunks) for name in needed]
+
+        kit = cls(_data=data, _columns=needed, _n_rows=len(data[0]) if data else 0)
+        if where is not None:
+            kit = kit.filter(where)
+        return kit.select(names) if needed != names else kit
 
-        for rec in records:
-            for col_idx, col_name in enumerate(columns):
-                data[col_idx].append(rec.get(col_name))
-            n_rows += 1
+    @classmethod
+    def from_dataset(
+        cls,
+        path: str,
+        format: Optional[str] = None,
+        where: Optional[Expr] = None,
+        workers: Optional[int] = None,
+        encoding: str = "utf-8",
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> "DataKit":
+        # key=value directories become columns. Files whose partition values rule where
+        # out are never opened; the rows of the others are filtered after reading.
+        root, format, files = discover_files(path, format)
+        texts = [partition_texts(root, file) for file in files]
+        keys = list(dict.fromkeys(key for found in texts for key in found))
+
+        dtypes = dict(dtypes or {})
+        # Partition keys take the caller's dtypes, else the ones to_dataset recorded
+        stored = read_partition_dtypes(root) if keys else {}
+        key_dtypes = {key: dtypes.pop(key, stored.get(key)) for key in keys}
+        key_dtypes = {key: dtype for key, dtype in key_dtypes.items() if dtype is not None}
+        if dtypes and format not in ("csv", "toon"):
+            raise ValueError(f"dtypes= only applies to partition keys and to csv or toon files, not to {format} files")
+        # Typed like the fields of a text file, one row per file
+        schema = TextSchema.infer(keys, [[found.get(key, "") for key in keys] for found in texts], key_dtypes)
+        partitions = cls(
+            _data=[
+                _text_column(schema, pos, schema.convert_column(pos, [found.get(key, "") for found in texts]))
+                for pos, key in enumerate(keys)
+            ],
+            _columns=keys,
+            _n_rows=len(files),
+        )
 
-        return cls(_data=data, _columns=columns, _n_rows=n_rows)
+        if where is not None and files:
+            matching = files_matching(where, partitions)
+            if matching is not None:
+                kept = sorted(matching)
+                files = [files[i] for i in kept]
+                partitions = partitions._take_rows(kept)
+        if not files:
+            return cls()
+
+        tasks = [(file, format, encoding, dtypes or None) for file in files]
+        if workers is not None and workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                kits = list(pool.map(_read_dataset_file, tasks))
+        else:
+            kits = map(_read_dataset_file, tasks)
+
+        def with_partitions() -> Iterator["DataKit"]:
+            for i, (file, kit) in enumerate(zip(files, kits)):
+                for key in keys:
+                    if key in kit._columns:
+                        raise ValueError(f"Column '{key}' of '{file}' is also a partition key")
+                kit._data += [_partition_column(col[i], col.dtype, kit._n_rows) for col in partitions._data]
+                kit._columns += keys
+                yield kit
+
+        result = cls.concat(with_partitions())
+        if format == "csv":
+            # Each file was categorized on its own; columns the first file kept as "object" are decided here
+            result._categorize()
+        return result.filter(where) if where is not None else result
 
     @property
     def columns(self) -> List[str]:
@@ -151,7 +503,11 @@ class DataKit:
     # ACCESS
     def get_column(self, name: str) -> DataColumn[Any]:
         idx = self._col_pos(name)
-        return DataColumn(self._data[idx])
+        return self._data[idx]._share()
+
+    def column_version(self, name: str) -> int:
+        # Changes whenever the column's contents change
+        return self._data[self._col_pos(name)]._version
     
     def get_row(self, index: int) -> Dict[str, Any]:
         self._check_row_index(index)
@@ -165,7 +521,7 @@ class DataKit:
     def add_row(self, values: Dict[str, Any]) -> Dict[str, Any]:
         if not self._columns:
             self._columns = list(values.keys())
-            self._data = [[] for _ in self._columns]
+            self._data = [DataColumn() for _ in self._columns]
 
         for name in self._columns:
             if name not in values:
@@ -174,9 +530,37 @@ class DataKit:
         for i, name in enumerate(self._columns):
             self._data[i].append(values[name])
 
+        for name, index in self._indexes.items():
+            if not index.stale:
+                index.add(values[name], self._n_rows)
+
         self._n_rows += 1
         return values
 
+    def add_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        if not self._columns:
+            self._columns = list(rows[0].keys())
+            self._data = [DataColumn() for _ in self._columns]
+
+        for values in rows:
+            for name in self._columns:
+                if name not in values:
+                    raise ValueError(F"Missing value for column '{name}'")
+
+        for i, name in enumerate(self._columns):
+            self._data[i].extend([values[name] for values in rows])
+
+        for name, index in self._indexes.items():
+            if not index.stale:
+                index.extend([values[name] for values in rows], self._n_rows)
+
+        self._n_rows += len(rows)
+        return len(rows)
+
     def add_column(self, header: str, values: List[Any]) -> DataColumn[Any]:
         self._validate_length(values)
         data_column = DataColumn(values)
@@ -201,6 +585,11 @@ class DataKit:
             if name in values:
                 self._data[i][index] = values[name]
 
+        for name, column_index in self._indexes.items():
+            if name in values and not column_index.stale:
+                column_index.remove(old_row[name], index)
+                column_index.add(values[name], index)
+
         return old_row
 
     def delete_row(self, index: int) -> Dict[str, Any]:
@@ -211,22 +600,110 @@ class DataKit:
         for col in self._data:
             col.pop(index)
 
+        # Every later row moves up by one: rebuild the indexes on next use
+        self._mark_indexes_stale()
         self._n_rows -= 1
         return removed
 
-    def to_csv(
+    def _resolve_rows(self, rows: Iterable[int] | Expr | Callable[[Dict[str, Any]], bool]) -> List[int]:
+        # Row positions from a predicate or from explicit indices (sorted, duplicates dropped)
+        if isinstance(rows, Expr) or callable(rows):
+            return self._select_rows(rows)
+        positions = sorted(set(rows))
+        if positions:
+            self._check_row_index(positions[0])
+            self._check_row_index(positions[-1])
+        return positions
+
+    def update_rows(
         self,
-        path: str,
-        delimiter: str = ",",
-        encoding: str = "utf-8",
-        newline: str = "\n",
-    ) -> None:
-        n_cols = len(self._columns)
+        rows: Iterable[int] | Expr | Callable[[Dict[str, Any]], bool],
+        values: Dict[str, Any],
+    ) -> int:
+        positions = self._resolve_rows(rows)
 
-        if n_cols == 0:
-            write_csv(path, [], [], delimiter=delimiter, encoding=encoding, newline=newline)
-            return
+        for name in values:
+            if name not in self._columns:
+                raise KeyError(f"Unknown column '{name}' in update")
+
+        # Compute every new column first, so updates may read columns that are also updated
+        updates = []
+        for name, value in values.items():
+            if isinstance(value, Expr):
+                new_values = list(value.evaluate(self, positions))
+            elif isinstance(value, (list, tuple, DataColumn)):
+                new_values = list(value)
+                if len(new_values) != len(positions):
+                    raise ValueError(f"Got {len(new_values)} values for '{name}' but {len(positions)} rows to update")
+            else:
+                new_values = [value] * len(positions)
+            updates.append((self._col_pos(name), new_values))
+
+        for idx, new_values in updates:
+            self._data[idx]._scatter(positions, new_values)
+
+        for name in values:
+            self._mark_indexes_stale(name)
+        return len(positions)
+
+    def delete_rows(self, rows: Iterable[int] | Expr | Callable[[Dict[str, Any]], bool]) -> int:
+        positions = self._resolve_rows(rows)
+        if not positions:
+            return 0
+
+        # Deletion bitmap -> selection vector of the surviving rows; the columns become views
+        # through it, so no column data moves until compact()
+        keep = bytearray(b"\x01") * self._n_rows
+        for row in positions:
+            keep[row] = 0
+        live = list(compress(range(self._n_rows), keep))
+
+        self._data = [col._view(live) for col in self._data]
+        self._n_rows = len(live)
+        self._mark_indexes_stale()
+
+        # Amortized compaction: a buffer that is mostly dead rows is rewritten
+        for col in self._data:
+            if col._dead_fraction() > 0.5:
+                col._materialize()
+        return len(positions)
+
+    def compact(self) -> "DataKit":
+        # Drop deleted rows from the buffers (copying only the live rows)
+        for col in self._data:
+            col._materialize()
+        return self
 
+    # INDEXES
+    def create_index(self, column: str, kind: str = "hash") -> "DataKit":
+        self._indexes[column] = create_index(self._data[self._col_pos(column)], kind)
+        return self
+
+    def drop_index(self, column: str) -> "DataKit":
+        self._col_pos(column)
+        self._indexes.pop(column, None)
+        return self
+
+    def _get_index(self, column: str) -> Any:
+        index = self._indexes.get(column)
+        if index is not None and index.stale:
+            index.build(self._data[self._col_pos(column)])
+            if index.stale:
+                # The values could not be indexed (see SortedIndex.build)
+                return None
+        return index
+
+    def _mark_indexes_stale(self, column: str | None = None) -> None:
+        for name, index in self._indexes.items():
+            if column is None or name == column:
+                index.stale = True
+
+    def _join_table(self, column: str) -> Any:
+        # A hash index doubles as a ready-made join build table
+        index = self._get_index(column)
+        return index.table if isinstance(index, HashIndex) else None
+
+    def _check_column_lengths(self) -> int:
         n_rows = len(self._data[0])
 
         for idx, col in enumerate(self._data):
@@ -236,15 +713,25 @@ class DataKit:
                     f"!= {n_rows} (length of first column)"
                 )
 
-        rows: List[List[object]] = []
-        for row_idx in range(n_rows):
-            row = [self._data[col_idx][row_idx] for col_idx in range(n_cols)]
-            rows.append(row)
+        return n_rows
+
+    def to_csv(
+        self,
+        path: str | IO[str],
+        delimiter: str = ",",
+        encoding: str = "utf-8",
+        newline: str = "\n",
+    ) -> None:
+        if not self._columns:
+            write_csv(path, [], [], delimiter=delimiter, encoding=encoding, newline=newline)
+            return
+
+        self._check_column_lengths()
 
         write_csv(
             path=path,
             columns=self._columns,
-            rows=rows,
+            rows=zip(*self._data),
             delimiter=delimiter,
             encoding=encoding,
             newline=newline,
@@ -252,81 +739,125 @@ class DataKit:
 
     def to_json(
         self,
-        path: str,
+        path: str | IO[str],
         encoding: str = "utf-8",
         indent: int = 2,
     ) -> None:
         columns = self._columns
-        data = self._data
 
         if not columns:
             write_json(path, [], encoding=encoding, indent=indent)
             return
 
-        n_cols = len(columns)
-        n_rows = len(data[0]) if n_cols > 0 else 0
-
-        for idx, col_vals in enumerate(data):
-            if len(col_vals) != n_rows:
-                raise ValueError(
-                    f"Column {idx} ('{columns[idx]}') length {len(col_vals)} "
-                    f"!= {n_rows} (length of first column)"
-                )
-
-        records: List[dict[str, Any]] = []
-        for row_idx in range(n_rows):
-            record = {
-                columns[col_idx]: data[col_idx][row_idx]
-                for col_idx in range(n_cols)
-            }
-            records.append(record)
+        self._check_column_lengths()
 
         write_json(
             path=path,
-            records=records,
+            records=(dict(zip(columns, row)) for row in zip(*self._data)),
             encoding=encoding,
             indent=indent,
         )
 
-    def to_toon(
+    # The async writers write a copy-on-write snapshot, so the kit may be changed on the
+    # loop while the file is being written
+    async def ato_csv(
         self,
-        path: str,
+        path: str | IO[str],
+        delimiter: str = ",",
+        encoding: str = "utf-8",
+        newline: str = "\n",
+        executor: Optional[Executor] = None,
+    ) -> None:
+        await run_blocking(
+            self._share().to_csv, path, delimiter=delimiter, encoding=encoding, newline=newline, executor=executor,
+        )
+
+    async def ato_json(
+        self,
+        path: str | IO[str],
         encoding: str = "utf-8",
         indent: int = 2,
+        executor: Optional[Executor] = None,
     ) -> None:
-        columns = self._columns
-        data = self._data
+        await run_blocking(self._share().to_json, path, encoding=encoding, indent=indent, executor=executor)
 
-        if not columns:
+    def to_toon(
+        self,
+        path: str | IO[str],
+        encoding: str = "utf-8",
+        indent: int = 2,
+    ) -> None:
+        if not self._columns:
             write_toon(path, [], encoding=encoding, indent=indent)
             return
 
-        n_cols = len(columns)
-        n_rows = len(data[0]) if n_cols > 0 else 0
-
-        records: List[dict[str, Any]] = []
-        for row_idx in range(n_rows):
-            record = {
-                columns[col_idx]: data[col_idx][row_idx]
-                for col_idx in range(n_cols)
-            }
-            records.append(record)
+        n_rows = self._check_column_lengths()
 
-        write_toon(
+        write_toon_rows(
             path=path,
-            records=records,
+            columns=self._columns,
+            rows=zip(*self._data),
+            n_rows=n_rows,
             encoding=encoding,
             indent=indent,
         )
 
-    def sort(
-        self, 
-        columns: str | List[str], 
-        reverse: bool | List[bool] = False
-    ) -> "DataKit":
-        if self._n_rows <= 1:
-            return
+    def to_dapo(
+        self,
+        path: str,
+        compression: Compression = None,
+        chunk_rows: int = CHUNK_ROWS,
+    ) -> None:
+        n_rows = self._check_column_lengths() if self._columns else 0
+        write_dapo(path, self._columns, self._data, n_rows, compression=compression, chunk_rows=chunk_rows)
 
+    def to_dataset(
+        self,
+        path: str,
+        partition_by: Optional[str | List[str]] = None,
+        format: str = "csv",
+        encoding: str = "utf-8",
+    ) -> None:
+        # One file per distinct combination of partition values, under key=value
+        # directories; the partition columns themselves are not repeated in the files
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format '{format}', expected one of {tuple(FORMATS)}")
+        keys = [] if partition_by is None else [partition_by] if isinstance(partition_by, str) else list(partition_by)
+        key_columns = [self._data[self._col_pos(key)] for key in keys]
+        file_columns = [name for name in self._columns if name not in keys]
+        file_name = PART_FILE + FORMATS[format]
+
+        if not keys:
+            parts = [(path, self)]
+        else:
+            codes, values = group_codes(key_columns)
+            rows: List[List[int]] = [[] for _ in values]
+            for i, group in enumerate(codes):
+                rows[group].append(i)
+            parts = [
+                (os.path.join(path, partition_dir(keys, value if len(keys) > 1 else (value,))), self._take_rows(group_rows))
+                for value, group_rows in zip(values, rows)
+            ]
+
+        os.makedirs(path, exist_ok=True)
+        if keys:
+            write_partition_dtypes(path, {
+                key: dtype for key, dtype in zip(keys, map(partition_dtype, key_columns)) if dtype is not None
+            })
+        for directory, part in parts:
+            os.makedirs(directory, exist_ok=True)
+            part = part.select(file_columns)
+            target = os.path.join(directory, file_name)
+            if format == "dapo":
+                part.to_dapo(target)
+            elif format == "json":
+                part.to_json(target, encoding=encoding)
+            elif format == "toon":
+                part.to_toon(target, encoding=encoding)
+            else:
+                part.to_csv(target, encoding=encoding)
+
+    def _sort_keys(self, columns: str | List[str], reverse: bool | List[bool]) -> Tuple[List[DataColumn[Any]], List[bool]]:
         if isinstance(columns, str):
             columns = [columns]
         
@@ -336,37 +867,111 @@ class DataKit:
         if len(columns) != len(reverse):
             raise ValueError("Length of 'columns' and 'reverse' must match")
 
-        indices = list(range(self._n_rows))
+        return [self._data[self._col_pos(name)] for name in columns], reverse
 
-        for col_name, is_reverse in zip(reversed(columns), reversed(reverse)):
-            col_idx = self._col_pos(col_name)
-            col_data = self._data[col_idx]
-            
-            indices.sort(key=lambda i: col_data[i], reverse=is_reverse)
+    def argsort(
+        self,
+        columns: str | List[str],
+        reverse: bool | List[bool] = False,
+        nulls: str = "last",
+    ) -> List[int]:
+        key_columns, reverse = self._sort_keys(columns, reverse)
+        return argsort(key_columns, reverse, nulls)
+
+    def sort(
+        self, 
+        columns: str | List[str], 
+        reverse: bool | List[bool] = False,
+        nulls: str = "last",
+    ) -> "DataKit":
+        # One stable sort of the row positions by a composite key, then one gather per column
+        indices = self.argsort(columns, reverse, nulls)
 
         for i, col in enumerate(self._data):
-            self._data[i] = [col[j] for j in indices]
-        
+            self._data[i] = col.take(indices)
+
+        self._mark_indexes_stale()
         return self
 
+    def top_k(
+        self,
+        k: int,
+        columns: str | List[str],
+        reverse: bool | List[bool] = True,
+        nulls: str = "last",
+    ) -> "DataKit":
+        # Same rows as sort(columns, reverse).head(k), found with a heap of size k
+        key_columns, reverse = self._sort_keys(columns, reverse)
+        return self._take_rows(top_k(key_columns, k, reverse, nulls))
+
+    def nlargest(self, n: int, columns: str | List[str]) -> "DataKit":
+        return self.top_k(n, columns, reverse=True)
+
+    def nsmallest(self, n: int, columns: str | List[str]) -> "DataKit":
+        return self.top_k(n, columns, reverse=False)
+
     def rename_column(self, old_name: str, new_name: str) -> "DataKit":
         if new_name in self._columns:
             raise ValueError(f"Column '{new_name}' already exists")
             
         idx = self._col_pos(old_name)
         self._columns[idx] = new_name
+        if old_name in self._indexes:
+            self._indexes[new_name] = self._indexes.pop(old_name)
         return self
 
-    def filter(self, condition: Callable[[Dict[str, Any]], bool]) -> "DataKit":
-        header = self._columns
-        matched_data = [header]
+    def _share(self) -> "DataKit":
+        # Zero-copy duplicate (copy-on-write, like DataColumn._share)
+        return DataKit(
+            _data=[col._share() for col in self._data],
+            _columns=list(self._columns),
+            _n_rows=self._n_rows
+        )
 
-        for row_dict in self.iter_rows():
-            if condition(row_dict):
-                row_values = [row_dict[col] for col in header]
-                matched_data.append(row_values)
+    def _take_rows(self, indices: List[int]) -> "DataKit":
+        # Zero-copy: every column becomes a view through the same row-index vector
+        return DataKit(
+            _data=[col._view(indices) for col in self._data],
+            _columns=list(self._columns),
+            _n_rows=len(indices)
+        )
 
-        return self.from_rows(matched_data)
+    def _select_rows(self, condition: Expr | Callable[[Dict[str, Any]], bool]) -> List[int]:
+        if isinstance(condition, Expr):
+            # Evaluated column by column into a selection vector
+            return condition.selection(self)
+
+        header = self._columns
+        return [
+            i for i, row in enumerate(zip(*self._data))
+            if condition(dict(zip(header, row)))
+        ]
+
+    def filter(self, condition: Expr | Callable[[Dict[str, Any]], bool]) -> "DataKit":
+        return self._take_rows(self._select_rows(condition))
+
+    def fillna(self, value: Any | Dict[str, Any]) -> "DataKit":
+        # One fill value for every column, or a dict of values per column
+        fills = value if isinstance(value, dict) else dict.fromkeys(self._columns, value)
+        positions = {name: self._col_pos(name) for name in fills}
+
+        result = self._share()
+        for name, fill in fills.items():
+            column = result._data[positions[name]]
+            # Columns without nulls stay shared
+            if column.null_count():
+                result._data[positions[name]] = column.fillna(fill)
+        return result
+
+    def dropna(self, columns: Optional[List[str]] = None) -> "DataKit":
+        # Rows without a null in any of the columns (all of them by default)
+        names = self._columns if columns is None else columns
+        if not names:
+            return self._share()
+        condition = Column(names[0]).is_not_null()
+        for name in names[1:]:
+            condition = condition & Column(name).is_not_null()
+        return self.filter(condition)
     
     def select(self, columns: List[str]) -> "DataKit":
         selected_data = []
@@ -377,90 +982,126 @@ class DataKit:
 
         return DataKit(
             _data=selected_data,
-            _columns=columns,
+            _columns=list(columns),
             _n_rows=self._n_rows
         )
     
     def unique(self, column: str) -> "DataKit":
-        target_col_idx = self._col_pos(column)
-        
-        seen = set()
-        indices_to_keep = []
-
-        target_data = self._data[target_col_idx]
-        
-        for i in range(self._n_rows):
-            val = target_data[i]
-            if val not in seen:
-                seen.add(val)
-                indices_to_keep.append(i)
-
-        new_data = []
-        for col in self._data:
-            new_col_data = [col[i] for i in indices_to_keep]
-            new_data.append(new_col_data)
-
-        return DataKit(
-            _data=new_data, 
-            _columns=list(self._columns), 
-            _n_rows=len(indices_to_keep)
-        )
+        target_col = self._data[self._col_pos(column)]
+        # Only the row positions are cached: they depend on this one column alone
+        indices = RESULT_CACHE.get_or_compute(("unique", target_col._version), target_col._first_rows)
+        return self._take_rows(indices)
     
     def apply(self, func: Callable[[Any], Any], column: str) -> "DataKit":
         idx = self._col_pos(column)
         col_data = self._data[idx]
-        
-        for i in range(len(col_data)):
-            col_data[i] = func(col_data[i])
+        col_data[:] = [func(value) for value in col_data]
+        self._mark_indexes_stale(column)
 
-    def group_by(self, column: str, agg: Dict[str, str]) -> "DataKit":
-        group_col_idx = self._col_pos(column)
-        
-        groups: Dict[Any, List[int]] = {}
-        for i in range(self._n_rows):
-            key = self._data[group_col_idx][i]
-            if key not in groups:
-                groups[key] = []
-            groups[key].append(i)
-
-        new_agg_names = []
-        for target_col, op in agg.items():
-            new_agg_names.append(f"{op}_{target_col}")
-
-        result_columns = [column] + new_agg_names
-        
-        result_data = [[] for _ in result_columns]
-        
-        for key, indices in groups.items():
-            result_data[0].append(key)
-            
-            for idx, (target_col, operation) in enumerate(agg.items()):
-                result_col_idx = idx + 1
-                
-                src_col_idx = self._col_pos(target_col)
-                values = [self._data[src_col_idx][i] for i in indices]
-                
-                if operation == "count":
-                    val = len(values)
-                elif operation == "sum":
-                    val = sum(values)
-                elif operation == "mean":
-                    val = sum(values) / len(values) if values else 0
-                elif operation == "max":
-                    val = max(values) if values else None
-                elif operation == "min":
-                    val = min(values) if values else None
-                else:
-                    raise ValueError(f"Unknown aggregation: {operation}")
-                
-                result_data[result_col_idx].append(val)
+    def group_by(
+        self,
+        column: str | List[str],
+        agg: Dict[str, str | List[str]],
+    ) -> "DataKit":
+        key_names = [column] if isinstance(column, str) else list(column)
+        key_columns = [self._data[self._col_pos(name)] for name in key_names]
+
+        plan = []
+        for target_col, operations in agg.items():
+            src = self._data[self._col_pos(target_col)]
+            for operation in [operations] if isinstance(operations, str) else operations:
+                plan.append((f"{operation}_{target_col}", src, operation, get_aggregation(operation)))
+
+        cache_key = (
+            "group_by",
+            tuple(key_names),
+            tuple(col._version for col in key_columns),
+            tuple((name, src._version, operation) for name, src, operation, _ in plan),
+        )
+        # Callers get a copy-on-write duplicate, so changing it leaves the cached table intact
+        return RESULT_CACHE.get_or_compute(
+            cache_key, lambda: self._group_by(key_names, key_columns, plan)
+        )._share()
+
+    def _group_by(
+        self,
+        key_names: List[str],
+        key_columns: List[DataColumn[Any]],
+        plan: List[Tuple[str, DataColumn[Any], str, Callable[..., List[Any]]]],
+    ) -> "DataKit":
+        codes, keys = group_codes(key_columns)
+        n_groups = len(keys)
+
+        if len(key_names) == 1:
+            result_data = [keys]
+        else:
+            result_data = [list(col) for col in zip(*keys)] or [[] for _ in key_names]
+
+        for _, src, operation, func in plan:
+            result_data.append(func(*aggregation_input(operation, codes, src), n_groups))
 
         return DataKit(
-            _data=result_data, 
-            _columns=result_columns, 
-            _n_rows=len(groups)
+            _data=result_data,
+            _columns=key_names + [name for name, _, _, _ in plan],
+            _n_rows=n_groups
+        )
+
+    def join(
+        self,
+        other: "DataKit",
+        on: str | List[str],
+        how: str = "inner",
+        suffixes: Sequence[str] = ("_x", "_y"),
+    ) -> "DataKit":
+        keys = [on] if isinstance(on, str) else list(on)
+        left_keys = [self._data[self._col_pos(name)] for name in keys]
+        right_keys = [other._data[other._col_pos(name)] for name in keys]
+
+        tables = {}
+        if len(keys) == 1:
+            tables = {"left_table": self._join_table(keys[0]), "right_table": other._join_table(keys[0])}
+
+        left_idx, right_idx = join_indices(left_keys, right_keys, how=how, **tables)
+
+        result_columns: List[str] = []
+        result_data: List[DataColumn[Any]] = []
+
+        for name, left_col, right_col in zip(keys, left_keys, right_keys):
+            result_columns.append(name)
+            if how == "right":
+                result_data.append(gather(right_col, right_idx))
+            elif how == "outer":
+                result_data.append(coalesce(gather(left_col, left_idx), gather(right_col, right_idx)))
+            else:
+                result_data.append(gather(left_col, left_idx))
+
+        left_rest = [name for name in self._columns if name not in keys]
+        right_rest = [name for name in other._columns if name not in keys]
+        clashes = set(left_rest) & set(right_rest)
+
+        for name in left_rest:
+            result_columns.append(name + suffixes[0] if name in clashes else name)
+            result_data.append(gather(self._data[self._col_pos(name)], left_idx))
+        for name in right_rest:
+            result_columns.append(name + suffixes[1] if name in clashes else name)
+            result_data.append(gather(other._data[other._col_pos(name)], right_idx))
+
+        return DataKit(_data=result_data, _columns=result_columns, _n_rows=len(left_idx))
+
+    def describe(self, percentiles: Optional[List[float]] = None) -> "DataKit":
+        # One row of summary statistics per column
+        return DataKit._describe_table(
+            self._columns,
+            [col.describe(percentiles) for col in self._data],
         )
 
+    @classmethod
+    def _describe_table(cls, names: List[str], summaries: List[Dict[str, Any]]) -> "DataKit":
+        if not summaries:
+            return cls(_columns=["column", "count", "nulls", "mean", "std", "min", "max"])
+        columns = ["column"] + list(summaries[0])
+        return cls._from_records([{"column": name, **summary} for name, summary in zip(names, summaries)], columns)
+
     def head(self, n: int = 5) -> "DataKit":
         n = min(n, self._n_rows)
         new_data = [col[:n] for col in self._data]
@@ -472,4 +1113,12 @@ class DataKit:
         
         start = max(0, self._n_rows - n)
         new_data = [col[start:] for col in self._data]
-        return DataKit(_data=new_data, _columns=list(self._columns), _n_rows=len(new_data[0]))
\ No newline at end of file
+        return DataKit(_data=new_data, _columns=list(self._columns), _n_rows=len(new_data[0]))
+
+    def copy(self) -> "DataKit":
+        # Views share buffers with the table they came from; copy() detaches them eagerly
+        return DataKit(
+            _data=[col.copy() for col in self._data],
+            _columns=list(self._columns),
+            _n_rows=self._n_rows
+        )
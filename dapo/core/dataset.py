@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote
+
+from ..core.data_column import DataColumn
+from ..core.expressions import And, Expr, Or
+
+if TYPE_CHECKING:
+    from ..core.datakit import DataKit
+
+# A dataset is a tree of files in one format. Directories named key=value (Hive-style
+# partitioning) give every row below them a column "key" holding value; an empty value
+# is a null. Keys and values are percent-encoded, so they may hold "/" or "=".
+#
+#   sales/country=FR/day=2024-05-01/part-0.csv
+#
+# Files and directories whose names start with "." or "_" (_SUCCESS, .DS_Store) are not
+# part of the dataset.
+
+FORMATS = {"csv": ".csv", "json": ".json", "toon": ".toon", "dapo": ".dapo"}
+
+# Name of the file that to_dataset writes into each partition directory
+PART_FILE = "part-0"
+
+# to_dataset records the dtype of every partition key in this file at the dataset root.
+# Directory names are text, so without it "007" or "true" would read back as a number or
+# a bool. Like other "_" names it is not part of the data.
+PARTITIONS_FILE = "_partitions.json"
+
+
+def _is_glob(path: str) -> bool:
+    return any(char in path for char in "*?[")
+
+
+def _format_of(path: str) -> Optional[str]:
+    ext = os.path.splitext(path)[1].lower()
+    for name, suffix in FORMATS.items():
+        if ext == suffix:
+            return name
+    return None
+
+
+def _hidden(name: str) -> bool:
+    return name.startswith((".", "_"))
+
+
+def _walk(root: str) -> List[str]:
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not _hidden(name))
+        found.extend(os.path.join(dirpath, name) for name in sorted(filenames) if not _hidden(name))
+    return found
+
+
+def discover_files(path: str, format: Optional[str] = None) -> Tuple[str, Optional[str], List[str]]:
+    # (root, format, files) for a directory, a glob pattern or a single file. Partition
+    # keys are read from the directories between root and each file.
+    if format is not None and format not in FORMATS:
+        raise ValueError(f"Unknown format '{format}', expected one of {tuple(FORMATS)}")
+
+    if _is_glob(path):
+        root = os.path.dirname(path)
+        while _is_glob(root):
+            root = os.path.dirname(root)
+        files = sorted(
+            p for p in glob.glob(path, recursive=True)
+            if os.path.isfile(p) and not _hidden(os.path.basename(p))
+        )
+    elif os.path.isdir(path):
+        root = path
+        files = _walk(path)
+        # Other files in the tree (README, checksums) are skipped by their extension
+        if format is not None:
+            files = [p for p in files if _format_of(p) == format]
+        else:
+            files = [p for p in files if _format_of(p) is not None]
+    elif os.path.isfile(path):
+        root, files = os.path.dirname(path), [path]
+    else:
+        raise FileNotFoundError(f"No such file or directory: '{path}'")
+
+    if format is None and files:
+        formats = {_format_of(p) for p in files}
+        if None in formats:
+            unknown = next(p for p in files if _format_of(p) is None)
+            raise ValueError(f"Cannot tell the format of '{unknown}'; pass format=")
+        if len(formats) > 1:
+            raise ValueError(f"Found files in several formats {sorted(formats)}; pass format=")
+        format = formats.pop()
+    return root, format, files
+
+
+def partition_texts(root: str, path: str) -> Dict[str, str]:
+    # The key=value directory names between root and the file, outermost first
+    relative = os.path.relpath(os.path.dirname(path) or os.curdir, root or os.curdir)
+    found = {}
+    for segment in relative.split(os.sep):
+        key, sep, value = segment.partition("=")
+        if sep and key:
+            found[unquote(key)] = unquote(value)
+    return found
+
+
+def _partition_text(value: Any) -> str:
+    # The directory spelling of a partition value. It reads back to the same value, and
+    # to the same type given the dtype in PARTITIONS_FILE.
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return quote(str(value), safe="")
+
+
+def partition_dir(names: List[str], values: Tuple[Any, ...]) -> str:
+    return os.path.join(*(f"{quote(name, safe='')}={_partition_text(value)}" for name, value in zip(names, values)))
+
+
+def partition_dtype(column: DataColumn) -> Optional[str]:
+    # The dtype to read a partition key back with; None (infer) for object columns
+    # holding anything but text, which directory names cannot tell apart
+    if column.dtype != "object":
+        return column.dtype
+    return "object" if all(value is None or isinstance(value, str) for value in column) else None
+
+
+def read_partition_dtypes(root: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(root, PARTITIONS_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_partition_dtypes(root: str, dtypes: Dict[str, str]) -> None:
+    # Keys of partitions written earlier under the same root are kept
+    merged = {**read_partition_dtypes(root), **dtypes}
+    with open(os.path.join(root, PARTITIONS_FILE), "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2)
+
+
+def files_matching(where: Expr, partitions: "DataKit") -> Optional[Set[int]]:
+    # Positions of the files (rows of partitions, one per file) whose partition values
+    # may satisfy where, or None when where does not depend on partition columns alone
+    if all(name in partitions.columns for name in where.columns()):
+        return set(where.selection(partitions))
+    if isinstance(where, Or):
+        left, right = files_matching(where.left, partitions), files_matching(where.right, partitions)
+        if left is None or right is None:
+            return None
+        return left | right
+    if isinstance(where, And):
+        left, right = files_matching(where.left, partitions), files_matching(where.right, partitions)
+        if left is None or right is None:
+            return right if left is None else left
+        return left & right
+    return None
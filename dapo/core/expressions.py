@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import operator
+from itertools import compress, repeat
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from ..core.datakit import DataKit
+
+# Column-wise expressions: col("price") > 100 evaluates a whole column at once and
+# produces a selection vector (the row indices that match), instead of calling a
+# Python callback on a dict per row.
+
+
+class Expr:
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        # Values of the expression for every row of kit (or only for the given rows)
+        raise NotImplementedError
+
+    def columns(self) -> List[str]:
+        return []
+
+    def selection(self, kit: "DataKit", rows: Optional[List[int]] = None) -> List[int]:
+        if rows is None:
+            hits = self._index_rows(kit)
+            if hits is not None:
+                return hits
+        candidates = rows if rows is not None else range(len(kit))
+        return _selected(candidates, self._mask(kit, rows))
+
+    def _mask(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        # Truthy per matching row; may be cheaper to build than evaluate()'s bools
+        return self.evaluate(kit, rows)
+
+    # Index support: the matching rows straight from a secondary index, or None to scan
+    def _can_use_index(self, kit: "DataKit") -> bool:
+        return False
+
+    def _index_rows(self, kit: "DataKit") -> Optional[List[int]]:
+        return None
+
+    def __bool__(self) -> bool:
+        raise TypeError("Expressions cannot be used as booleans; combine them with &, | and ~")
+
+    __hash__ = None
+
+    # COMPARISONS
+    def __eq__(self, other: Any) -> "Expr":  # type: ignore[override]
+        return Compare(operator.eq, "==", self, other)
+
+    def __ne__(self, other: Any) -> "Expr":  # type: ignore[override]
+        return Compare(operator.ne, "!=", self, other)
+
+    def __lt__(self, other: Any) -> "Expr":
+        return Compare(operator.lt, "<", self, other)
+
+    def __le__(self, other: Any) -> "Expr":
+        return Compare(operator.le, "<=", self, other)
+
+    def __gt__(self, other: Any) -> "Expr":
+        return Compare(operator.gt, ">", self, other)
+
+    def __ge__(self, other: Any) -> "Expr":
+        return Compare(operator.ge, ">=", self, other)
+
+    def isin(self, values: Iterable[Any]) -> "Expr":
+        return IsIn(self, values)
+
+    def is_null(self) -> "Expr":
+        return IsNull(self)
+
+    def is_not_null(self) -> "Expr":
+        return IsNull(self, negate=True)
+
+    # BOOLEAN LOGIC
+    def __and__(self, other: "Expr") -> "Expr":
+        return And(self, _wrap(other))
+
+    def __or__(self, other: "Expr") -> "Expr":
+        return Or(self, _wrap(other))
+
+    def __invert__(self) -> "Expr":
+        return Not(self)
+
+    # ARITHMETIC
+    def __add__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.add, "+", self, other)
+
+    def __radd__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.add, "+", other, self)
+
+    def __sub__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.sub, "-", self, other)
+
+    def __rsub__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.sub, "-", other, self)
+
+    def __mul__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.mul, "*", self, other)
+
+    def __rmul__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.mul, "*", other, self)
+
+    def __truediv__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.truediv, "/", self, other)
+
+    def __rtruediv__(self, other: Any) -> "Expr":
+        return Arithmetic(operator.truediv, "/", other, self)
+
+
+def _selected(candidates: Sequence[int], mask: Iterable[Any]) -> List[int]:
+    if isinstance(mask, bytes) and mask.count(1) * 8 < len(mask):
+        # Few matches in a 0/1 byte mask: jump between them with C-level find
+        hits = []
+        find = mask.find
+        i = find(1)
+        while i >= 0:
+            hits.append(candidates[i])
+            i = find(1, i + 1)
+        return hits
+    return list(compress(candidates, mask))
+
+
+def _wrap(value: Any) -> Expr:
+    return value if isinstance(value, Expr) else Literal(value)
+
+
+class Column(Expr):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        column = kit._data[kit._col_pos(self.name)]
+        return column if rows is None else column.take(rows)
+
+    def columns(self) -> List[str]:
+        return [self.name]
+
+    def __repr__(self) -> str:
+        return f"col({self.name!r})"
+
+
+class Literal(Expr):
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        return repeat(self.value, len(kit) if rows is None else len(rows))
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+class _Binary(Expr):
+    def __init__(self, func: Callable[[Any, Any], Any], symbol: str, left: Any, right: Any) -> None:
+        self.func = func
+        self.symbol = symbol
+        self.left = _wrap(left)
+        self.right = _wrap(right)
+
+    def columns(self) -> List[str]:
+        names = self.left.columns()
+        return names + [c for c in self.right.columns() if c not in names]
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        try:
+            return list(map(self.func, self.left.evaluate(kit, rows), self.right.evaluate(kit, rows)))
+        except TypeError:
+            # Rare mixed/None rows: redo the column pair by pair
+            return list(map(self._safe, self.left.evaluate(kit, rows), self.right.evaluate(kit, rows)))
+
+    def _safe(self, a: Any, b: Any) -> Any:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} {self.symbol} {self.right!r})"
+
+
+class Arithmetic(_Binary):
+    def _safe(self, a: Any, b: Any) -> Any:
+        # None propagates through arithmetic
+        if a is None or b is None:
+            return None
+        return self.func(a, b)
+
+
+_FLIPPED = {"==": "==", "!=": "!=", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+
+
+class Compare(_Binary):
+    def _column_literal(self) -> Optional[Tuple[Column, str, Any]]:
+        # (column, operator, value) for `column <op> literal` in either order
+        left, right, symbol = self.left, self.right, self.symbol
+        if isinstance(left, Literal) and isinstance(right, Column):
+            left, right, symbol = right, left, _FLIPPED[symbol]
+        if not (isinstance(left, Column) and isinstance(right, Literal)):
+            return None
+        return left, symbol, right.value
+
+    def _category_mask(self, kit: "DataKit", rows: Optional[List[int]]) -> Optional[Iterable[Any]]:
+        # Equality on a "category" column is decided on its int codes
+        found = self._column_literal()
+        if found is None or found[1] not in ("==", "!="):
+            return None
+        column = kit._data[kit._col_pos(found[0].name)]
+        if column.dtype != "category":
+            return None
+        return column._category_mask([found[2]], rows, negate=found[1] == "!=")
+
+    def _mask(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        mask = self._category_mask(kit, rows)
+        return mask if mask is not None else self.evaluate(kit, rows)
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        mask = self._category_mask(kit, rows)
+        if mask is not None:
+            return list(map(bool, mask))
+        return super().evaluate(kit, rows)
+
+    def _indexed(self, kit: "DataKit") -> Optional[Tuple[Any, str, Any]]:
+        # (index, operator, value) for `column <op> literal` on an indexed column
+        found = self._column_literal()
+        if found is None:
+            return None
+        column, symbol, value = found
+        index = kit._get_index(column.name)
+        if index is None or not index.supports(symbol):
+            return None
+        return index, symbol, value
+
+    def _can_use_index(self, kit: "DataKit") -> bool:
+        return self._indexed(kit) is not None
+
+    def _index_rows(self, kit: "DataKit") -> Optional[List[int]]:
+        found = self._indexed(kit)
+        if found is None:
+            return None
+        index, symbol, value = found
+        return index.lookup(symbol, value)
+
+    def _safe(self, a: Any, b: Any) -> bool:
+        # Incomparable pairs (e.g. None < 5) do not match instead of aborting the filter
+        try:
+            return bool(self.func(a, b))
+        except TypeError:
+            return False
+
+
+class IsIn(Expr):
+    def __init__(self, expr: Expr, values: Iterable[Any]) -> None:
+        self.expr = expr
+        self.values = list(values)
+
+    def columns(self) -> List[str]:
+        return self.expr.columns()
+
+    def _category_mask(self, kit: "DataKit", rows: Optional[List[int]]) -> Optional[Iterable[Any]]:
+        if not isinstance(self.expr, Column):
+            return None
+        column = kit._data[kit._col_pos(self.expr.name)]
+        if column.dtype != "category":
+            return None
+        return column._category_mask(self.values, rows)
+
+    def _mask(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        mask = self._category_mask(kit, rows)
+        return mask if mask is not None else self.evaluate(kit, rows)
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        mask = self._category_mask(kit, rows)
+        if mask is not None:
+            return list(map(bool, mask))
+        return list(map(frozenset(self.values).__contains__, self.expr.evaluate(kit, rows)))
+
+    def _can_use_index(self, kit: "DataKit") -> bool:
+        return isinstance(self.expr, Column) and kit._get_index(self.expr.name) is not None
+
+    def _index_rows(self, kit: "DataKit") -> Optional[List[int]]:
+        if not self._can_use_index(kit):
+            return None
+        return kit._get_index(self.expr.name).lookup_many(self.values)
+
+    def __repr__(self) -> str:
+        return f"{self.expr!r}.isin({self.values!r})"
+
+
+class IsNull(Expr):
+    def __init__(self, expr: Expr, negate: bool = False) -> None:
+        self.expr = expr
+        self.negate = negate
+
+    def columns(self) -> List[str]:
+        return self.expr.columns()
+
+    def _mask(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        # Columns answer from their validity masks without decoding any value
+        if not isinstance(self.expr, Column):
+            return self.evaluate(kit, rows)
+        column = kit._data[kit._col_pos(self.expr.name)]
+        if rows is not None:
+            column = column.take(rows)
+        return column._null_mask(self.negate)
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        if isinstance(self.expr, Column):
+            return list(map(bool, self._mask(kit, rows)))
+        negate = self.negate
+        return [(value is None) != negate for value in self.expr.evaluate(kit, rows)]
+
+    def __repr__(self) -> str:
+        return f"{self.expr!r}.{'is_not_null' if self.negate else 'is_null'}()"
+
+
+class And(Expr):
+    def __init__(self, left: Expr, right: Expr) -> None:
+        self.left = left
+        self.right = right
+
+    def columns(self) -> List[str]:
+        names = self.left.columns()
+        return names + [c for c in self.right.columns() if c not in names]
+
+    def selection(self, kit: "DataKit", rows: Optional[List[int]] = None) -> List[int]:
+        # The second side only looks at the rows the first side kept; an indexed side goes first
+        if rows is None:
+            hits = _index_range(kit, self.left, self.right)
+            if hits is not None:
+                return hits
+
+        first, second = self.left, self.right
+        if rows is None and not first._can_use_index(kit) and second._can_use_index(kit):
+            first, second = second, first
+        return second.selection(kit, first.selection(kit, rows))
+
+    def _can_use_index(self, kit: "DataKit") -> bool:
+        return self.left._can_use_index(kit) or self.right._can_use_index(kit)
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        return list(map(operator.and_, map(bool, self.left.evaluate(kit, rows)), map(bool, self.right.evaluate(kit, rows))))
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} & {self.right!r})"
+
+
+def _index_range(kit: "DataKit", left: Expr, right: Expr) -> Optional[List[int]]:
+    # `lo <= col` & `col < hi` on a sorted index becomes a single range lookup
+    if not (isinstance(left, Compare) and isinstance(right, Compare)):
+        return None
+    a, b = left._indexed(kit), right._indexed(kit)
+    if a is None or b is None or a[0] is not b[0] or a[0].kind != "sorted":
+        return None
+
+    bounds = {}
+    for _, symbol, value in (a, b):
+        if symbol in (">", ">="):
+            bounds["lower"] = (value, symbol == ">=")
+        elif symbol in ("<", "<="):
+            bounds["upper"] = (value, symbol == "<=")
+    if len(bounds) != 2:
+        return None
+    return a[0].range(**bounds)
+
+
+class Or(And):
+    def selection(self, kit: "DataKit", rows: Optional[List[int]] = None) -> List[int]:
+        return Expr.selection(self, kit, rows)
+
+    def _can_use_index(self, kit: "DataKit") -> bool:
+        return False
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        return list(map(operator.or_, map(bool, self.left.evaluate(kit, rows)), map(bool, self.right.evaluate(kit, rows))))
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} | {self.right!r})"
+
+
+class Not(Expr):
+    def __init__(self, expr: Expr) -> None:
+        self.expr = expr
+
+    def columns(self) -> List[str]:
+        return self.expr.columns()
+
+    def evaluate(self, kit: "DataKit", rows: Optional[List[int]] = None) -> Iterable[Any]:
+        return list(map(operator.not_, self.expr.evaluate(kit, rows)))
+
+    def __repr__(self) -> str:
+        return f"~{self.expr!r}"
+
+
+def col(name: str) -> Column:
+    return Column(name)
+
+
+def lit(value: Any) -> Literal:
+    return Literal(value)
@@ -0,0 +1,199 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Secondary indexes map column values to row positions. Lookups return the matching
+# positions in ascending row order, i.e. a selection vector like a scan would produce.
+# None values are kept apart: they only ever match an equality lookup for None.
+
+INDEX_KINDS = ("hash", "sorted")
+
+
+class _Index:
+    kind = ""
+    operators: tuple = ()
+
+    def __init__(self, values: Iterable[Any]) -> None:
+        self.nulls: List[int] = []
+        self.stale = False
+        self.build(values)
+
+    def build(self, values: Iterable[Any]) -> None:
+        raise NotImplementedError
+
+    def add(self, value: Any, row: int) -> None:
+        raise NotImplementedError
+
+    def remove(self, value: Any, row: int) -> None:
+        raise NotImplementedError
+
+    def lookup(self, op: str, value: Any) -> Optional[List[int]]:
+        raise NotImplementedError
+
+    def extend(self, values: Iterable[Any], start: int) -> None:
+        # Rows appended at positions start, start + 1, ...; rebuilt lazily by default
+        self.stale = True
+
+    def supports(self, op: str) -> bool:
+        return op in self.operators
+
+    def lookup_many(self, values: Iterable[Any]) -> Optional[List[int]]:
+        rows: List[int] = []
+        for value in set(values):
+            found = self.lookup("==", value)
+            if found is None:
+                # One literal the index cannot answer for: let the scan decide them all
+                return None
+            rows.extend(found)
+        rows.sort()
+        return rows
+
+    def __repr__(self) -> str:
+        return f"<{self.kind} index>"
+
+
+class HashIndex(_Index):
+    kind = "hash"
+    operators = ("==",)
+
+    def build(self, values: Iterable[Any]) -> None:
+        table: Dict[Hashable, List[int]] = {}
+        nulls: List[int] = []
+        try:
+            for row, value in enumerate(values):
+                if value is None:
+                    nulls.append(row)
+                else:
+                    table.setdefault(value, []).append(row)
+        except TypeError:
+            # Unhashable values: the index stays stale and filters scan instead
+            self.table, self.nulls = {}, []
+            self.stale = True
+            return
+        self.table = table
+        self.nulls = nulls
+        self.stale = False
+
+    def add(self, value: Any, row: int) -> None:
+        try:
+            insort(self.nulls if value is None else self.table.setdefault(value, []), row)
+        except TypeError:
+            self.stale = True
+
+    def extend(self, values: Iterable[Any], start: int) -> None:
+        # New rows come after all existing ones, so plain appends keep the lists sorted
+        table = self.table
+        try:
+            for row, value in enumerate(values, start):
+                if value is None:
+                    self.nulls.append(row)
+                else:
+                    table.setdefault(value, []).append(row)
+        except TypeError:
+            self.stale = True
+
+    def remove(self, value: Any, row: int) -> None:
+        if value is None:
+            self.nulls.remove(row)
+            return
+        rows = self.table[value]
+        rows.remove(row)
+        if not rows:
+            del self.table[value]
+
+    def lookup(self, op: str, value: Any) -> Optional[List[int]]:
+        if op != "==":
+            return None
+        if value is None:
+            return list(self.nulls)
+        try:
+            return list(self.table.get(value, ()))
+        except TypeError:
+            # Unhashable literal: let the scan decide
+            return None
+
+
+class SortedIndex(_Index):
+    kind = "sorted"
+    operators = ("==", "<", "<=", ">", ">=")
+
+    def build(self, values: Iterable[Any]) -> None:
+        values = list(values)
+        # sorted() is stable, so equal keys keep their row order
+        try:
+            rows = sorted((row for row, value in enumerate(values) if value is not None), key=values.__getitem__)
+        except TypeError:
+            # Values that do not compare with each other cannot be kept in order; the
+            # index stays stale and filters scan until the column can be sorted again
+            self.keys, self.rows, self.nulls = [], [], []
+            self.stale = True
+            return
+        self.keys = [values[row] for row in rows]
+        self.rows = rows
+        self.nulls = [row for row, value in enumerate(values) if value is None]
+        self.stale = False
+
+    def _position(self, value: Any, row: int) -> int:
+        lo = bisect_left(self.keys, value)
+        hi = bisect_right(self.keys, value, lo)
+        return bisect_left(self.rows, row, lo, hi)
+
+    def add(self, value: Any, row: int) -> None:
+        if value is None:
+            insort(self.nulls, row)
+            return
+        try:
+            pos = self._position(value, row)
+        except TypeError:
+            # Not comparable with the keys (e.g. text in an int column): rebuild lazily
+            self.stale = True
+            return
+        self.keys.insert(pos, value)
+        self.rows.insert(pos, row)
+
+    def remove(self, value: Any, row: int) -> None:
+        if value is None:
+            self.nulls.remove(row)
+            return
+        pos = self._position(value, row)
+        del self.keys[pos]
+        del self.rows[pos]
+
+    def lookup(self, op: str, value: Any) -> Optional[List[int]]:
+        if op not in self.operators:
+            return None
+        if value is None:
+            return list(self.nulls) if op == "==" else []
+        if op == "==":
+            try:
+                lo, hi = bisect_left(self.keys, value), bisect_right(self.keys, value)
+            except TypeError:
+                return None
+            return self.rows[lo:hi]
+        if op in ("<", "<="):
+            return self.range(upper=(value, op == "<="))
+        return self.range(lower=(value, op == ">="))
+
+    def range(
+        self,
+        lower: Optional[Tuple[Any, bool]] = None,
+        upper: Optional[Tuple[Any, bool]] = None,
+    ) -> Optional[List[int]]:
+        # Bounds are (value, inclusive) pairs; None means unbounded
+        if (lower is not None and lower[0] is None) or (upper is not None and upper[0] is None):
+            return []
+        keys = self.keys
+        try:
+            lo = 0 if lower is None else (bisect_left if lower[1] else bisect_right)(keys, lower[0])
+            hi = len(keys) if upper is None else (bisect_right if upper[1] else bisect_left)(keys, upper[0])
+        except TypeError:
+            # A literal that does not compare with the keys: let the scan decide
+            return None
+        return sorted(self.rows[lo:hi]) if lo < hi else []
+
+
+def create_index(values: Iterable[Any], kind: str = "hash") -> _Index:
+    if kind == "hash":
+        return HashIndex(values)
+    if kind == "sorted":
+        return SortedIndex(values)
+    raise ValueError(f"Unknown index kind '{kind}', expected one of {INDEX_KINDS}")
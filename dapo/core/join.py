@@ -0,0 +1,124 @@
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from ..core.data_column import DataColumn
+
+JOIN_TYPES = ("inner", "left", "right", "outer")
+
+
+def _key_list(key_columns: Sequence[Sequence[Any]]) -> List[Hashable]:
+    if len(key_columns) == 1:
+        return list(key_columns[0])
+    return list(zip(*key_columns))
+
+
+def _is_null_key(key: Hashable) -> bool:
+    # Like SQL, keys containing None never match anything
+    return key is None or (type(key) is tuple and None in key)
+
+
+def build_table(keys: List[Hashable]) -> Dict[Hashable, List[int]]:
+    table: Dict[Hashable, List[int]] = {}
+    for row, key in enumerate(keys):
+        if not _is_null_key(key):
+            table.setdefault(key, []).append(row)
+    return table
+
+
+def _probe(
+    table: Dict[Hashable, List[int]],
+    probe_keys: List[Hashable],
+    keep_unmatched: bool,
+) -> Tuple[List[int], List[Optional[int]]]:
+    # Returns (probe rows, build rows) in probe order; unmatched probe rows pair with None
+    probe_idx: List[int] = []
+    build_idx: List[Optional[int]] = []
+    for row, hits in enumerate(map(table.get, probe_keys)):
+        if hits is None:
+            if keep_unmatched:
+                probe_idx.append(row)
+                build_idx.append(None)
+            continue
+        if len(hits) == 1:
+            probe_idx.append(row)
+            build_idx.append(hits[0])
+        else:
+            probe_idx.extend([row] * len(hits))
+            build_idx.extend(hits)
+    return probe_idx, build_idx
+
+
+def _unmatched(n_rows: int, matched: List[Optional[int]]) -> List[int]:
+    seen = bytearray(n_rows)
+    for row in matched:
+        if row is not None:
+            seen[row] = 1
+    return [row for row in range(n_rows) if not seen[row]]
+
+
+def join_indices(
+    left_keys: Sequence[Sequence[Any]],
+    right_keys: Sequence[Sequence[Any]],
+    how: str = "inner",
+    left_table: Optional[Dict[Hashable, List[int]]] = None,
+    right_table: Optional[Dict[Hashable, List[int]]] = None,
+) -> Tuple[List[Optional[int]], List[Optional[int]]]:
+    # Row index vectors for both sides of the join; None marks a missing partner row.
+    # Output order: inner/left/outer follow the left rows (outer appends unmatched right
+    # rows at the end), right follows the right rows.
+    # A prebuilt table (e.g. from a hash index) picks the build side and is used as is.
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unknown join type '{how}', expected one of {JOIN_TYPES}")
+
+    lk = _key_list(left_keys)
+    rk = _key_list(right_keys)
+    n_left, n_right = len(lk), len(rk)
+
+    if right_table is not None or (left_table is None and n_right <= n_left):
+        # Build on the right side, probe with the left rows (already in left order)
+        if right_table is None:
+            right_table = build_table(rk)
+        left_idx, right_idx = _probe(right_table, lk, keep_unmatched=how in ("left", "outer"))
+        if how == "right":
+            missing = _unmatched(n_right, right_idx)
+            left_idx.extend([None] * len(missing))
+            right_idx.extend(missing)
+            left_idx, right_idx = _reorder(right_idx, left_idx, right_idx)
+    else:
+        # Build on the left side, probe with the right rows (in right order)
+        if left_table is None:
+            left_table = build_table(lk)
+        right_idx, left_idx = _probe(left_table, rk, keep_unmatched=how == "right")
+        if how in ("left", "outer"):
+            missing = _unmatched(n_left, left_idx)
+            left_idx.extend(missing)
+            right_idx.extend([None] * len(missing))
+        if how != "right":
+            left_idx, right_idx = _reorder(left_idx, left_idx, right_idx)
+
+    if how == "outer":
+        missing = _unmatched(n_right, right_idx)
+        left_idx.extend([None] * len(missing))
+        right_idx.extend(missing)
+
+    return left_idx, right_idx
+
+
+def _reorder(
+    by: List[int],
+    left_idx: List[Optional[int]],
+    right_idx: List[Optional[int]],
+) -> Tuple[List[Optional[int]], List[Optional[int]]]:
+    # Stable sort of the index pairs by one side
+    order = sorted(range(len(by)), key=by.__getitem__)
+    return [left_idx[k] for k in order], [right_idx[k] for k in order]
+
+
+def gather(column: DataColumn, indices: List[Optional[int]]) -> DataColumn:
+    if None not in indices:
+        return column.take(indices)
+    values = column.to_list()
+    return DataColumn._wrap([values[i] if i is not None else None for i in indices])
+
+
+def coalesce(first: DataColumn, second: DataColumn) -> DataColumn:
+    return DataColumn._wrap([a if a is not None else b for a, b in zip(first, second)])
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..core.datakit import DataKit
+from ..core.expressions import Expr
+from ..core.stats import ColumnStats
+from ..utils.csv_utils import write_csv
+
+Predicate = Expr | Callable[[Dict[str, Any]], bool]
+
+
+def predicate_columns(predicate: Any) -> Optional[List[str]]:
+    # Columns a predicate reads, or None for an opaque callable that may read any of them
+    if isinstance(predicate, Expr):
+        return predicate.columns()
+    return None
+
+
+def predicate_name(predicate: Any) -> str:
+    if isinstance(predicate, Expr):
+        return repr(predicate)
+    return getattr(predicate, "__name__", None) or repr(predicate)
+
+
+class CsvScan:
+    def __init__(
+        self,
+        path: str,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.path = path
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.dtypes = dtypes or {}
+
+    def scan(self, columns: Optional[List[str]], batch_size: int) -> Iterator[DataKit]:
+        # dtypes of columns that the plan does not read are left out with them
+        dtypes = {name: dtype for name, dtype in self.dtypes.items() if columns is None or name in columns}
+        return DataKit.iter_csv_batches(
+            self.path,
+            batch_size=batch_size,
+            delimiter=self.delimiter,
+            encoding=self.encoding,
+            usecols=columns,
+            dtypes=dtypes,
+        )
+
+    def __str__(self) -> str:
+        return f"SCAN CSV '{self.path}'"
+
+
+class KitScan:
+    def __init__(self, kit: DataKit) -> None:
+        self.kit = kit
+
+    def scan(self, columns: Optional[List[str]], batch_size: int) -> Iterator[DataKit]:
+        yield self.kit.select(columns) if columns is not None else self.kit
+
+    def __str__(self) -> str:
+        return f"SCAN DataKit(n_rows={self.kit.n_rows}, n_cols={self.kit.n_cols})"
+
+
+@dataclass
+class ScanPlan:
+    # Everything the source does while scanning, plus the operations left for afterwards
+    columns: Optional[List[str]] = None
+    filters: List[Predicate] = field(default_factory=list)
+    # Per filter, the columns visible where it was written (None: all of them)
+    filter_views: List[Optional[List[str]]] = field(default_factory=list)
+    output: Optional[List[str]] = None
+    limit: Optional[int] = None
+    residual: List[Tuple[str, Any]] = field(default_factory=list)
+
+
+class LazyKit:
+    def __init__(self, source: Any, ops: Optional[List[Tuple[str, Any]]] = None) -> None:
+        self._source = source
+        self._ops: List[Tuple[str, Any]] = list(ops) if ops else []
+
+    def _with(self, op: str, arg: Any) -> "LazyKit":
+        return LazyKit(self._source, self._ops + [(op, arg)])
+
+    # PLAN BUILDING
+    def filter(self, condition: Predicate) -> "LazyKit":
+        return self._with("filter", condition)
+
+    def select(self, columns: List[str]) -> "LazyKit":
+        return self._with("select", list(columns))
+
+    def head(self, n: int = 5) -> "LazyKit":
+        return self._with("head", n)
+
+    # OPTIMIZER
+    def _optimize(self) -> ScanPlan:
+        # Filters and selects up to the first head are folded into the scan: filters run on
+        # each batch as it is read, and only the columns that survive or that a filter can
+        # read are parsed and type-inferred.
+        plan = ScanPlan()
+        visible: Optional[List[str]] = None
+        needed: Optional[List[str]] = []
+
+        k = 0
+        for op, arg in self._ops:
+            if op == "filter":
+                cols = predicate_columns(arg)
+                if cols is not None and visible is not None:
+                    # As in eager code, a filter after a select only sees the selected columns
+                    for name in cols:
+                        if name not in visible:
+                            raise KeyError(f"Unknown column '{name}'")
+                if cols is None:
+                    cols = visible
+                if cols is None:
+                    needed = None
+                elif needed is not None:
+                    needed.extend(c for c in cols if c not in needed)
+                plan.filters.append(arg)
+                plan.filter_views.append(visible)
+            elif op == "select":
+                if visible is not None:
+                    for name in arg:
+                        if name not in visible:
+                            raise KeyError(f"Unknown column '{name}'")
+                visible = arg
+            else:
+                break
+            k += 1
+
+        rest = self._ops[k:]
+        if rest and rest[0][0] == "head":
+            plan.limit = rest[0][1]
+            rest = rest[1:]
+        plan.residual = rest
+
+        plan.output = visible
+        if visible is not None and needed is not None:
+            plan.columns = visible + [c for c in needed if c not in visible]
+        return plan
+
+    def explain(self) -> str:
+        lines = ["== Logical plan =="]
+        lines += _tree([_describe(op, arg) for op, arg in reversed(self._ops)] + [str(self._source)])
+
+        plan = self._optimize()
+        nodes = [_describe(op, arg) for op, arg in reversed(plan.residual)]
+        if plan.limit is not None:
+            nodes.append(f"HEAD {plan.limit}")
+        if plan.output is not None and plan.output != plan.columns:
+            nodes.append(f"SELECT {plan.output}")
+        scan = str(self._source)
+        scan += f" columns={plan.columns if plan.columns is not None else '*'}"
+        if plan.filters:
+            scan += f" filters=[{', '.join(predicate_name(p) for p in plan.filters)}]"
+        nodes.append(scan)
+
+        lines.append("== Optimized plan ==")
+        lines += _tree(nodes)
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return self.explain()
+
+    # EXECUTION
+    def _scan_batches(self, plan: ScanPlan, batch_size: int) -> Iterator[DataKit]:
+        remaining = plan.limit
+        for batch in self._source.scan(plan.columns, batch_size):
+            for predicate, view in zip(plan.filters, plan.filter_views):
+                if view is not None and not isinstance(predicate, Expr) and view != batch.columns:
+                    # A row function runs ahead of the select it followed, but only sees
+                    # the columns that select kept
+                    batch = batch._take_rows(batch.select(view)._select_rows(predicate))
+                else:
+                    batch = batch.filter(predicate)
+            if plan.output is not None and plan.output != batch.columns:
+                batch = batch.select(plan.output)
+            if remaining is not None:
+                if len(batch) >= remaining:
+                    yield batch.head(remaining)
+                    return
+                remaining -= len(batch)
+            yield batch
+
+    def iter_batches(self, batch_size: int = 65536) -> Iterator[DataKit]:
+        plan = self._optimize()
+        if plan.residual:
+            yield self.collect(batch_size)
+            return
+        yield from self._scan_batches(plan, batch_size)
+
+    def collect(self, batch_size: int = 65536) -> DataKit:
+        plan = self._optimize()
+        kit = DataKit.concat(self._scan_batches(plan, batch_size))
+        for op, arg in plan.residual:
+            kit = getattr(kit, op)(arg)
+        return kit
+
+    def describe(self, batch_size: int = 65536) -> DataKit:
+        # Per-batch statistics are merged, so the whole input is never held in memory
+        names: List[str] = []
+        totals: List[ColumnStats] = []
+        for batch in self.iter_batches(batch_size):
+            if not totals:
+                names = batch.columns
+                totals = [ColumnStats() for _ in names]
+            for total, col in zip(totals, batch._data):
+                total.merge(ColumnStats.from_values(col))
+        return DataKit._describe_table(names, [total.to_dict() for total in totals])
+
+    def to_csv(
+        self,
+        path: str,
+        delimiter: str = ",",
+        encoding: str = "utf-8",
+        newline: str = "\n",
+        batch_size: int = 65536,
+    ) -> None:
+        batches = self.iter_batches(batch_size)
+        first = next(batches, None)
+        if first is None:
+            DataKit().to_csv(path, delimiter=delimiter, encoding=encoding, newline=newline)
+            return
+
+        rows = chain.from_iterable(zip(*batch._data) for batch in chain([first], batches))
+        write_csv(path, first.columns, rows, delimiter=delimiter, encoding=encoding, newline=newline)
+
+
+def _describe(op: str, arg: Any) -> str:
+    if op == "filter":
+        return f"FILTER {predicate_name(arg)}"
+    if op == "select":
+        return f"SELECT {arg}"
+    return f"{op.upper()} {arg}"
+
+
+def _tree(nodes: List[str]) -> List[str]:
+    return ["  " * depth + node for depth, node in enumerate(nodes)]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import mmap
+import weakref
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from ..core.data_column import DataColumn
+from ..core.datakit import DataKit
+from ..core.datakit import _text_column
+from ..utils.csv_utils import (
+    build_record_index,
+    load_record_index,
+    parse_csv_bytes,
+    parse_csv_line,
+    parse_csv_records,
+    save_record_index,
+    sniff_delimiter,
+)
+from ..utils.schema_utils import INFER_ROWS, TextSchema
+
+
+def _release(mm: Optional[mmap.mmap], file: IO[bytes]) -> None:
+    if mm is not None:
+        mm.close()
+    file.close()
+
+
+class MappedCsvKit(DataKit):
+    # A DataKit over a memory-mapped CSV file. Rows are decoded on demand through
+    # get_row / iter_rows / head / tail; any other operation loads the full table once.
+    _ITER_BLOCK = 4096
+
+    def __init__(
+        self,
+        path: str,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8",
+        index_path: Optional[str] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+        categorize: bool = True,
+    ) -> None:
+        self._path = path
+        self._encoding = encoding
+        self._delimiter = delimiter if delimiter is not None else sniff_delimiter(path)
+        self._categorize_on_load = categorize
+        self._category_pos: List[int] = []
+        self._loaded: Optional[List[DataColumn[Any]]] = None
+        self._indexes: Dict[str, Any] = {}
+        self._file = open(path, "rb")
+
+        try:
+            self._mm: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._mm = None
+        # Kits that are never closed release the map and the file when collected
+        self._finalizer = weakref.finalize(self, _release, self._mm, self._file)
+
+        offsets = load_record_index(index_path, path) if index_path else None
+        if offsets is None:
+            offsets = build_record_index(self._mm) if self._mm is not None else None
+            if index_path and offsets is not None:
+                save_record_index(index_path, path, offsets)
+        self._offsets = offsets
+
+        if offsets is None or len(offsets) < 2:
+            self._columns: List[str] = []
+            self._n_rows = 0
+            self._loaded = []
+            return
+
+        header = self._mm[offsets[0]:offsets[1]].decode(encoding).rstrip("\r\n")
+        self._columns = parse_csv_line(header, delimiter=self._delimiter)
+        self._n_rows = len(offsets) - 2
+
+        # Rows decoded on demand are typed like a full load, with a schema from the first rows
+        sample = self._mm[offsets[1]:offsets[min(INFER_ROWS, self._n_rows) + 1]]
+        records = list(parse_csv_records(sample, self._delimiter, n_cols=len(self._columns), encoding=encoding))
+        self._schema = TextSchema.infer(self._columns, records, dtypes)
+
+        if categorize:
+            # Rows decoded on demand cannot see the whole column; they are stored as
+            # "category" where the first rows would be
+            self._category_pos = [
+                pos for pos, texts in enumerate(zip(*records))
+                if _text_column(self._schema, pos, self._schema.convert_column(pos, list(texts)))._auto_category().dtype == "category"
+            ]
+
+    @property
+    def _data(self) -> List[DataColumn[Any]]:
+        if self._loaded is None:
+            # The same column types as from_csv: typed by the schema, then categorized
+            rows = self._decode(0, self._n_rows)
+            texts = list(zip(*rows)) or [() for _ in self._columns]
+            self._loaded = [_text_column(self._schema, pos, list(col)) for pos, col in enumerate(texts)]
+            if self._categorize_on_load:
+                self._categorize()
+        return self._loaded
+
+    @_data.setter
+    def _data(self, value: List[DataColumn[Any]]) -> None:
+        self._loaded = value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded is not None
+
+    def load(self) -> "MappedCsvKit":
+        self._data
+        return self
+
+    def close(self) -> None:
+        self._finalizer()
+        self._mm = None
+
+    def __enter__(self) -> "MappedCsvKit":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _decode(self, start: int, stop: int) -> List[List[Any]]:
+        if start >= stop:
+            return []
+        if self._mm is None:
+            raise ValueError("Cannot read rows from a closed MappedCsvKit")
+        # offsets[0] is the header, so data row i starts at offsets[i + 1]
+        data = self._mm[self._offsets[start + 1]:self._offsets[stop + 1]]
+        return list(parse_csv_bytes(
+            data, self._delimiter, n_cols=len(self._columns), encoding=self._encoding, schema=self._schema,
+        ))
+
+    def _to_kit(self, rows: List[List[Any]]) -> DataKit:
+        texts = list(zip(*rows)) or [() for _ in self._columns]
+        cols_data = [_text_column(self._schema, pos, list(col)) for pos, col in enumerate(texts)]
+        for pos in self._category_pos:
+            if cols_data[pos].dtype == "object":
+                cols_data[pos] = DataColumn(cols_data[pos], dtype="category")
+        return DataKit(_data=cols_data, _columns=list(self._columns), _n_rows=len(rows))
+
+    # ACCESS
+    def get_row(self, index: int) -> Dict[str, Any]:
+        if self._loaded is not None:
+            return super().get_row(index)
+
+        self._check_row_index(index)
+        return dict(zip(self._columns, self._decode(index, index + 1)[0]))
+
+    def iter_rows(self, max_amount: int | None = None) -> Iterator[Dict[str, Any]]:
+        if self._loaded is not None:
+            yield from super().iter_rows(max_amount)
+            return
+
+        rows_range = max_amount if max_amount != None and max_amount < self._n_rows else self._n_rows
+        for start in range(0, rows_range, self._ITER_BLOCK):
+            for row in self._decode(start, min(start + self._ITER_BLOCK, rows_range)):
+                yield dict(zip(self._columns, row))
+
+    def head(self, n: int = 5) -> DataKit:
+        if self._loaded is not None:
+            return super().head(n)
+
+        n = max(0, min(n, self._n_rows))
+        return self._to_kit(self._decode(0, n))
+
+    def tail(self, n: int = 5) -> DataKit:
+        if self._loaded is not None:
+            return super().tail(n)
+
+        if n <= 0:
+            return DataKit(_columns=list(self._columns))
+        start = max(0, self._n_rows - n)
+        return self._to_kit(self._decode(start, self._n_rows))
@@ -0,0 +1,117 @@
+import heapq
+from typing import Any, Iterable, List, Sequence
+
+# One sort engine for DataColumn and DataKit. Key columns are pulled into plain lists once;
+# a column with nulls (None) is rank-encoded so nulls go first or last regardless of the
+# direction. Row positions are then ordered by stable C-level sorts keyed on those lists
+# (least significant key first), which CPython runs faster than one sort on tuple keys.
+# top_k needs a single comparable key per row, so there descending keys are negated or
+# rank-encoded into one ascending tuple key. "category" columns are never decoded: their
+# int codes are mapped to the rank of their category instead.
+
+NULL_PLACEMENTS = ("first", "last")
+_NUMERIC_DTYPES = ("int64", "float64", "bool")
+
+
+def _check_nulls(nulls: str) -> None:
+    if nulls not in NULL_PLACEMENTS:
+        raise ValueError(f"Unknown null placement '{nulls}', expected one of {NULL_PLACEMENTS}")
+
+
+def _ranks(values: List[Any], descending: bool, nulls: str) -> List[int]:
+    distinct = sorted(set(values) - {None})
+    if descending:
+        distinct.reverse()
+    rank = {v: i for i, v in enumerate(distinct)}
+    null_rank = -1 if nulls == "first" else len(distinct)
+    return [null_rank if v is None else rank[v] for v in values]
+
+
+def _category_keys(col: Any, descending: bool, nulls: str) -> Any:
+    if getattr(col, "dtype", None) == "category":
+        return col._category_ranks(descending, nulls)
+    return None
+
+
+def _encode(values: List[Any], descending: bool, nulls: str, numeric: bool) -> List[Any]:
+    # Keys whose ascending order is the requested order of the column
+    has_nulls = None in values
+    if not has_nulls and not descending:
+        return values
+    if not has_nulls and numeric:
+        return [-v for v in values]
+    return _ranks(values, descending, nulls)
+
+
+def _encode_column(col: Iterable[Any], descending: bool, nulls: str) -> List[Any]:
+    ranks = _category_keys(col, descending, nulls)
+    if ranks is not None:
+        return ranks
+    return _encode(list(col), descending, nulls, getattr(col, "dtype", None) in _NUMERIC_DTYPES)
+
+
+def sort_values(values: Iterable[Any], descending: bool = False, nulls: str = "last") -> List[Any]:
+    _check_nulls(nulls)
+    values = list(values)
+    present = [v for v in values if v is not None]
+    present.sort(reverse=descending)
+    missing = [None] * (len(values) - len(present))
+    return missing + present if nulls == "first" else present + missing
+
+
+def _sort_keys(key_columns: Sequence[Iterable[Any]], descending: Sequence[bool], nulls: str) -> List[Any]:
+    _check_nulls(nulls)
+    if len(key_columns) != len(descending):
+        raise ValueError("Length of 'columns' and 'reverse' must match")
+    encoded = [_encode_column(col, desc, nulls) for col, desc in zip(key_columns, descending)]
+    if len(encoded) == 1:
+        return encoded[0]
+    return list(zip(*encoded))
+
+
+def argsort(key_columns: Sequence[Iterable[Any]], descending: Sequence[bool], nulls: str = "last") -> List[int]:
+    # Stable: rows with equal keys keep their original order
+    if not key_columns:
+        raise ValueError("At least one sort key is required")
+    _check_nulls(nulls)
+    if len(key_columns) != len(descending):
+        raise ValueError("Length of 'columns' and 'reverse' must match")
+
+    order: List[int] = []
+    for i, (col, desc) in enumerate(zip(reversed(key_columns), reversed(descending))):
+        ranks = _category_keys(col, desc, nulls)
+        if ranks is not None:
+            values, desc = ranks, False
+        else:
+            values = list(col)
+            if None in values:
+                values, desc = _ranks(values, desc, nulls), False
+        if i == 0:
+            order = sorted(range(len(values)), key=values.__getitem__, reverse=desc)
+        else:
+            order.sort(key=values.__getitem__, reverse=desc)
+    return order
+
+
+def top_k(
+    key_columns: Sequence[Iterable[Any]],
+    k: int,
+    descending: Sequence[bool],
+    nulls: str = "last",
+) -> List[int]:
+    # The first k positions of argsort(), found with a bounded heap instead of a full sort
+    if not key_columns:
+        raise ValueError("At least one sort key is required")
+    if k <= 0:
+        _check_nulls(nulls)
+        return []
+
+    if len(key_columns) == 1 and len(descending) == 1:
+        _check_nulls(nulls)
+        values = list(key_columns[0])
+        if None not in values:
+            pick = heapq.nlargest if descending[0] else heapq.nsmallest
+            return pick(k, range(len(values)), key=values.__getitem__)
+
+    keys = _sort_keys(key_columns, descending, nulls)
+    return heapq.nsmallest(k, range(len(keys)), key=keys.__getitem__)
@@ -0,0 +1,176 @@
+import random
+from dataclasses import dataclass
+from math import floor, fsum
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..utils.io_utils import iter_chunks
+
+# Order statistics without sorting the caller's data. A single quantile uses quickselect
+# (expected O(n)) on a scratch copy; several quantiles share one sort of that copy.
+# Quantiles interpolate linearly between the two nearest ranks (like numpy's default).
+# None values are ignored.
+
+
+def _check_quantile(q: float) -> None:
+    if not 0 <= q <= 1:
+        raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+
+
+def _select_pair(values: List[Any], k: int) -> Tuple[Any, Any]:
+    # The k-th and (k+1)-th smallest values (0-based); the second is None if k is the last
+    while True:
+        pivot = values[random.randrange(len(values))]
+        less = [v for v in values if v < pivot]
+        if k < len(less):
+            if k + 1 == len(less):
+                return max(less), pivot
+            values = less
+            continue
+
+        greater = [v for v in values if v > pivot]
+        n_upto = len(values) - len(greater)
+        if k < n_upto:
+            if k + 1 < n_upto:
+                return pivot, pivot
+            return pivot, min(greater) if greater else None
+
+        k -= n_upto
+        values = greater
+
+
+def _interpolate(low: Any, high: Any, frac: float) -> Any:
+    if frac == 0 or high is None or low == high:
+        return low
+    return low + (high - low) * frac
+
+
+def quantile(values: Iterable[Any], q: float) -> Any:
+    _check_quantile(q)
+    present = [v for v in values if v is not None]
+    if not present:
+        return None
+
+    pos = q * (len(present) - 1)
+    k = floor(pos)
+    low, high = _select_pair(present, k)
+    return _interpolate(low, high, pos - k)
+
+
+def quantiles(values: Iterable[Any], qs: Sequence[float]) -> List[Optional[Any]]:
+    for q in qs:
+        _check_quantile(q)
+    present = sorted(v for v in values if v is not None)
+    if not present:
+        return [None] * len(qs)
+
+    n = len(present)
+    result = []
+    for q in qs:
+        pos = q * (n - 1)
+        k = floor(pos)
+        high = present[k + 1] if k + 1 < n else None
+        result.append(_interpolate(present[k], high, pos - k))
+    return result
+
+
+# Streaming summary statistics. Values are consumed in chunks: each chunk's count, min,
+# max, sum and squared deviations from its own mean are computed with builtins (fsum for
+# exactly rounded sums), then folded into the running totals with the pairwise update of
+# Chan et al. The same update merges two ColumnStats, so partial results from batches or
+# workers can be combined.
+STATS_CHUNK = 65536
+
+
+@dataclass
+class ColumnStats:
+    count: int = 0
+    nulls: int = 0
+    mean: Optional[float] = None
+    m2: Optional[float] = None
+    min: Any = None
+    max: Any = None
+    numeric: bool = True
+    comparable: bool = True
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> "ColumnStats":
+        stats = cls()
+        stats.update(values)
+        return stats
+
+    def update(self, values: Iterable[Any]) -> "ColumnStats":
+        for chunk in iter_chunks(values, STATS_CHUNK):
+            present = [v for v in chunk if v is not None] if None in chunk else chunk
+            self.nulls += len(chunk) - len(present)
+            if present:
+                self._add_chunk(present)
+        return self
+
+    def _add_chunk(self, present: List[Any]) -> None:
+        other = ColumnStats(count=len(present), numeric=self.numeric, comparable=self.comparable)
+        if other.comparable:
+            try:
+                other.min, other.max = min(present), max(present)
+            except TypeError:
+                other.comparable = False
+        if other.numeric:
+            try:
+                mean = fsum(present) / len(present)
+                other.m2 = fsum((v - mean) * (v - mean) for v in present)
+                other.mean = mean
+            except TypeError:
+                other.numeric = False
+        self.merge(other)
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        n_a, n_b = self.count, other.count
+        self.nulls += other.nulls
+        self.numeric = self.numeric and other.numeric
+        self.comparable = self.comparable and other.comparable
+
+        if not self.numeric:
+            self.mean = self.m2 = None
+        elif n_b and not n_a:
+            self.mean, self.m2 = other.mean, other.m2
+        elif n_b:
+            n = n_a + n_b
+            delta = other.mean - self.mean
+            self.mean += delta * n_b / n
+            self.m2 += other.m2 + delta * delta * n_a * n_b / n
+
+        if not self.comparable:
+            self.min = self.max = None
+        elif n_b and not n_a:
+            self.min, self.max = other.min, other.max
+        elif n_b:
+            try:
+                self.min = min(self.min, other.min)
+                self.max = max(self.max, other.max)
+            except TypeError:
+                self.comparable = False
+                self.min = self.max = None
+
+        self.count = n_a + n_b
+        return self
+
+    @property
+    def var(self) -> Optional[float]:
+        # Sample variance (ddof=1), like group_by's "var"
+        if self.m2 is None or self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> Optional[float]:
+        var = self.var
+        return var ** 0.5 if var is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "nulls": self.nulls,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+        }
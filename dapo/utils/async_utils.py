@@ -0,0 +1,41 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, TypeVar
+
+# Bridges for the blocking readers and writers: the work runs in an executor, so the
+# event loop keeps serving other tasks while a file is parsed or written.
+
+_T = TypeVar("_T")
+
+_DONE = object()
+
+
+async def run_blocking(func: Callable[..., _T], *args: Any, executor: Optional[Executor] = None, **kwargs: Any) -> _T:
+    # func(*args, **kwargs) in executor (the loop's default thread pool when None)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+async def aiter_blocking(make_iterator: Callable[[], Iterator[_T]]) -> AsyncIterator[_T]:
+    # The items of a blocking iterator, produced on a thread of their own. That thread
+    # works at most one item ahead of the consumer, so at most two items are held at once.
+    loop = asyncio.get_running_loop()
+    worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dapo-aiter")
+    items: Optional[Iterator[_T]] = None
+    try:
+        items = await loop.run_in_executor(worker, make_iterator)
+        pending = loop.run_in_executor(worker, next, items, _DONE)
+        while True:
+            item = await pending
+            if item is _DONE:
+                return
+            pending = loop.run_in_executor(worker, next, items, _DONE)
+            yield item
+    finally:
+        # Queued behind any read-ahead on the same thread, so the iterator (and its
+        # file) is closed without waiting here
+        close = getattr(items, "close", None)
+        if close is not None:
+            worker.submit(close)
+        worker.shutdown(wait=False)
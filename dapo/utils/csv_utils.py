@@ -1,37 +1,87 @@
-from typing import List, Iterable, Iterator, Dict, Optional, Any
+import io
+import mmap
+import os
+from array import array
+from itertools import chain
+from typing import IO, List, Iterable, Iterator, Dict, Optional, Any, Tuple, Union
+
+from dapo.utils.io_utils import WRITE_CHUNK_ROWS, iter_chunks, open_text_output
+from dapo.utils.schema_utils import TextSchema, convert_text_rows
 
 CANDIDATE_DELIMITERS = [",", ";", "\t", "|", ":"]
 
 def parse_csv_line(line: str, delimiter: str = ",", quotechar: str = '"') -> List[str]:
+    # Fast path: without quotes a record is a plain split
+    if quotechar not in line:
+        return list(map(str.strip, line.split(delimiter)))
+
+    # Splitting on the quote char alternates between unquoted and quoted chunks;
+    # only unquoted chunks can contain delimiters
+    chunks = line.split(quotechar)
+    n_chunks = len(chunks)
     fields: List[str] = []
     current: List[str] = []
     in_quotes = False
-    i = 0
-    length = len(line)
+    k = 0
 
-    while i < length:
-        ch = line[i]
+    while k < n_chunks:
+        chunk = chunks[k]
+        if in_quotes:
+            current.append(chunk)
+        elif delimiter in chunk:
+            pieces = chunk.split(delimiter)
+            current.append(pieces[0])
+            fields.append("".join(current))
+            fields.extend(pieces[1:-1])
+            current = [pieces[-1]]
+        else:
+            current.append(chunk)
 
-        if ch == quotechar:
-            if in_quotes and i + 1 < length and line[i + 1] == quotechar:
+        k += 1
+        if k < n_chunks:
+            # A doubled quote inside a quoted region is a literal quote
+            if in_quotes and chunks[k] == "" and k + 1 < n_chunks:
                 current.append(quotechar)
-                i += 2
+                k += 1
+            else:
+                in_quotes = not in_quotes
+
+    fields.append("".join(current))
+    return list(map(str.strip, fields))
+
+def iter_csv_records(
+    lines: Iterable[str],
+    delimiter: str = ",",
+    quotechar: str = '"',
+) -> Iterator[List[str]]:
+    # Joins physical lines while a quoted field is still open, so embedded newlines survive
+    pending: List[str] = []
+    open_quotes = False
+
+    for raw_line in lines:
+        if pending:
+            pending.append(raw_line)
+            if raw_line.count(quotechar) % 2:
+                open_quotes = not open_quotes
+            if open_quotes:
                 continue
-            in_quotes = not in_quotes
-            i += 1
+            line = "".join(pending).rstrip("\n\r")
+            pending = []
+            yield parse_csv_line(line, delimiter=delimiter, quotechar=quotechar)
             continue
 
-        if not in_quotes and ch == delimiter:
-            fields.append("".join(current))
-            current = []
-            i += 1
+        if quotechar in raw_line and raw_line.count(quotechar) % 2:
+            pending.append(raw_line)
+            open_quotes = True
             continue
 
-        current.append(ch)
-        i += 1
+        line = raw_line.rstrip("\n\r")
+        if not line:
+            continue
+        yield parse_csv_line(line, delimiter=delimiter, quotechar=quotechar)
 
-    fields.append("".join(current))
-    return [f.strip() for f in fields]
+    if pending:
+        yield parse_csv_line("".join(pending).rstrip("\n\r"), delimiter=delimiter, quotechar=quotechar)
 
 def sniff_delimiter_from_lines(
     lines: Iterable[str],
@@ -75,59 +125,260 @@ def sniff_delimiter(path: str, max_lines: int = 20) -> str:
     with open(path, "r", encoding="utf-8") as f:
         return sniff_delimiter_from_lines(f, max_lines=max_lines)
 
-def _infer_type(value: str) -> Any:
-    if value == "":
-        return value
-        
-    # Check for booleans
-    if value.lower() == "true":
-        return True
-    if value.lower() == "false":
-        return False
-        
-    # Check for numbers
-    try:
-        if "." in value:
-            return float(value)
-        return int(value)
-    except (ValueError, TypeError):
-        pass
-        
-    return value
+def _fitted_rows(
+    records: Iterable[List[str]],
+    n_cols: Optional[int],
+    positions: Optional[List[int]] = None,
+) -> Iterator[List[str]]:
+    # Fields lined up with the header: projected onto positions, or padded / cut to n_cols
+    if positions is not None:
+        for fields in records:
+            n = len(fields)
+            yield [fields[i] if i < n else "" for i in positions]
+        return
 
-def read_csv(
+    for fields in records:
+        if n_cols is not None:
+            if len(fields) < n_cols:
+                fields += [""] * (n_cols - len(fields))
+            elif len(fields) > n_cols:
+                fields = fields[:n_cols]
+        yield fields
+
+def read_csv_records(
     path: str,
     delimiter: Optional[str] = None,
     has_header: bool = True,
     encoding: str = "utf-8",
-) -> Iterator[Dict[str, Any]]:
+    usecols: Optional[List[str]] = None,
+) -> Iterator[List[str]]:
+    # Yields the header first (when has_header), then the text fields of every record.
+    # With usecols only those fields (in that order) are yielded.
     if delimiter is None:
         delimiter = sniff_delimiter(path)
 
     with open(path, "r", encoding=encoding, newline="") as f:
-        header = None
+        records = iter_csv_records(f, delimiter=delimiter)
+        n_cols = None
+        positions = None
 
-        for raw_line in f:
-            line = raw_line.rstrip("\n\r")
-            if not line:
-                continue
+        if has_header:
+            header = next(records, None)
+            if header is None:
+                return
+            n_cols = len(header)
+            if usecols is not None:
+                positions = []
+                for name in usecols:
+                    if name not in header:
+                        raise KeyError(f"Unknown column '{name}'")
+                    positions.append(header.index(name))
+                header = list(usecols)
+            yield header
+        elif usecols is not None:
+            positions = [int(name) for name in usecols]
+
+        yield from _fitted_rows(records, n_cols, positions)
+
+def read_csv_rows(
+    path: str,
+    delimiter: Optional[str] = None,
+    has_header: bool = True,
+    encoding: str = "utf-8",
+    usecols: Optional[List[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> Iterator[List[Any]]:
+    # Like read_csv_records, with every field converted to its column's dtype
+    records = read_csv_records(path, delimiter=delimiter, has_header=has_header, encoding=encoding, usecols=usecols)
+    if has_header:
+        header = next(records, None)
+        if header is None:
+            return
+        yield header
+        yield from convert_text_rows(header, records, dtypes)
+        return
+
+    # Without a header the columns are numbered, and the first record fixes their count
+    first = next(records, None)
+    if first is None:
+        return
+    names = [str(i) for i in range(len(first))]
+    yield from convert_text_rows(names, _fitted_rows(chain([first], records), len(first)), dtypes)
 
-            fields = parse_csv_line(line, delimiter=delimiter)
+def _count_in_range(mm: mmap.mmap, needle: bytes, start: int, end: int, block_size: int = 1 << 24) -> int:
+    count = 0
+    for pos in range(start, end, block_size):
+        count += mm[pos:min(pos + block_size, end)].count(needle)
+    return count
 
-            if has_header and header is None:
-                header = fields
+def _next_record_start(mm: mmap.mmap, pos: int, quote: bytes, in_quotes: bool) -> int:
+    # First offset after a newline at or past pos that is not inside a quoted field
+    size = len(mm)
+    while pos < size:
+        newline = mm.find(b"\n", pos)
+        if newline == -1:
+            return size
+        if _count_in_range(mm, quote, pos, newline) % 2:
+            in_quotes = not in_quotes
+        pos = newline + 1
+        if not in_quotes:
+            return pos
+    return size
+
+def split_csv_ranges(
+    path: str,
+    n_parts: int,
+    encoding: str = "utf-8",
+    quotechar: str = '"',
+) -> Tuple[int, List[Tuple[int, int]]]:
+    # Returns the byte offset where the data starts (after the header record) and up to
+    # n_parts (start, end) byte ranges that each begin on a record boundary.
+    quote = quotechar.encode(encoding)
+    if "\n".encode(encoding) != b"\n" or len(quote) != 1:
+        raise ValueError(f"Byte-range splitting needs an ASCII-compatible encoding, got '{encoding}'")
+
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0, []
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data_start = 0
+        while data_start < size:
+            header_start = data_start
+            data_start = _next_record_start(mm, header_start, quote, False)
+            if mm[header_start:data_start].strip():
+                break
+
+        bounds = [data_start]
+        for k in range(1, n_parts):
+            target = data_start + (size - data_start) * k // n_parts
+            if target <= bounds[-1]:
                 continue
+            in_quotes = _count_in_range(mm, quote, bounds[-1], target) % 2 == 1
+            boundary = _next_record_start(mm, target, quote, in_quotes)
+            if boundary >= size:
+                break
+            bounds.append(boundary)
 
-            fields = [_infer_type(f) for f in fields]
+    bounds.append(size)
+    ranges = [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+    return data_start, ranges
 
-            if has_header:
-                if len(fields) < len(header):
-                    fields += [""] * (len(header) - len(fields))
-                elif len(fields) > len(header):
-                    fields = fields[:len(header)]
-                yield dict(zip(header, fields))
-            else:
-                yield {str(i): v for i, v in enumerate(fields)}
+def read_csv_range(
+    path: str,
+    start: int,
+    end: int,
+    delimiter: str = ",",
+    n_cols: Optional[int] = None,
+    encoding: str = "utf-8",
+    schema: Optional[TextSchema] = None,
+) -> Iterator[List[Any]]:
+    # Typed rows of the records in [start, end); both offsets must be record boundaries
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    yield from parse_csv_bytes(data, delimiter=delimiter, n_cols=n_cols, encoding=encoding, schema=schema)
+
+def parse_csv_records(
+    data: bytes,
+    delimiter: str = ",",
+    n_cols: Optional[int] = None,
+    encoding: str = "utf-8",
+) -> Iterator[List[str]]:
+    lines = io.StringIO(data.decode(encoding), newline="")
+    yield from _fitted_rows(iter_csv_records(lines, delimiter=delimiter), n_cols)
+
+def parse_csv_bytes(
+    data: bytes,
+    delimiter: str = ",",
+    n_cols: Optional[int] = None,
+    encoding: str = "utf-8",
+    schema: Optional[TextSchema] = None,
+) -> Iterator[List[Any]]:
+    # Typed rows; without a schema the column types are inferred from these rows
+    records = parse_csv_records(data, delimiter=delimiter, n_cols=n_cols, encoding=encoding)
+    if schema is not None:
+        yield from schema.convert_rows(records, first_row=None)
+        return
+    rows = list(records)
+    names = [str(i) for i in range(n_cols if n_cols is not None else len(rows[0]) if rows else 0)]
+    yield from convert_text_rows(names, rows)
+
+INDEX_MAGIC = b"DAPOIDX1"
+
+def build_record_index(
+    mm: mmap.mmap,
+    quotechar: str = '"',
+    block_size: int = 1 << 24,
+) -> array:
+    # Byte offsets of every non-blank record (header included), followed by the file size
+    quote = quotechar.encode("ascii")
+    offsets = array("q")
+    append = offsets.append
+    size = len(mm)
+    in_quotes = False
+    pos = 0
+    tail = b""
+
+    for block_start in range(0, size, block_size):
+        lines = (tail + mm[block_start:block_start + block_size]).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            if in_quotes:
+                if line.count(quote) % 2:
+                    in_quotes = False
+            elif line.strip(b"\r"):
+                append(pos)
+                if quote in line and line.count(quote) % 2:
+                    in_quotes = True
+            pos += len(line) + 1
+
+    if tail.strip(b"\r") and not in_quotes:
+        append(pos)
+    append(size)
+    return offsets
+
+def save_record_index(index_path: str, path: str, offsets: array) -> None:
+    stat = os.stat(path)
+    with open(index_path, "wb") as f:
+        f.write(INDEX_MAGIC)
+        array("q", [stat.st_size, stat.st_mtime_ns, len(offsets)]).tofile(f)
+        offsets.tofile(f)
+
+def load_record_index(index_path: str, path: str) -> Optional[array]:
+    # Returns None when the index is missing or was built for another version of the file
+    if not os.path.exists(index_path):
+        return None
+
+    stat = os.stat(path)
+    with open(index_path, "rb") as f:
+        if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+            return None
+        meta = array("q")
+        meta.fromfile(f, 3)
+        if meta[0] != stat.st_size or meta[1] != stat.st_mtime_ns:
+            return None
+        offsets = array("q")
+        offsets.fromfile(f, meta[2])
+    return offsets
+
+def read_csv(
+    path: str,
+    delimiter: Optional[str] = None,
+    has_header: bool = True,
+    encoding: str = "utf-8",
+    dtypes: Optional[Dict[str, str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    rows = read_csv_rows(path, delimiter=delimiter, has_header=has_header, encoding=encoding, dtypes=dtypes)
+
+    if has_header:
+        header = next(rows, None)
+        for fields in rows:
+            yield dict(zip(header, fields))
+    else:
+        for fields in rows:
+            yield {str(i): v for i, v in enumerate(fields)}
 
 
 def csv_escape(value: str, delimiter: str = ",", quotechar: str = '"') -> str:
@@ -145,23 +396,21 @@ def csv_escape(value: str, delimiter: str = ",", quotechar: str = '"') -> str:
     return value
 
 def write_csv(
-    path: str,
+    path: Union[str, IO],
     columns: List[str],
-    rows: List[List[object]],
+    rows: Iterable[Iterable[object]],
     delimiter: str = ",",
     encoding: str = "utf-8",
     newline: str = "\n",
 ) -> None:
-    with open(path, "w", encoding=encoding, newline="") as f:
+    with open_text_output(path, encoding=encoding) as f:
         header_line = delimiter.join(
             csv_escape(col, delimiter) for col in columns
         )
         f.write(header_line + newline)
 
-        for row in rows:
-            line = delimiter.join(
-                csv_escape(str(v), delimiter) for v in row
-            )
-            f.write(line + newline)
-        
-        f.close()
\ No newline at end of file
+        for chunk in iter_chunks(rows, WRITE_CHUNK_ROWS):
+            f.write("".join(
+                delimiter.join("" if v is None else csv_escape(str(v), delimiter) for v in row) + newline
+                for row in chunk
+            ))
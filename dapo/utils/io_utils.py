@@ -0,0 +1,37 @@
+import io
+from contextlib import contextmanager
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator, List, Union
+
+# Rows buffered in memory before each write to the output
+WRITE_CHUNK_ROWS = 4096
+
+@contextmanager
+def open_text_output(
+    target: Union[str, IO],
+    encoding: str = "utf-8",
+) -> Iterator[IO[str]]:
+    # Paths are opened (and closed) here; file-like objects are written to and left open
+    if not hasattr(target, "write"):
+        with open(target, "w", encoding=encoding, newline="") as f:
+            yield f
+        return
+
+    if isinstance(target, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(target, "mode", ""):
+        wrapper = io.TextIOWrapper(target, encoding=encoding, newline="")
+        try:
+            yield wrapper
+        finally:
+            wrapper.flush()
+            wrapper.detach()
+        return
+
+    yield target
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
@@ -1,3 +1,6 @@
+from dapo.utils.io_utils import WRITE_CHUNK_ROWS, iter_chunks, open_text_output
+
+
 def _skip_ws(s, i):
     while i < len(s) and s[i] in " \t\r\n":
         i += 1
@@ -157,33 +160,115 @@ def _load_json(text):
     return value
 
 
-# ---------- Public reader ----------
-
-def read_json(path, encoding="utf-8"):
+# ---------- Incremental reader ----------
+
+class _JsonStream:
+    # Runs the recursive-descent parser over a sliding window of the file. A value that
+    # runs into the end of the window is re-parsed after more text has been read.
+
+    def __init__(self, f, buffer_size):
+        self.f = f
+        self.buffer_size = buffer_size
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+
+    def read_more(self):
+        if self.eof:
+            return False
+        # Grow the read when a single value does not fit, so huge values stay linear
+        chunk = self.f.read(max(self.buffer_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _skip_ws(self.buf, self.pos)
+            if self.pos < len(self.buf) or not self.read_more():
+                break
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def parse_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _parse_value(self.buf, self.pos)
+            except (ValueError, IndexError):
+                if self.read_more():
+                    continue
+                raise
+            # A number or literal ending exactly at the window edge may continue
+            if end >= len(self.buf) and self.read_more():
+                continue
+            self.pos = end
+            return value
+
+    def error(self, message):
+        return ValueError("{} at position {}".format(message, self.offset + self.pos))
+
+    def iter_array(self):
+        # self.buf[self.pos] == '['
+        self.pos += 1
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.parse_value()
+            ch = self.peek()
+            if ch == ",":
+                self.pos += 1
+                continue
+            if ch == "]":
+                self.pos += 1
+                return
+            raise self.error("Expected ',' or ']' in array")
+
+    def iter_records(self):
+        ch = self.peek()
+
+        # Case 1: straight list of objects
+        if ch == "[":
+            yield from self.iter_array()
+            return
+
+        # Case 2: { "data": [ ... ] }, other keys are parsed and skipped
+        if ch == "{":
+            self.pos += 1
+            while self.peek() == '"':
+                key = self.parse_value()
+                if self.peek() != ":":
+                    raise self.error("Expected ':' after key")
+                self.pos += 1
+                if key == "data" and self.peek() == "[":
+                    yield from self.iter_array()
+                    return
+                self.parse_value()
+                if self.peek() != ",":
+                    break
+                self.pos += 1
+
+        raise ValueError(
+            "JSON format not supported: expected [ {...}, ... ] or { 'data': [ {...}, ... ] }"
+        )
+
+
+def iter_json(path, encoding="utf-8", buffer_size=1 << 16):
     with open(path, "r", encoding=encoding) as f:
-        text = f.read()
-
-    obj = _load_json(text)
-
-    # Case 1: straight list of objects
-    if isinstance(obj, list):
-        records = []
-        for r in obj:
+        for r in _JsonStream(f, buffer_size).iter_records():
             if isinstance(r, dict):
-                records.append(r)
-        return records
+                yield r
 
-    # Case 2: { "data": [ ... ] }
-    if isinstance(obj, dict) and "data" in obj and isinstance(obj["data"], list):
-        records = []
-        for r in obj["data"]:
-            if isinstance(r, dict):
-                records.append(r)
-        return records
 
-    raise ValueError(
-        "JSON format not supported: expected [ {...}, ... ] or { 'data': [ {...}, ... ] }"
-    )
+# ---------- Public reader ----------
+
+def read_json(path, encoding="utf-8"):
+    return list(iter_json(path, encoding=encoding))
 
 
 # ---------- Writing / serialization ----------
@@ -214,6 +299,9 @@ def _to_json_value(v):
     if isinstance(v, (list, tuple)):
         inner = ", ".join(_to_json_value(x) for x in v)
         return "[" + inner + "]"
+    # columns and arrays (DataColumn, NumPy) convert themselves
+    if hasattr(v, "tolist"):
+        return _to_json_value(v.tolist())
     # dict
     if isinstance(v, dict):
         parts = []
@@ -226,14 +314,19 @@ def _to_json_value(v):
 
 
 def write_json(path, records, encoding="utf-8", indent=2):
-    objs = [_to_json_value(rec) for rec in records]
-
+    # records may be any iterable; it is encoded and written in bounded chunks
     if indent and indent > 0:
         space = " " * indent
-        inner = ",\n".join(space + o for o in objs)
-        text = "[\n" + inner + "\n]"
+        opening, separator, closing = "[\n", ",\n" + space, "\n]"
     else:
-        text = "[" + ", ".join(objs) + "]"
-
-    with open(path, "w", encoding=encoding) as f:
-        f.write(text)
+        space = ""
+        opening, separator, closing = "[", ", ", "]"
+
+    with open_text_output(path, encoding=encoding) as f:
+        f.write(opening)
+        first = True
+        for chunk in iter_chunks(records, WRITE_CHUNK_ROWS):
+            text = separator.join(_to_json_value(rec) for rec in chunk)
+            f.write((space if first else separator) + text)
+            first = False
+        f.write(closing)
@@ -0,0 +1,177 @@
+from functools import partial
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Text readers (CSV, TOON) decide one dtype per column, inferred from the first rows
+# unless the caller names it, and then convert each column with a single parser.
+# Empty fields are nulls (None) in every column; readers whose format has its own null
+# literal pass None for it.
+#
+# An inferred dtype is only a guess: when a later field does not fit, an int64 column
+# widens to float64 if the field is a float, and otherwise any column falls back to
+# object. Rows converted before that keep their values. A dtype named by the caller
+# is a contract, and a field that does not fit it is an error.
+
+# Rows read ahead to infer the column types
+INFER_ROWS = 1000
+
+
+def _parse_bool(text: str) -> bool:
+    lowered = text.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    raise ValueError(f"invalid literal for bool: {text!r}")
+
+
+def _looks_float(text: str) -> float:
+    # Inference only takes dotted numbers (or plain integers) as floats, so that text
+    # such as "nan" or "1e5" is not mistaken for one
+    return float(text) if "." in text else int(text)
+
+
+# The parser per dtype, and the stricter test that inference applies to sample values.
+# Text dtypes keep the field as it is.
+_PARSERS: Dict[str, Optional[Callable[[str], Any]]] = {
+    "int64": int,
+    "float64": float,
+    "bool": _parse_bool,
+    "category": None,
+    "object": None,
+}
+_INFERENCE = (("bool", _parse_bool), ("int64", int), ("float64", _looks_float))
+
+
+def _parse_or_keep(parse: Callable[[str], Any], text: str) -> Any:
+    # Parser of a column that fell back to object: fields that still parse as before
+    # keep doing so, the others stay text
+    if not text:
+        return None
+    try:
+        return parse(text)
+    except ValueError:
+        return text
+
+TEXT_DTYPES = tuple(_PARSERS)
+
+
+def infer_text_dtype(values: Iterable[str]) -> str:
+    present = [text for text in values if text]
+    if not present:
+        return "object"
+    for dtype, test in _INFERENCE:
+        try:
+            for text in present:
+                test(text)
+        except ValueError:
+            continue
+        return dtype
+    return "object"
+
+
+class TextSchema:
+    def __init__(self, names: List[str], dtypes: List[str], inferred: Optional[List[bool]] = None) -> None:
+        for dtype in dtypes:
+            if dtype not in _PARSERS:
+                raise ValueError(f"Unknown dtype '{dtype}', expected one of {TEXT_DTYPES}")
+        self.names = names
+        self.dtypes = dtypes
+        self.inferred = inferred if inferred is not None else [False] * len(names)
+        self._parsers = [_PARSERS[dtype] for dtype in dtypes]
+
+    @classmethod
+    def infer(
+        cls,
+        names: List[str],
+        sample: Sequence[Sequence[str]],
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> "TextSchema":
+        # sample holds rows of fields that already line up with names
+        dtypes = dict(dtypes or {})
+        for name in dtypes:
+            if name not in names:
+                raise KeyError(f"Unknown column '{name}'")
+
+        columns = list(zip(*sample)) or [()] * len(names)
+        chosen = [dtypes.get(name) or infer_text_dtype(column) for name, column in zip(names, columns)]
+        return cls(names, chosen, inferred=[name not in dtypes for name in names])
+
+    def __repr__(self) -> str:
+        return f"TextSchema({dict(zip(self.names, self.dtypes))})"
+
+    def convert_column(self, pos: int, values: Sequence[str], first_row: Optional[int] = None) -> List[Any]:
+        parse = self._parsers[pos]
+        if parse is None:
+            return [text or None for text in values] if "" in values else list(values)
+        try:
+            return list(map(parse, values))
+        except (ValueError, TypeError, AttributeError):
+            pass
+
+        # Nulls (or a bad field) somewhere in the column: go value by value
+        converted = []
+        for i, text in enumerate(values):
+            if not text:
+                converted.append(None)
+                continue
+            try:
+                converted.append(parse(text))
+            except ValueError:
+                if not self._widen(pos, text):
+                    raise self._mismatch(pos, text, None if first_row is None else first_row + i) from None
+                return self.convert_column(pos, values, first_row)
+        return converted
+
+    def convert_rows(self, rows: Iterable[Sequence[str]], first_row: Optional[int] = 0) -> Iterator[List[Any]]:
+        # first_row numbers the rows in error messages; None when it is not known
+        for row, fields in enumerate(rows, first_row or 0):
+            values = []
+            for pos, (parse, text) in enumerate(zip(self._parsers, fields)):
+                if not text:
+                    values.append(None)
+                elif parse is None:
+                    values.append(text)
+                else:
+                    try:
+                        values.append(parse(text))
+                    except ValueError:
+                        if not self._widen(pos, text):
+                            raise self._mismatch(pos, text, None if first_row is None else row) from None
+                        values.append(self._parsers[pos](text))
+            yield values
+
+    def _widen(self, pos: int, text: str) -> bool:
+        # Loosens an inferred dtype so that text fits; False for a dtype the caller named
+        if not self.inferred[pos]:
+            return False
+        if self.dtypes[pos] == "int64":
+            try:
+                _looks_float(text)
+            except ValueError:
+                pass
+            else:
+                self.dtypes[pos], self._parsers[pos] = "float64", float
+                return True
+        self.dtypes[pos], self._parsers[pos] = "object", partial(_parse_or_keep, self._parsers[pos])
+        return True
+
+    def _mismatch(self, pos: int, text: str, row: Optional[int]) -> ValueError:
+        name, dtype = self.names[pos], self.dtypes[pos]
+        where = f" in row {row}" if row is not None else ""
+        return ValueError(
+            f"Column '{name}' is {dtype} but holds {text!r}{where}; "
+            f"pass dtypes={{'{name}': ...}} to read it differently"
+        )
+
+
+def convert_text_rows(
+    names: List[str],
+    rows: Iterable[Sequence[str]],
+    dtypes: Optional[Dict[str, str]] = None,
+) -> Iterator[List[Any]]:
+    # The schema comes from the first INFER_ROWS rows, then every row is converted with it
+    rows = iter(rows)
+    sample = list(islice(rows, INFER_ROWS))
+    schema = TextSchema.infer(names, sample, dtypes)
+    yield from schema.convert_rows(chain(sample, rows))
@@ -1,94 +1,80 @@
 import re
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union
 from dapo.utils.csv_utils import parse_csv_line, csv_escape
+from dapo.utils.io_utils import WRITE_CHUNK_ROWS, iter_chunks, open_text_output
+from dapo.utils.schema_utils import convert_text_rows
 
-def read_toon(path: str, encoding: str = "utf-8") -> List[Dict[str, Any]]:
+def read_toon_records(path: str, encoding: str = "utf-8") -> Tuple[List[str], List[List[Optional[str]]]]:
+    # Column names and the text fields of every row; the null literal becomes None
     with open(path, "r", encoding=encoding) as f:
         lines = f.readlines()
 
-    if not lines:
-        return []
-
     content_lines = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
-    
-    if not content_lines:
-        return []
 
-    header_line = content_lines[0]
-    
-    match = re.match(r"^\[(\d+),?\]\{(.+)\}:", header_line)
-    
-    records: List[Dict[str, Any]] = []
-    
-    if match:
-        n_rows = int(match.group(1))
-        columns_str = match.group(2)
-        columns = [c.strip() for c in columns_str.split(",")]
-        
-        data_lines = content_lines[1:]
+    if not content_lines:
+        return [], []
 
-        for line in data_lines:
-            values = parse_csv_line(line, delimiter=",")
-            
-            record = {}
-            for i, col in enumerate(columns):
-                val = values[i] if i < len(values) else None
-                
-                if val == "true": val = True
-                elif val == "false": val = False
-                elif val == "null": val = None
-                else:
-                    # Try number
-                    try:
-                        if "." in val: val = float(val)
-                        else: val = int(val)
-                    except (ValueError, TypeError):
-                        pass # Keep as string
-                        
-                record[col] = val
-            records.append(record)
-            
-        return records
-    
-    else:
+    match = re.match(r"^\[(\d+),?\]\{(.+)\}:", content_lines[0])
+    if not match:
         print("Warning: Only tabular TOON arrays ( [N]{cols}: ) are currently supported.")
-        return []
+        return [], []
+
+    columns = [c.strip() for c in match.group(2).split(",")]
+    n_cols = len(columns)
+
+    rows: List[List[Optional[str]]] = []
+    for line in content_lines[1:]:
+        values = parse_csv_line(line, delimiter=",")
+        fields = [None if val == "null" else val for val in values[:n_cols]]
+        rows.append(fields + [None] * (n_cols - len(fields)))
+    return columns, rows
+
+def read_toon(
+    path: str,
+    encoding: str = "utf-8",
+    dtypes: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    columns, rows = read_toon_records(path, encoding=encoding)
+    return [dict(zip(columns, row)) for row in convert_text_rows(columns, rows, dtypes)]
+
+def _toon_value(val: Any) -> str:
+    if val is None: s_val = "null"
+    elif val is True: s_val = "true"
+    elif val is False: s_val = "false"
+    else: s_val = str(val)
+
+    return csv_escape(s_val, delimiter=",")
 
 def write_toon(
-    path: str, 
+    path: Union[str, IO], 
     records: List[Dict[str, Any]], 
     encoding: str = "utf-8",
     indent: int = 2
 ) -> None:
     if not records:
-        with open(path, "w", encoding=encoding) as f:
-            f.write("[0]{}:")
+        write_toon_rows(path, [], [], 0, encoding=encoding, indent=indent)
         return
 
     columns = list(records[0].keys())
-    n_rows = len(records)
-    
-    header_cols = ",".join(columns)
-    header = f"[{n_rows}]{{{header_cols}}}:"
-    
-    lines = [header]
-    
-    indent_str = " " * indent
+    rows = ([record.get(col) for col in columns] for record in records)
+    write_toon_rows(path, columns, rows, len(records), encoding=encoding, indent=indent)
 
-    for record in records:
-        row_values = []
-        for col in columns:
-            val = record.get(col)
-            
-            if val is None: s_val = "null"
-            elif val is True: s_val = "true"
-            elif val is False: s_val = "false"
-            else: s_val = str(val)
-            
-            s_val = csv_escape(s_val, delimiter=",")
-            row_values.append(s_val)
-        
-        lines.append(indent_str + ",".join(row_values))
+def write_toon_rows(
+    path: Union[str, IO],
+    columns: List[str],
+    rows: Iterable[Iterable[Any]],
+    n_rows: int,
+    encoding: str = "utf-8",
+    indent: int = 2
+) -> None:
+    # The TOON header carries the row count, so it has to be known before streaming rows
+    with open_text_output(path, encoding=encoding) as f:
+        header_cols = ",".join(columns)
+        f.write(f"[{n_rows}]{{{header_cols}}}:")
 
-    with open(path, "w", encoding=encoding) as f:
-        f.write("\n".join(lines))
\ No newline at end of file
+        indent_str = "\n" + " " * indent
+        for chunk in iter_chunks(rows, WRITE_CHUNK_ROWS):
+            f.write("".join(
+                indent_str + ",".join(_toon_value(val) for val in row)
+                for row in chunk
+            ))
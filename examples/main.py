@@ -1,5 +1,5 @@
 import matplotlib.pyplot as plt
-from dapo import DataKit
+from dapo import DataColumn, DataKit
 
 def main():
     print("Loading data...")
@@ -33,7 +33,7 @@ def main():
         return f"${lower}k-${upper}k"
 
     salary_bins = [get_10k_bin(s) for s in dk.get_column("AvgSalary")]
-    dk.add_column("SalaryBin", salary_bins)
+    dk.add_column("SalaryBin", DataColumn(salary_bins, dtype="category"))
 
     dk_grouped = dk.group_by("SalaryBin", {"SalaryBin": "count"})
     dk_grouped_qualifications = dk.group_by("Qualifications", {"Qualifications": "count"})
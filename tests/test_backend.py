@@ -0,0 +1,182 @@
+import math
+import random
+import unittest
+
+from dapo import DataKit
+from dapo.core import backend
+from dapo.core.cache import clear_cache
+from dapo.core.data_column import DataColumn
+
+
+class BackendCases:
+    # Run once per backend: both must give exactly the pure-Python results
+    backend = "python"
+
+    def setUp(self):
+        self._previous = backend.get_backend()
+        backend.set_backend(self.backend)
+        clear_cache()
+
+    def tearDown(self):
+        backend.set_backend(self._previous)
+        clear_cache()
+
+    def test_arithmetic(self):
+        """Elementwise operations keep values and result dtypes."""
+        ints = DataColumn([1, 2, 3])
+        floats = DataColumn([0.5, 1.5, -2.0])
+
+        self.assertEqual(ints.add(ints), [2, 4, 6])
+        self.assertEqual(ints.add(ints).dtype, "int64")
+        self.assertEqual(ints.sub(1), [0, 1, 2])
+        self.assertEqual(ints.mul(floats), [0.5, 3.0, -6.0])
+        self.assertEqual(ints.mul(floats).dtype, "float64")
+        self.assertEqual(ints.div(2), [0.5, 1.0, 1.5])
+        self.assertEqual(floats.div(floats), [1.0, 1.0, 1.0])
+        self.assertEqual(ints.add([1, 1, 1]), [2, 3, 4])
+        self.assertEqual(DataColumn([]).add(1).dtype, "object")
+
+    def test_arithmetic_errors(self):
+        """Length mismatches and zero divisors raise like before."""
+        ints = DataColumn([1, 2, 3])
+        with self.assertRaises(ValueError):
+            ints.add(DataColumn([1, 2]))
+        with self.assertRaises(ValueError):
+            ints.div(0)
+        with self.assertRaises(ValueError):
+            ints.div(DataColumn([1, 0, 1]))
+
+    def test_integer_overflow_falls_back(self):
+        """Results that leave int64 become Python ints, never wrapped values."""
+        big = DataColumn([2 ** 62, 2 ** 62])
+        self.assertEqual(big.add(big), [2 ** 63, 2 ** 63])
+        self.assertEqual(big.mul(4), [2 ** 64, 2 ** 64])
+        self.assertEqual(DataColumn([2 ** 62] * 4).sum(), 2 ** 64)
+        self.assertEqual(DataColumn([2 ** 60 + 1]).div(1), [float(2 ** 60 + 1)])
+
+    def test_reductions(self):
+        """sum, mean, min, max, median and quantiles."""
+        ints = DataColumn([5, 3, 9, 1, 7])
+        floats = DataColumn([2.5, -1.0, 4.0, 0.5])
+
+        self.assertEqual(ints.sum(), 25)
+        self.assertIsInstance(ints.sum(), int)
+        self.assertEqual(ints.mean(), 5.0)
+        self.assertEqual((ints.min(), ints.max()), (1, 9))
+        self.assertEqual((floats.min(), floats.max()), (-1.0, 4.0))
+        self.assertEqual(ints.median(), 5)
+        self.assertEqual(floats.median(), 1.5)
+        self.assertEqual(ints.quantile([0, 0.25, 1]), [1, 3.0, 9])
+        self.assertEqual(floats.percentile(90), 2.5 + (4.0 - 2.5) * (0.9 * 3 - 2))
+
+        nan_column = DataColumn([1.0, float("nan"), 0.5])
+        self.assertEqual(nan_column.min(), min([1.0, float("nan"), 0.5]))
+
+    def test_group_by_sums(self):
+        """Grouped sums and means add values in row order."""
+        dk = DataKit.from_columns({
+            "key": ["a", "b", "a", "b", "c"],
+            "ints": [1, 2, 3, 4, 5],
+            "floats": [0.1, 0.2, 0.3, 0.4, 0.5],
+        })
+        result = dk.group_by("key", {"ints": ["sum", "mean"], "floats": ["sum", "mean"]})
+        self.assertEqual(result.get_column("sum_ints"), [4, 6, 5])
+        self.assertEqual(result.get_column("mean_ints"), [2.0, 3.0, 5.0])
+        self.assertEqual(result.get_column("sum_floats"), [0.1 + 0.3, 0.2 + 0.4, 0.5])
+        self.assertEqual(result.get_column("mean_floats"), [(0.1 + 0.3) / 2, (0.2 + 0.4) / 2, 0.5])
+
+
+class TestPythonBackend(BackendCases, unittest.TestCase):
+    backend = "python"
+
+    def test_unknown_backend(self):
+        """Only the known backends can be selected."""
+        with self.assertRaises(ValueError):
+            backend.set_backend("cuda")
+
+
+@unittest.skipIf(backend.np is None, "NumPy is not installed")
+class TestNumpyBackend(BackendCases, unittest.TestCase):
+    backend = "numpy"
+
+    def _both(self, func):
+        results = []
+        for name in ("python", "numpy"):
+            backend.set_backend(name)
+            clear_cache()
+            results.append(func())
+        backend.set_backend(self.backend)
+        return results
+
+    def test_matches_python_on_random_data(self):
+        """The vectorized kernels are exact, not merely close."""
+        rng = random.Random(7)
+        floats = DataColumn([rng.uniform(-1e6, 1e6) for _ in range(5000)])
+        ints = DataColumn([rng.randrange(-10 ** 9, 10 ** 9) for _ in range(5000)])
+        keys = DataColumn([rng.randrange(40) for _ in range(5000)])
+        dk = DataKit(_data=[keys, ints, floats], _columns=["key", "ints", "floats"], _n_rows=5000)
+
+        checks = [
+            lambda: floats.add(ints).to_list(),
+            lambda: floats.div(ints.add(10 ** 9 + 1)).to_list(),
+            lambda: ints.mul(ints).to_list(),
+            lambda: ints.sum(),
+            lambda: (floats.min(), floats.max(), ints.min(), ints.max()),
+            lambda: floats.quantile([0.1, 0.5, 0.99]),
+            lambda: ints.median(),
+            lambda: [col.to_list() for col in dk.group_by("key", {"floats": ["sum", "mean"], "ints": "sum"})._data],
+        ]
+        for check in checks:
+            python_result, numpy_result = self._both(check)
+            self.assertEqual(python_result, numpy_result)
+
+    def test_to_numpy_is_zero_copy(self):
+        """to_numpy() reads the column buffer in place and is read-only."""
+        column = DataColumn([1.0, 2.0, 3.0])
+        arr = column.to_numpy()
+        self.assertEqual(arr.dtype, backend.np.float64)
+        self.assertFalse(arr.flags.writeable)
+        self.assertFalse(arr.flags.owndata)
+        self.assertEqual(arr.tolist(), [1.0, 2.0, 3.0])
+
+        # Writing to the column afterwards leaves the array as it was
+        column.append(4.0)
+        column[0] = 10.0
+        self.assertEqual(arr.tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(column, [10.0, 2.0, 3.0, 4.0])
+
+        self.assertEqual(DataColumn([True, False]).to_numpy().tolist(), [True, False])
+        self.assertEqual(DataColumn(["a", None]).to_numpy().tolist(), ["a", None])
+
+    def test_from_numpy(self):
+        """Arrays become typed columns; other dtypes fall back to object."""
+        np = backend.np
+        dk = DataKit.from_numpy({
+            "i": np.arange(3, dtype=np.int32),
+            "f": np.array([0.5, 1.5, 2.5])[::-1],
+            "b": np.array([True, False, True]),
+            "s": np.array(["x", "y", "z"]),
+        })
+        self.assertEqual(dk.n_rows, 3)
+        self.assertEqual(
+            [dk.get_column(name).dtype for name in dk.columns],
+            ["int64", "float64", "bool", "object"],
+        )
+        self.assertEqual(dk.get_column("f"), [2.5, 1.5, 0.5])
+        self.assertEqual(dk.get_column("s"), ["x", "y", "z"])
+
+        with self.assertRaises(ValueError):
+            DataKit.from_numpy({"a": np.arange(2), "b": np.arange(3)})
+        with self.assertRaises(ValueError):
+            DataKit.from_numpy({"m": np.zeros((2, 2))})
+
+    def test_special_values(self):
+        """NaN and infinities behave exactly as in Python."""
+        inf, nan = math.inf, math.nan
+        column = DataColumn([inf, -inf, 1.0, nan])
+        python_result, numpy_result = self._both(lambda: column.add(column).to_list())
+        self.assertEqual(repr(python_result), repr(numpy_result))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
+import io
+import json
+import threading
 import unittest
-from dapo import DataKit
+from collections.abc import MutableSequence
+from dapo import DataKit, col
+from dapo.core.cache import RESULT_CACHE, LRUCache
 from dapo.core.data_column import DataColumn
+from dapo.core.stats import ColumnStats
 
 class TestDataKitCore(unittest.TestCase):
     def setUp(self):
@@ -75,6 +81,38 @@ class TestDataKitCore(unittest.TestCase):
         self.assertIn("amount", self.dk.columns)
         self.assertNotIn("value", self.dk.columns)
 
+    def test_bulk_mutations(self):
+        """Test add_rows, update_rows, delete_rows and compact."""
+        added = self.dk.add_rows([
+            {"id": 5, "category": "B", "value": 50.0},
+            {"id": 6, "category": "C", "value": 60.0},
+        ])
+        self.assertEqual(added, 2)
+        self.assertEqual(len(self.dk), 6)
+        with self.assertRaises(ValueError):
+            self.dk.add_rows([{"id": 7, "category": "A"}])
+        self.assertEqual(len(self.dk), 6)
+
+        updated = self.dk.update_rows(col("category") == "A", {"value": col("value") * 2, "category": "AA"})
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.dk.get_column("value"), [20.0, 20.0, 60.0, 40.0, 50.0, 60.0])
+        self.dk.update_rows([4, 5], {"id": [50, 60]})
+        self.assertEqual(self.dk.get_column("id"), [1, 2, 3, 4, 50, 60])
+
+        # Deletes leave the buffers alone until compaction; reads only see live rows
+        deleted = self.dk.delete_rows([1, 4, 1])
+        self.assertEqual(deleted, 2)
+        self.assertEqual(len(self.dk), 4)
+        self.assertEqual(self.dk.get_column("id"), [1, 3, 4, 60])
+        self.assertEqual(self.dk.get_row(3), {"id": 60, "category": "C", "value": 60.0})
+        self.assertEqual(self.dk.delete_rows(lambda r: r["category"] == "C"), 2)
+        self.assertEqual(self.dk.get_column("category"), ["AA", "AA"])
+
+        self.dk.compact()
+        self.assertEqual(len(self.dk._data[0]._buf), 2)
+        with self.assertRaises(IndexError):
+            self.dk.delete_rows([2])
+
     def test_vector_operations(self):
         """Test DataColumn arithmetic."""
         vals = self.dk.get_column("value")
@@ -102,6 +140,47 @@ class TestDataKitCore(unittest.TestCase):
         # Median of even set [10, 20, 30, 40] -> (20+30)/2 = 25
         self.assertEqual(vals.median(), 25.0)
 
+    def test_describe(self):
+        """Test one-pass summaries, mergeable statistics and the sample std."""
+        vals = DataColumn([2.0, 4.0, None, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0])
+        summary = vals.describe(percentiles=[50])
+        self.assertEqual(summary["count"], 8)
+        self.assertEqual(summary["nulls"], 1)
+        self.assertEqual(summary["mean"], 5.0)
+        self.assertAlmostEqual(summary["std"], (32 / 7) ** 0.5)
+        self.assertEqual((summary["min"], summary["max"], summary["p50"]), (2.0, 9.0, 4.5))
+        self.assertAlmostEqual(DataColumn([2, 4, 4, 4, 5, 5, 7, 9]).std(), (32 / 7) ** 0.5)
+
+        # Statistics of two halves merge into the statistics of the whole
+        merged = ColumnStats.from_values([2.0, 4.0, None, 4.0]).merge(ColumnStats.from_values([4.0, 5.0, 5.0, 7.0, 9.0]))
+        self.assertEqual(merged.to_dict(), ColumnStats.from_values(vals).to_dict())
+
+        table = self.dk.describe()
+        self.assertEqual(table.columns, ["column", "count", "nulls", "mean", "std", "min", "max"])
+        self.assertEqual(table.get_column("column"), ["id", "category", "value"])
+        self.assertEqual(table.get_column("mean"), [2.5, None, 25.0])
+        self.assertEqual(table.get_row(1)["min"], "A")
+        self.assertEqual(self.dk.lazy().describe().get_column("std"), table.get_column("std"))
+
+    def test_quantiles(self):
+        """Test quantiles and percentiles, which must not reorder the column."""
+        vals = DataColumn([40, 10, None, 30, 20])
+        self.assertEqual(vals.median(), 25.0)
+        self.assertEqual(vals.quantile(0.25), 17.5)
+        self.assertEqual(vals.quantile([0, 1]), [10, 40])
+        self.assertEqual(vals.percentile([50, 90]), [25.0, 37.0])
+        self.assertEqual(DataColumn([3, 1, 2]).median(), 2)
+        self.assertEqual(vals, [40, 10, None, 30, 20])
+        self.assertIsNone(DataColumn([]).median())
+        with self.assertRaises(ValueError):
+            vals.quantile(1.5)
+
+        grouped = self.dk.group_by("category", {"value": ["median", "p90"]})
+        self.assertEqual(grouped.get_column("median_value"), [20.0, 20.0, 40.0])
+        self.assertEqual(grouped.get_column("p90_value"), [28.0, 20.0, 40.0])
+        with self.assertRaises(ValueError):
+            self.dk.group_by("category", {"value": "p101"})
+
     def test_filtering_and_querying(self):
         """Test filter, select, and unique."""
         # Filter
@@ -118,6 +197,115 @@ class TestDataKitCore(unittest.TestCase):
         unique_cats = self.dk.unique("category")
         self.assertEqual(len(unique_cats), 3) # A, B, C
 
+    def test_expression_filter(self):
+        """Test column-wise filter expressions."""
+        result = self.dk.filter((col("category") == "A") & (col("value") > 15))
+        self.assertEqual(result.get_column("id"), [3])
+        self.assertEqual(result.columns, self.dk.columns)
+
+        result = self.dk.filter(col("category").isin(["B", "C"]) | (col("value") * 2 == 20))
+        self.assertEqual(result.get_column("id"), [1, 2, 4])
+
+        result = self.dk.filter(~(col("id") > 2))
+        self.assertEqual(result.get_column("id"), [1, 2])
+
+        # Same rows as the equivalent per-row callback
+        expected = self.dk.filter(lambda r: r["value"] >= 20 and r["category"] != "C")
+        result = self.dk.filter((col("value") >= 20) & (col("category") != "C"))
+        self.assertEqual(result.get_column("id"), expected.get_column("id"))
+
+        # None never satisfies a comparison
+        with_none = DataKit.from_columns({"x": [1, None, 3]})
+        self.assertEqual(with_none.filter(col("x") > 0).get_column("x"), [1, 3])
+
+        with self.assertRaises(KeyError):
+            self.dk.filter(col("missing") == 1)
+        with self.assertRaises(TypeError):
+            self.dk.filter(col("id") > 1 and col("id") < 3)
+
+    def test_views_copy_on_write(self):
+        """Test that derived tables share buffers until one side is mutated."""
+        head = self.dk.head(2)
+        selected = self.dk.select(["id", "value"])
+        filtered = self.dk.filter(col("value") > 15)
+        self.assertIs(head._data[0]._buf, self.dk._data[0]._buf)
+        self.assertIs(selected._data[0]._buf, self.dk._data[0]._buf)
+        self.assertIs(filtered._data[0]._buf, self.dk._data[0]._buf)
+
+        # Mutating a view leaves the parent alone, and the other way round
+        selected.update_row(0, {"id": 100})
+        self.assertEqual(self.dk.get_column("id"), [1, 2, 3, 4])
+        self.dk.update_row(1, {"value": -1.0})
+        self.assertEqual(filtered.get_column("value"), [20.0, 30.0, 40.0])
+        self.assertEqual(head.get_column("value"), [10.0, 20.0])
+
+        # Views of views compose their row selections
+        nested = filtered.filter(col("id") != 3).tail(1)
+        self.assertEqual(nested.get_row(0), {"id": 4, "category": "C", "value": 40.0})
+
+        column = self.dk.get_column("id")
+        column.append(5)
+        self.assertEqual(len(self.dk.get_column("id")), 4)
+
+        copied = filtered.copy()
+        self.assertIsNot(copied._data[0]._buf, self.dk._data[0]._buf)
+        self.assertEqual(copied.get_column("id"), [2, 3, 4])
+
+    def test_slices_of_views(self):
+        """Test that slicing a view follows list slicing, reversed and out of range too."""
+        values = list(range(7))
+        view = DataColumn(values)[1:6]
+        for index in (slice(-10, None, -1), slice(None, None, -1), slice(10, None, -2),
+                      slice(-2, -10, -1), slice(3, 1), slice(-100, 100, 3), slice(4, None, -3)):
+            self.assertEqual(view[index].to_list(), values[1:6][index])
+        self.assertEqual(view[::-1][1:][::2].to_list(), values[1:6][::-1][1:][::2])
+
+    def test_indexes(self):
+        """Test hash and sorted indexes and that mutations keep them in sync."""
+        self.dk.create_index("category").create_index("value", kind="sorted")
+
+        self.assertEqual(self.dk.filter(col("category") == "A").get_column("id"), [1, 3])
+        self.assertEqual(self.dk.filter(col("category").isin(["C", "B"])).get_column("id"), [2, 4])
+        self.assertEqual(self.dk.filter((col("value") >= 20) & (col("value") < 40)).get_column("id"), [2, 3])
+        self.assertEqual(self.dk.filter(25 < col("value")).get_column("id"), [3, 4])
+
+        self.dk.add_row({"id": 5, "category": "B", "value": 5.0})
+        self.dk.update_row(0, {"category": "B"})
+        self.assertEqual(self.dk.filter(col("category") == "B").get_column("id"), [1, 2, 5])
+        self.assertEqual(self.dk.filter(col("value") < 15).get_column("id"), [1, 5])
+
+        self.dk.delete_row(1)
+        self.dk.sort("value", reverse=True)
+        self.assertEqual(self.dk.filter(col("category") == "B").get_column("id"), [1, 5])
+        self.assertEqual(self.dk.filter(col("value") > 25).get_column("id"), [4, 3])
+
+        lookup = DataKit.from_columns({"category": ["A", "B"], "label": ["alpha", "beta"]})
+        lookup.create_index("category")
+        joined = self.dk.join(lookup, on="category", how="left")
+        self.assertEqual(joined.get_column("label"), [None, "alpha", "beta", "beta"])
+
+        with self.assertRaises(ValueError):
+            self.dk.create_index("id", kind="btree")
+        with self.assertRaises(KeyError):
+            self.dk.create_index("missing")
+
+    def test_index_isin_fallback(self):
+        """Test that isin scans when the index cannot answer for a literal."""
+        dk = DataKit.from_columns({"x": ["a", "b", "a"]}).create_index("x", kind="sorted")
+        self.assertEqual(len(dk.filter(col("x").isin(["a", 2]))), 2)
+        self.assertEqual(len(dk.filter(col("x").isin(["b"]))), 1)
+
+    def test_index_rejects_value(self):
+        """Test that a value an index cannot hold still adds the whole row."""
+        for kind, value in (("sorted", "zz"), ("hash", ["zz"])):
+            dk = DataKit.from_columns({"x": [1, 2], "y": ["a", "b"]}).create_index("x", kind=kind)
+            dk.add_row({"x": value, "y": "c"})
+            self.assertEqual(len(dk), 3)
+            self.assertEqual(dk.get_row(2), {"x": value, "y": "c"})
+            self.assertEqual(dk.filter(col("x") == 2).get_column("y"), ["b"])
+            dk.delete_row(2)
+            self.assertEqual(dk.filter(col("x") == 2).get_column("y"), ["b"])
+
     def test_group_by(self):
         """Test aggregation functionality."""
         # Group by 'category' (A: 10+30=40, B: 20, C: 40)
@@ -133,6 +321,67 @@ class TestDataKitCore(unittest.TestCase):
         self.assertEqual(sums[idx_a], 40.0)
         self.assertEqual(counts[idx_a], 2)
 
+    def test_group_by_multi(self):
+        """Test multi-key groups and several aggregations per column."""
+        dk = DataKit.from_columns({
+            "country": ["DE", "DE", "FR", "DE", "FR"],
+            "level": ["jr", "sr", "jr", "jr", "jr"],
+            "salary": [10.0, 30.0, 20.0, 14.0, 40.0],
+        })
+
+        by_country = dk.group_by("country", {"salary": ["sum", "std", "median", "nunique", "first", "last"]})
+        self.assertEqual(
+            by_country.columns,
+            ["country", "sum_salary", "std_salary", "median_salary", "nunique_salary", "first_salary", "last_salary"],
+        )
+        self.assertEqual(by_country.get_row(0)["sum_salary"], 54.0)
+        self.assertAlmostEqual(by_country.get_row(0)["std_salary"], 10.583005244, places=6)
+        self.assertEqual(by_country.get_row(0)["median_salary"], 14.0)
+        self.assertEqual(by_country.get_row(1)["first_salary"], 20.0)
+        self.assertEqual(by_country.get_row(1)["last_salary"], 40.0)
+
+        by_pair = dk.group_by(["country", "level"], {"salary": ["count", "mean", "var"]})
+        self.assertEqual(by_pair.columns, ["country", "level", "count_salary", "mean_salary", "var_salary"])
+        self.assertEqual(by_pair.get_column("country"), ["DE", "DE", "FR"])
+        self.assertEqual(by_pair.get_column("level"), ["jr", "sr", "jr"])
+        self.assertEqual(by_pair.get_column("mean_salary"), [12.0, 30.0, 30.0])
+        self.assertEqual(by_pair.get_column("var_salary"), [8.0, None, 200.0])
+
+        with self.assertRaises(ValueError):
+            dk.group_by("country", {"salary": "mode"})
+
+    def test_join(self):
+        """Test hash joins on single and multi-column keys."""
+        countries = DataKit.from_columns({
+            "category": ["A", "B", "D"],
+            "label": ["alpha", "beta", "delta"],
+            "value": [1, 2, 4],
+        })
+
+        inner = self.dk.join(countries, on="category")
+        self.assertEqual(inner.columns, ["category", "id", "value_x", "label", "value_y"])
+        self.assertEqual(inner.get_column("id"), [1, 2, 3])
+        self.assertEqual(inner.get_column("label"), ["alpha", "beta", "alpha"])
+
+        left = self.dk.join(countries, on="category", how="left")
+        self.assertEqual(left.get_column("label"), ["alpha", "beta", "alpha", None])
+
+        right = self.dk.join(countries, on="category", how="right")
+        self.assertEqual(right.get_column("category"), ["A", "A", "B", "D"])
+        self.assertEqual(right.get_column("id"), [1, 3, 2, None])
+
+        outer = self.dk.join(countries, on="category", how="outer", suffixes=("", "_lookup"))
+        self.assertEqual(outer.get_column("category"), ["A", "B", "A", "C", "D"])
+        self.assertEqual(outer.get_column("value_lookup"), [1, 2, 1, None, 4])
+
+        pairs = DataKit.from_columns({"id": [1, 3], "category": ["A", "B"], "flag": [True, False]})
+        multi = self.dk.join(pairs, on=["id", "category"])
+        self.assertEqual(multi.get_column("flag"), [True])
+        self.assertEqual(multi.get_column("value"), [10.0])
+
+        with self.assertRaises(ValueError):
+            self.dk.join(countries, on="category", how="cross")
+
     def test_sorting(self):
         """Test sorting functionality."""
         # Sort desc by value
@@ -140,5 +389,342 @@ class TestDataKitCore(unittest.TestCase):
         self.assertEqual(self.dk.get_column("value"), [40.0, 30.0, 20.0, 10.0])
         self.assertEqual(self.dk.get_column("id"), [4, 3, 2, 1]) # IDs should follow
 
+    def test_multi_key_sort_and_top_k(self):
+        """Test mixed-direction sorts, null placement, argsort and top-k."""
+        dk = DataKit.from_columns({
+            "id": [1, 2, 3, 4, 5, 6],
+            "team": ["b", "a", None, "a", "b", "a"],
+            "score": [3, 5, 1, 5, 9, 2],
+        })
+        self.assertEqual(dk.argsort(["team", "score"], reverse=[False, True]), [1, 3, 5, 4, 0, 2])
+        self.assertEqual(dk.argsort("team", nulls="first"), [2, 1, 3, 5, 0, 4])
+        self.assertEqual(dk.argsort("team", reverse=True), [0, 4, 1, 3, 5, 2])
+
+        # Equal keys keep their original order
+        self.assertEqual(dk.nlargest(3, "score").get_column("id"), [5, 2, 4])
+        self.assertEqual(dk.nsmallest(2, "score").get_column("id"), [3, 6])
+        self.assertEqual(dk.top_k(2, ["team", "score"], reverse=[True, False]).get_column("id"), [1, 5])
+        self.assertEqual(len(dk.top_k(10, "score")), 6)
+
+        dk.sort(["team", "id"], reverse=[True, True], nulls="first")
+        self.assertEqual(dk.get_column("id"), [3, 5, 1, 6, 4, 2])
+
+        column = DataColumn([3, None, 1, 2])
+        self.assertEqual(column.argsort(), [2, 3, 0, 1])
+        self.assertEqual(column.nlargest(2), [3, 2])
+        self.assertEqual(column.sort(reverse=True, nulls="first"), [None, 3, 2, 1])
+
+        # Already-sorted input is no longer quadratic or recursive
+        big = DataColumn(list(range(50000)))
+        self.assertEqual(big.sort(reverse=True)[0], 49999)
+
+        with self.assertRaises(ValueError):
+            dk.sort("id", nulls="middle")
+
+class TestDataColumnStorage(unittest.TestCase):
+    def test_dtype_inference(self):
+        """Homogeneous columns get typed storage, mixed columns stay object."""
+        self.assertEqual(DataColumn([1, 2, 3]).dtype, "int64")
+        self.assertEqual(DataColumn([1.5, 2.0]).dtype, "float64")
+        self.assertEqual(DataColumn([True, False]).dtype, "bool")
+        self.assertEqual(DataColumn(["a", 1]).dtype, "object")
+        self.assertEqual(DataColumn([1, 2.0]).dtype, "object")
+        self.assertEqual(DataColumn([2 ** 70]).dtype, "object")
+
+    def test_list_api(self):
+        """Typed columns behave like lists and keep Python value types."""
+        col = DataColumn([True, False, True])
+        self.assertIs(col[0], True)
+        self.assertEqual(list(col), [True, False, True])
+        self.assertEqual(col[1:], [False, True])
+        self.assertIsInstance(col[1:], DataColumn)
+
+        ints = DataColumn([3, 1, 2])
+        ints.append(4)
+        ints[0] = 5
+        self.assertEqual(ints, [5, 1, 2, 4])
+        self.assertEqual(ints.pop(), 4)
+        self.assertEqual(ints.dtype, "int64")
+
+    def test_former_list_entry_points(self):
+        """Code written against the list subclass keeps working through tolist()."""
+        col = DataColumn([1, 2, 3])
+        self.assertIsInstance(col, MutableSequence)
+        self.assertNotIsInstance(col, list)
+        self.assertEqual(json.dumps(col.tolist()), "[1, 2, 3]")
+        self.assertEqual(col + [4], [1, 2, 3, 4])
+        self.assertEqual([0] + col, [0, 1, 2, 3])
+        self.assertEqual(sorted(col, reverse=True), [3, 2, 1])
+        self.assertEqual(str(col), "[1, 2, 3]")
+
+        dk = DataKit.from_columns({"id": [1], "tags": [None]})
+        dk.update_row(0, {"tags": DataColumn(["a", "b"])})
+        out = io.StringIO()
+        dk.to_json(out, indent=0)
+        self.assertEqual(json.loads(out.getvalue()), [{"id": 1, "tags": ["a", "b"]}])
+
+    def test_promotion(self):
+        """Storing a value of another type falls back to object storage."""
+        col = DataColumn([1, 2])
+        col.append("x")
+        self.assertEqual(col.dtype, "object")
+        self.assertEqual(col, [1, 2, "x"])
+
+        col = DataColumn([1, 2])
+        col.append(True)
+        self.assertEqual(col.dtype, "object")
+        self.assertIs(col[-1], True)
+
+    def test_explicit_dtype(self):
+        """An explicit dtype is validated against the values."""
+        self.assertEqual(DataColumn([1, 2], dtype="object").dtype, "object")
+        with self.assertRaises(TypeError):
+            DataColumn([1, "a"], dtype="int64")
+        with self.assertRaises(ValueError):
+            DataColumn([1], dtype="int32")
+
+    def test_datakit_uses_typed_storage(self):
+        """DataKit constructors pick typed storage for homogeneous columns."""
+        dk = DataKit.from_columns({"id": [1, 2], "value": [1.0, 2.0], "name": ["a", "b"]})
+        self.assertEqual(
+            [dk.get_column(name).dtype for name in dk.columns],
+            ["int64", "float64", "object"],
+        )
+
+        dk.apply(str, "id")
+        self.assertEqual(dk.get_column("id"), ["1", "2"])
+        self.assertEqual(dk.get_column("id").dtype, "object")
+
+
+class TestCategoryColumns(unittest.TestCase):
+    def setUp(self):
+        self.values = ["uk", "us", "uk", None, "de", "us", "uk"]
+        self.dk = DataKit.from_columns({
+            "country": DataColumn(self.values, dtype="category"),
+            "sales": [1, 2, 3, 4, 5, 6, 7],
+        })
+
+    def test_storage(self):
+        """Values are stored once in the dictionary and read back transparently."""
+        column = self.dk.get_column("country")
+        self.assertEqual(column.dtype, "category")
+        self.assertEqual(column.categories, ["uk", "us", None, "de"])
+        self.assertEqual(column, self.values)
+        self.assertEqual(column[4], "de")
+        self.assertEqual(column.mode(), "uk")
+        self.assertEqual(column.count("us"), 2)
+        self.assertNotIn("fr", column)
+        self.assertEqual(column.astype("object").dtype, "object")
+
+    def test_writes(self):
+        """New strings extend the dictionary; other values fall back to object storage."""
+        column = DataColumn(["a", "b"], dtype="category")
+        copy = column.copy()
+        column.append("c")
+        column[0] = "b"
+        self.assertEqual(column, ["b", "b", "c"])
+        self.assertEqual(copy, ["a", "b"])
+        column.extend(DataColumn(["d", "a"], dtype="category"))
+        self.assertEqual(column, ["b", "b", "c", "d", "a"])
+        self.assertEqual(column.pop(), "a")
+
+        column.append(1)
+        self.assertEqual(column.dtype, "object")
+        self.assertEqual(column, ["b", "b", "c", "d", 1])
+
+        with self.assertRaises(TypeError):
+            DataColumn(["a", 1], dtype="category")
+
+    def test_queries_match_object_columns(self):
+        """group_by, unique, filter and sort give the same results as for strings."""
+        plain = DataKit.from_columns({"country": self.values, "sales": [1, 2, 3, 4, 5, 6, 7]})
+        for kit in (plain, self.dk):
+            self.assertEqual(kit.unique("country").get_column("country"), ["uk", "us", None, "de"])
+            self.assertEqual(kit.group_by("country", {"sales": "sum"}).get_column("sum_sales"), [11, 8, 4, 5])
+            self.assertEqual(kit.filter(col("country") == "us").get_column("sales"), [2, 6])
+            self.assertEqual(kit.filter(col("country") != "uk").get_column("sales"), [2, 4, 5, 6])
+            self.assertEqual(kit.filter(col("country").isin(["de", "fr"])).get_column("sales"), [5])
+
+        self.dk.sort(["country", "sales"], reverse=[True, False])
+        self.assertEqual(self.dk.get_column("country"), ["us", "us", "uk", "uk", "uk", "de", None])
+        self.assertEqual(self.dk.get_column("sales"), [2, 6, 1, 3, 7, 5, 4])
+        self.assertEqual(self.dk.get_column("country").dtype, "category")
+
+class TestNulls(unittest.TestCase):
+    def setUp(self):
+        self.dk = DataKit.from_columns({
+            "group": ["a", "b", "a", "b", "c"],
+            "units": [3, None, 5, 1, None],
+            "price": [2.5, 4.0, None, 1.0, None],
+        })
+
+    def test_storage(self):
+        """Columns with gaps keep typed storage, with the nulls in a validity mask."""
+        units = self.dk.get_column("units")
+        self.assertEqual(units.dtype, "int64")
+        self.assertEqual(units, [3, None, 5, 1, None])
+        self.assertIsNone(units[1])
+        self.assertEqual(units.null_count(), 2)
+        self.assertEqual(units.count(None), 2)
+        self.assertIn(None, units)
+        self.assertEqual(units.index(None), 1)
+        self.assertEqual(DataColumn([True, None]).dtype, "bool")
+        self.assertEqual(DataColumn([None, None]).dtype, "object")
+
+        units.append(0)
+        units[0] = None
+        self.assertEqual(units, [None, None, 5, 1, None, 0])
+        self.assertEqual(units.count(0), 1)
+        self.assertEqual(units[2:], [5, 1, None, 0])
+        self.assertEqual(units.take([4, 2]), [None, 5])
+        self.assertEqual(units.dtype, "int64")
+
+    def test_reductions_skip_nulls(self):
+        """sum, mean, min, max, median, mode and std look at present values only."""
+        units = self.dk.get_column("units")
+        self.assertEqual(units.sum(), 9)
+        self.assertEqual(units.mean(), 3)
+        self.assertEqual(units.min(), 1)
+        self.assertEqual(units.max(), 5)
+        self.assertEqual(units.median(), 3)
+        self.assertEqual(units.mode(), 3)
+        self.assertEqual(units.std(), 2.0)
+        self.assertEqual(units.add(1), [4, None, 6, 2, None])
+        self.assertEqual(DataColumn([None, None], dtype="float64").mean(), None)
+
+        grouped = self.dk.group_by("group", {"units": ["count", "count_non_null", "sum", "mean", "max", "first"]})
+        self.assertEqual(grouped.get_column("count_units"), [2, 2, 1])
+        self.assertEqual(grouped.get_column("count_non_null_units"), [2, 1, 0])
+        self.assertEqual(grouped.get_column("sum_units"), [8, 1, 0])
+        self.assertEqual(grouped.get_column("mean_units"), [4.0, 1.0, None])
+        self.assertEqual(grouped.get_column("max_units"), [5, 1, None])
+        self.assertEqual(grouped.get_column("first_units"), [3, 1, None])
+
+        # "count" counts rows, so a group keyed by null counts its own rows
+        by_units = self.dk.group_by("units", {"units": ["count", "count_non_null"], "group": "count"})
+        self.assertEqual(by_units.get_column("units"), [3, None, 5, 1])
+        self.assertEqual(by_units.get_column("count_units"), [1, 2, 1, 1])
+        self.assertEqual(by_units.get_column("count_non_null_units"), [1, 0, 1, 1])
+        self.assertEqual(by_units.get_column("count_group"), [1, 2, 1, 1])
+
+    def test_fillna_and_dropna(self):
+        """fillna replaces nulls, dropna removes them, and is_null selects them."""
+        units = self.dk.get_column("units")
+        self.assertEqual(units.fillna(0), [3, 0, 5, 1, 0])
+        self.assertEqual(units.fillna(0).dtype, "int64")
+        self.assertEqual(units.fillna("?"), [3, "?", 5, 1, "?"])
+        self.assertEqual(units.dropna(), [3, 5, 1])
+        self.assertEqual(units, [3, None, 5, 1, None])
+
+        filled = self.dk.fillna({"price": 0.0})
+        self.assertEqual(filled.get_column("price"), [2.5, 4.0, 0.0, 1.0, 0.0])
+        self.assertEqual(filled.get_column("units").null_count(), 2)
+        self.assertEqual(self.dk.fillna(0).get_column("units"), [3, 0, 5, 1, 0])
+        self.assertEqual(self.dk.dropna().get_column("group"), ["a", "b"])
+        self.assertEqual(self.dk.dropna(["units"]).get_column("group"), ["a", "a", "b"])
+        with self.assertRaises(KeyError):
+            self.dk.fillna({"missing": 0})
+
+        self.assertEqual(self.dk.filter(col("units").is_null()).get_column("group"), ["b", "c"])
+        self.assertEqual(self.dk.filter(col("price").is_not_null() & (col("units") > 2)).get_column("price"), [2.5])
+        self.assertEqual(self.dk.filter((col("units") * 2).is_null()).get_column("group"), ["b", "c"])
+        self.assertEqual(repr(col("units").is_not_null()), "col('units').is_not_null()")
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.dk = DataKit.from_columns({
+            "group": ["a", "b", "a", "c"],
+            "value": [4, 1, 3, 2],
+        })
+
+    def test_reductions_are_cached(self):
+        """A repeated reduction on an unchanged column is served from the cache."""
+        self.assertEqual(self.dk.get_column("value").mean(), 2.5)
+        hits = RESULT_CACHE.hits
+        self.assertEqual(self.dk.get_column("value").mean(), 2.5)
+        self.assertEqual(RESULT_CACHE.hits, hits + 1)
+
+        summary = self.dk.get_column("value").describe()
+        summary["mean"] = None
+        self.assertEqual(self.dk.get_column("value").describe()["mean"], 2.5)
+
+    def test_mutations_change_the_version(self):
+        """Every mutating operation gives the affected columns a new version."""
+        dk = self.dk
+        mutations = [
+            lambda: dk.add_row({"group": "d", "value": 10}),
+            lambda: dk.update_row(0, {"group": "a", "value": 7}),
+            lambda: dk.delete_row(1),
+            lambda: dk.apply(lambda v: v * 2, "value"),
+            lambda: dk.sort("value"),
+            lambda: dk.add_rows([{"group": "e", "value": 5}]),
+            lambda: dk.update_rows([0], {"value": 0}),
+            lambda: dk.delete_rows([0]),
+        ]
+        for mutate in mutations:
+            version = dk.column_version("value")
+            mutate()
+            self.assertNotEqual(dk.column_version("value"), version)
+            self.assertEqual(dk.get_column("value").sum(), sum(dk.get_column("value").to_list()))
+            self.assertEqual(dk.get_column("value").max(), max(dk.get_column("value").to_list()))
+
+        version = dk.column_version("group")
+        dk.update_rows([0], {"value": 1})
+        self.assertEqual(dk.column_version("group"), version)
+
+    def test_copies_share_results_until_written(self):
+        """A shared column keeps the version of its source until one side changes."""
+        column = self.dk.get_column("value")
+        self.assertEqual(column._version, self.dk.column_version("value"))
+        column.append(100)
+        self.assertNotEqual(column._version, self.dk.column_version("value"))
+        self.assertEqual(column.max(), 100)
+        self.assertEqual(self.dk.get_column("value").max(), 4)
+
+    def test_unique_and_group_by_invalidation(self):
+        """Cached unique and group_by results follow changes to their columns."""
+        grouped = self.dk.group_by("group", {"value": "sum"})
+        self.assertEqual(grouped.get_column("sum_value"), [7, 1, 2])
+        grouped.update_row(0, {"group": "a", "sum_value": 0})
+        self.assertEqual(self.dk.group_by("group", {"value": "sum"}).get_column("sum_value"), [7, 1, 2])
+
+        self.assertEqual(self.dk.unique("group").get_column("group"), ["a", "b", "c"])
+        self.dk.update_row(1, {"group": "a", "value": 1})
+        self.assertEqual(self.dk.unique("group").get_column("group"), ["a", "c"])
+        self.assertEqual(self.dk.group_by("group", {"value": "sum"}).get_column("sum_value"), [8, 2])
+
+    def test_cache_is_bounded(self):
+        """The least recently used entries are evicted beyond the size limit."""
+        maxsize = RESULT_CACHE.maxsize
+        try:
+            RESULT_CACHE.resize(2)
+            for i in range(5):
+                DataColumn([i, i + 1]).sum()
+            self.assertEqual(len(RESULT_CACHE), 2)
+        finally:
+            RESULT_CACHE.resize(maxsize)
+
+    def test_cache_is_thread_safe(self):
+        """Threads sharing a small cache never break it or exceed its size."""
+        cache = LRUCache(maxsize=4)
+        errors = []
+
+        def work(offset):
+            try:
+                for i in range(2000):
+                    key = (offset + i) % 11
+                    self.assertEqual(cache.get_or_compute(key, lambda: key * 2), key * 2)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 4)
+        self.assertEqual(cache.hits + cache.misses, 8 * 2000)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,7 +1,14 @@
+import asyncio
+import gc
+import io
 import unittest
 import tempfile
 import os
-from dapo import DataKit
+from dapo import DataColumn, DataKit, col
+from dapo.core.dapo_file import DapoFile
+from dapo.utils.json_utils import iter_json
+from dapo.utils.csv_utils import parse_csv_line, read_csv, read_csv_range, split_csv_ranges
+from dapo.utils.schema_utils import INFER_ROWS
 
 class TestDataKitIO(unittest.TestCase):
     def setUp(self):
@@ -21,6 +28,265 @@ class TestDataKitIO(unittest.TestCase):
         finally:
             os.remove(path)
 
+    def test_csv_quoted_multiline(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as tmp:
+            path = tmp.name
+
+        try:
+            text = ["first line\nsecond line", 'He said "hi", then left', "plain"]
+            DataKit.from_columns({"id": [1, 2, 3], "text": text}).to_csv(path)
+            loaded = DataKit.from_csv(path)
+            self.assertEqual(len(loaded), 3)
+            self.assertEqual(loaded.get_column("id"), [1, 2, 3])
+            self.assertEqual(loaded.get_column("text"), text)
+        finally:
+            os.remove(path)
+
+    def test_csv_parallel(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as tmp:
+            path = tmp.name
+
+        try:
+            n = 2000
+            text = ["multi\nline, quoted" if i % 3 == 0 else 'say "hi"' if i % 3 == 1 else "plain" for i in range(n)]
+            DataKit.from_columns({"id": list(range(n)), "text": text, "x": [i / 2 for i in range(n)]}).to_csv(path)
+
+            sequential = DataKit.from_csv(path)
+            parallel = DataKit.from_csv(path, workers=3)
+            self.assertEqual(len(parallel), n)
+            self.assertEqual(parallel.columns, sequential.columns)
+            for name in sequential.columns:
+                self.assertEqual(parallel.get_column(name), sequential.get_column(name))
+            self.assertEqual(parallel.get_column("id").dtype, "int64")
+        finally:
+            os.remove(path)
+
+    def test_csv_categories(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as tmp:
+            path = tmp.name
+
+        try:
+            countries = ["UK", "US", "DE"] * 100
+            names = [f"name{i}" for i in range(300)]
+            # One value in ten distinct is too many for a dictionary to pay off
+            codes = [f"code{i % 30}" for i in range(300)]
+            DataKit.from_columns({"country": countries, "name": names, "code": codes}).to_csv(path)
+
+            loaded = DataKit.from_csv(path)
+            self.assertEqual(loaded.get_column("country").dtype, "category")
+            self.assertEqual(loaded.get_column("country").categories, ["UK", "US", "DE"])
+            self.assertEqual(loaded.get_column("country"), countries)
+            self.assertEqual(loaded.get_column("name").dtype, "object")
+            self.assertEqual(loaded.get_column("code").dtype, "object")
+            self.assertEqual(DataKit.from_csv(path, workers=2).get_column("country").dtype, "category")
+            self.assertEqual(DataKit.from_csv(path, categorize=False).get_column("country").dtype, "object")
+        finally:
+            os.remove(path)
+
+    def test_csv_schema(self):
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', newline="") as tmp:
+            tmp.write("id,price,units,active,zip,mixed\n")
+            tmp.write("1,2.5,3,true,007,1\n")
+            tmp.write("2,4,,FALSE,010,a\n")
+            tmp.write("3,,5,true,123\n")
+            path = tmp.name
+
+        try:
+            loaded = DataKit.from_csv(path, categorize=False)
+            self.assertEqual(loaded.get_column("id").dtype, "int64")
+            # One type per column: integers in a float column become floats, empty fields None
+            self.assertEqual(loaded.get_column("price"), [2.5, 4.0, None])
+            self.assertEqual(loaded.get_column("units"), [3, None, 5])
+            self.assertEqual(loaded.get_column("units").dtype, "int64")
+            self.assertEqual(loaded.get_column("active").to_list(), [True, False, True])
+            self.assertEqual(loaded.get_column("zip").to_list(), [7, 10, 123])
+            self.assertEqual(loaded.get_column("mixed").to_list(), ["1", "a", None])
+
+            typed = DataKit.from_csv(path, dtypes={"zip": "object", "id": "float64", "active": "category"})
+            self.assertEqual(typed.get_column("zip").to_list(), ["007", "010", "123"])
+            self.assertEqual(typed.get_column("id").to_list(), [1.0, 2.0, 3.0])
+            self.assertEqual(typed.get_column("active").dtype, "category")
+            self.assertEqual(list(read_csv(path, dtypes={"zip": "object"}))[0]["zip"], "007")
+            self.assertEqual(DataKit.from_csv(path, workers=2, dtypes={"zip": "object"}).get_column("zip"), ["007", "010", "123"])
+            self.assertEqual(DataKit.scan_csv(path, dtypes={"zip": "object"}).select(["zip"]).collect().get_column("zip")[0], "007")
+
+            with self.assertRaises(ValueError) as raised:
+                DataKit.from_csv(path, dtypes={"mixed": "int64"})
+            self.assertIn("'mixed'", str(raised.exception))
+            with self.assertRaises(ValueError):
+                DataKit.from_csv(path, dtypes={"id": "decimal"})
+            with self.assertRaises(KeyError):
+                DataKit.from_csv(path, dtypes={"missing": "int64"})
+        finally:
+            os.remove(path)
+
+    def test_csv_schema_from_first_rows(self):
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', newline="") as tmp:
+            tmp.write("code,sal\n")
+            tmp.write("1,2\n" * (INFER_ROWS + 10))
+            tmp.write("A1,123.5\n")
+            path = tmp.name
+
+        try:
+            # A late value that does not fit an inferred type widens the column
+            for workers in (None, 2):
+                loaded = DataKit.from_csv(path, workers=workers, categorize=False)
+                self.assertEqual(loaded.get_column("sal").dtype, "float64")
+                self.assertEqual(loaded.get_column("sal")[-2:], [2.0, 123.5])
+                self.assertEqual(loaded.get_column("code").dtype, "object")
+                self.assertEqual(loaded.get_column("code")[-2:], [1, "A1"])
+            batches = list(DataKit.iter_csv_batches(path, batch_size=INFER_ROWS))
+            self.assertEqual([batch.get_column("sal").dtype for batch in batches], ["int64", "float64"])
+
+            # A type the caller named is a contract
+            with self.assertRaises(ValueError) as raised:
+                DataKit.from_csv(path, dtypes={"sal": "int64"})
+            self.assertIn(f"row {INFER_ROWS + 10}", str(raised.exception))
+            self.assertEqual(DataKit.from_csv(path, dtypes={"code": "object"}).get_column("code")[-1], "A1")
+        finally:
+            os.remove(path)
+
+    def test_split_csv_ranges(self):
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', newline="") as tmp:
+            tmp.write('a,b\n1,"x\ny\nz"\n2,"p\nq"\n3,r\n')
+            path = tmp.name
+
+        try:
+            data_start, ranges = split_csv_ranges(path, 8)
+            self.assertEqual(data_start, 4)
+            self.assertEqual(ranges[0][0], data_start)
+            self.assertEqual(ranges[-1][1], os.path.getsize(path))
+            rows = [row for start, end in ranges for row in read_csv_range(path, start, end, n_cols=2)]
+            self.assertEqual(rows, [[1, "x\ny\nz"], [2, "p\nq"], [3, "r"]])
+        finally:
+            os.remove(path)
+
+    def test_open_csv_mmap(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            index_path = path + ".idx"
+            text = ["two\nlines" if i % 4 == 0 else "row " + str(i) for i in range(50)]
+            DataKit.from_columns({"id": list(range(50)), "text": text}).to_csv(path)
+
+            with DataKit.open_csv(path, index_path=index_path) as mapped:
+                self.assertEqual(len(mapped), 50)
+                self.assertEqual(mapped.columns, ["id", "text"])
+                self.assertEqual(mapped.get_row(8), {"id": 8, "text": "two\nlines"})
+                self.assertEqual(mapped.head(3).get_column("id"), [0, 1, 2])
+                self.assertEqual(mapped.tail(2).get_column("text"), ["two\nlines", "row 49"])
+                self.assertEqual(len(list(mapped.iter_rows(max_amount=10))), 10)
+                self.assertFalse(mapped.is_loaded)
+
+                # Any other operation loads the table once
+                self.assertEqual(mapped.get_column("id"), list(range(50)))
+                self.assertTrue(mapped.is_loaded)
+
+            self.assertTrue(os.path.exists(index_path))
+            with DataKit.open_csv(path, index_path=index_path) as reopened:
+                self.assertEqual(reopened.get_row(49)["text"], "row 49")
+
+            # Column types match from_csv, including category columns
+            kinds = DataKit.from_columns({"id": list(range(50)), "kind": ["a", "b"] * 25})
+            kinds_path = os.path.join(tmp_dir, "kinds.csv")
+            kinds.to_csv(kinds_path)
+            eager = DataKit.from_csv(kinds_path)
+            with DataKit.open_csv(kinds_path) as mapped:
+                self.assertEqual(mapped.head(2).get_column("kind").dtype, "category")
+                self.assertEqual([c.dtype for c in mapped._data], [c.dtype for c in eager._data])
+
+            # A kit that is never closed releases its file once collected
+            unclosed = DataKit.open_csv(kinds_path)
+            file = unclosed._file
+            del unclosed
+            gc.collect()
+            self.assertTrue(file.closed)
+
+    def test_parse_csv_line(self):
+        self.assertEqual(parse_csv_line("a, b ,c"), ["a", "b", "c"])
+        self.assertEqual(parse_csv_line('1,"x, y",z'), ["1", "x, y", "z"])
+        self.assertEqual(parse_csv_line('"a ""quoted"" word",2'), ['a "quoted" word', "2"])
+        self.assertEqual(parse_csv_line('a;"b;c"', delimiter=";"), ["a", "b;c"])
+        self.assertEqual(parse_csv_line(""), [""])
+
+    def test_csv_batches(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as tmp:
+            path = tmp.name
+
+        try:
+            DataKit.from_columns({"n": list(range(10)), "s": [str(i) + "x" for i in range(10)]}).to_csv(path)
+            batches = list(DataKit.iter_csv_batches(path, batch_size=4))
+            self.assertEqual([len(b) for b in batches], [4, 4, 2])
+            self.assertEqual(batches[1].get_column("n"), [4, 5, 6, 7])
+            self.assertEqual(batches[0].columns, ["n", "s"])
+
+            merged = DataKit.concat(batches)
+            self.assertEqual(len(merged), 10)
+            self.assertEqual(merged.get_column("n"), list(range(10)))
+            self.assertEqual(len(batches[0]), 4)
+        finally:
+            os.remove(path)
+
+    def test_write_to_file_objects(self):
+        text_out = io.StringIO()
+        self.data.to_csv(text_out)
+        self.assertEqual(text_out.getvalue(), "col1,col2\n1,x\n2,y\n")
+
+        binary_out = io.BytesIO()
+        self.data.to_json(binary_out, indent=0)
+        self.assertEqual(binary_out.getvalue(), b'[{"col1": 1, "col2": "x"}, {"col1": 2, "col2": "y"}]')
+        self.assertFalse(binary_out.closed)
+
+        toon_out = io.StringIO()
+        self.data.to_toon(toon_out)
+        self.assertEqual(toon_out.getvalue(), "[2]{col1,col2}:\n  1,x\n  2,y")
+
+    def test_scan_csv_pushdown(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as tmp:
+            path = tmp.name
+
+        try:
+            DataKit.from_columns({
+                "id": list(range(20)),
+                "price": [i * 10 for i in range(20)],
+                "note": ["n" + str(i) for i in range(20)],
+            }).to_csv(path)
+
+            plan = DataKit.scan_csv(path).select(["id", "price"]).filter(lambda r: r["price"] > 100).head(3)
+            explained = plan.explain()
+            self.assertIn("== Optimized plan ==", explained)
+            self.assertIn("columns=['id', 'price'] filters=[<lambda>]", explained)
+
+            result = plan.collect()
+            self.assertEqual(result.columns, ["id", "price"])
+            self.assertEqual(result.get_column("id"), [11, 12, 13])
+
+            out = io.StringIO()
+            DataKit.scan_csv(path).filter(lambda r: r["id"] < 2).select(["note"]).to_csv(out)
+            self.assertEqual(out.getvalue(), "note\nn0\nn1\n")
+
+            # Expressions name the columns they read, so the unused 'note' column is never parsed
+            expr_plan = DataKit.scan_csv(path).filter(col("price") >= 180).select(["id"])
+            self.assertIn("columns=['id', 'price'] filters=[(col('price') >= 180)]", expr_plan.explain())
+            self.assertEqual(expr_plan.collect().get_column("id"), [18, 19])
+
+            in_memory = DataKit.from_csv(path).lazy().filter(lambda r: r["id"] % 5 == 0).select(["id"])
+            self.assertEqual(in_memory.collect().get_column("id"), [0, 5, 10, 15])
+
+            # A row function after a select sees the selected columns only, as in eager code
+            seen = []
+            DataKit.scan_csv(path).filter(col("price") > 0).select(["id"]).filter(lambda r: seen.append(sorted(r)) or True).collect()
+            self.assertEqual(seen[0], ["id"])
+            filtered = DataKit.scan_csv(path).select(["id", "note"]).filter(lambda r: r["id"] < 2).select(["note"])
+            self.assertEqual(filtered.collect().get_column("note"), ["n0", "n1"])
+
+            # A filter cannot read a column that an earlier select dropped, lazily or not
+            with self.assertRaisesRegex(KeyError, "Unknown column 'price'"):
+                DataKit.from_csv(path).select(["id"]).filter(col("price") > 10)
+            with self.assertRaisesRegex(KeyError, "Unknown column 'price'"):
+                DataKit.scan_csv(path).select(["id"]).filter(col("price") > 10).collect()
+        finally:
+            os.remove(path)
+
     def test_json_io(self):
         with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json') as tmp:
             path = tmp.name
@@ -35,6 +301,27 @@ class TestDataKitIO(unittest.TestCase):
         finally:
             os.remove(path)
 
+    def test_json_streaming(self):
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as tmp:
+            tmp.write('{"meta": {"source": "export", "rows": 5}, "data": [')
+            tmp.write(", ".join('{"id": %d, "name": "n%d", "score": %d.5}' % (i, i, i) for i in range(5)))
+            tmp.write("]}")
+            path = tmp.name
+
+        try:
+            records = list(iter_json(path, buffer_size=8))
+            self.assertEqual(len(records), 5)
+            self.assertEqual(records[3], {"id": 3, "name": "n3", "score": 3.5})
+
+            batches = list(DataKit.iter_json_batches(path, batch_size=2))
+            self.assertEqual([len(b) for b in batches], [2, 2, 1])
+
+            loaded = DataKit.from_json(path)
+            self.assertEqual(loaded.columns, ["id", "name", "score"])
+            self.assertEqual(loaded.get_column("score"), [0.5, 1.5, 2.5, 3.5, 4.5])
+        finally:
+            os.remove(path)
+
     def test_toon_io(self):
         with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.toon') as tmp:
             path = tmp.name
@@ -46,8 +333,204 @@ class TestDataKitIO(unittest.TestCase):
             self.assertEqual(loaded.columns, ["col1", "col2"])
             self.assertEqual(loaded.get_column("col1"), [1, 2])
             self.assertEqual(loaded.get_column("col2"), ["x", "y"])
+
+            with open(path, "w") as f:
+                f.write("[3]{id,zip,score}:\n  1,007,null\n  2,010,2.5\n  3,123")
+            loaded = DataKit.from_toon(path, dtypes={"zip": "object"})
+            self.assertEqual(loaded.get_column("zip"), ["007", "010", "123"])
+            self.assertEqual(loaded.get_column("score"), [None, 2.5, None])
+            self.assertEqual(loaded.get_column("id").dtype, "int64")
+        finally:
+            os.remove(path)
+
+    def test_dapo_io(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.dapo') as tmp:
+            path = tmp.name
+
+        try:
+            n = 250
+            dk = DataKit.from_columns({
+                "id": list(range(n)),
+                "score": [float("nan") if i % 7 == 0 else i / 4 for i in range(n)],
+                "flag": [i % 2 == 0 for i in range(n)],
+                "country": DataColumn([["UK", "US", None][i % 3] for i in range(n)], dtype="category"),
+                "note": [["a", 1, None, 2.5, True, 2 ** 70][i % 6] for i in range(n)],
+                # Nulls in the second and third chunks only
+                "units": [None if i >= 100 and i % 5 == 0 else i for i in range(n)],
+            })
+            for compression in (None, "zlib", "lzma", {"note": "zlib"}):
+                dk.to_dapo(path, compression=compression, chunk_rows=100)
+                loaded = DataKit.from_dapo(path)
+                self.assertEqual(loaded.columns, dk.columns)
+                for name in dk.columns:
+                    self.assertEqual(loaded.get_column(name).dtype, dk.get_column(name).dtype)
+                    self.assertEqual(repr(loaded.get_column(name).to_list()), repr(dk.get_column(name).to_list()))
+
+            projected = DataKit.from_dapo(path, columns=["country", "id"])
+            self.assertEqual(projected.columns, ["country", "id"])
+            self.assertEqual(projected.get_column("country").categories, ["UK", "US", None])
+            units = DataKit.from_dapo(path, where=col("units") > 240).get_column("units")
+            self.assertEqual(units, [241, 242, 243, 244, 246, 247, 248, 249])
+            self.assertEqual(units.dtype, "int64")
+
+            DataKit().to_dapo(path)
+            self.assertEqual(DataKit.from_dapo(path).columns, [])
+        finally:
+            os.remove(path)
+
+    def test_dapo_chunk_pruning(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.dapo') as tmp:
+            path = tmp.name
+
+        try:
+            dk = DataKit.from_columns({"id": list(range(1000)), "half": ["low"] * 500 + ["high"] * 500})
+            dk.to_dapo(path, chunk_rows=100)
+
+            with DapoFile(path) as source:
+                self.assertEqual(source.chunks_matching((col("id") >= 250) & (col("id") < 420)), [2, 3, 4])
+                self.assertEqual(source.chunks_matching(col("id").isin([5, 999])), [0, 9])
+                self.assertEqual(source.chunks_matching((col("id") < 50) | (col("half") == "high")), [0, 5, 6, 7, 8, 9])
+                self.assertEqual(source.chunks_matching(col("id") != 5), list(range(10)))
+                self.assertEqual(source.chunks_matching(col("half") > 5), list(range(10)))
+
+            where = (col("id") >= 250) & (col("id") < 420)
+            loaded = DataKit.from_dapo(path, columns=["half"], where=where)
+            self.assertEqual(loaded.columns, ["half"])
+            self.assertEqual(len(loaded), 170)
         finally:
             os.remove(path)
 
+    def test_dapo_errors(self):
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.dapo') as tmp:
+            tmp.write("id\n1\n")
+            path = tmp.name
+
+        try:
+            with self.assertRaises(ValueError):
+                DataKit.from_dapo(path)
+            with self.assertRaises(ValueError):
+                self.data.to_dapo(path, compression="gzip")
+            with self.assertRaises(TypeError):
+                DataKit.from_columns({"pair": [(1, 2)]}).to_dapo(path)
+
+            self.data.to_dapo(path)
+            with self.assertRaises(KeyError):
+                DataKit.from_dapo(path, columns=["missing"])
+        finally:
+            os.remove(path)
+
+    def test_dataset(self):
+        dk = DataKit.from_columns({
+            "day": [1, 1, 2, 2, 3, None],
+            "country": ["FR", "DE", "FR", "FR", "DE", "FR"],
+            "amount": [1.5, 2.5, 3.5, 4.5, 5.5, 6.5],
+            "note": ["a b", "c/d", "e", "f", "g", "h"],
+        })
+        with tempfile.TemporaryDirectory() as root:
+            dk.to_dataset(root, partition_by=["country", "day"])
+            self.assertTrue(os.path.exists(os.path.join(root, "country=FR", "day=", "part-0.csv")))
+            with open(os.path.join(root, "_SUCCESS"), "w"):
+                pass
+
+            loaded = DataKit.from_dataset(root)
+            self.assertEqual(loaded.columns, ["amount", "note", "country", "day"])
+            self.assertEqual(loaded.get_column("day").dtype, "int64")
+            self.assertEqual(loaded.get_column("country").dtype, "category")
+            self.assertEqual(
+                sorted(zip(loaded.get_column("note"), loaded.get_column("country"), loaded.get_column("day"))),
+                sorted(zip(dk.get_column("note"), dk.get_column("country"), dk.get_column("day"))),
+            )
+            self.assertEqual(sorted(DataKit.from_dataset(root, dtypes={"day": "object"}).get_column("day").dropna()), ["1", "1", "2", "2", "3"])
+
+            # Files in pruned partitions are never opened
+            with open(os.path.join(root, "country=DE", "day=1", "part-0.csv"), "w") as f:
+                f.write("amount\nnot a number, too many fields\n")
+            with self.assertRaises(ValueError):
+                DataKit.from_dataset(root, dtypes={"amount": "float64"})
+            where = (col("country") == "FR") & (col("amount") > 2)
+            for workers in (None, 2):
+                pruned = DataKit.from_dataset(root, where=where, workers=workers)
+                self.assertEqual(sorted(pruned.get_column("amount")), [3.5, 4.5, 6.5])
+            self.assertEqual(len(DataKit.from_dataset(root, where=col("day").is_null() | (col("day") == 3))), 2)
+            self.assertEqual(len(DataKit.from_dataset(os.path.join(root, "country=FR", "*", "*.csv"))), 4)
+
+        # Partition keys read back with their types, even text that looks like a number or a bool
+        codes = DataKit.from_columns({"zip": ["007", "1", "true", None], "flag": [True, False, True, True], "n": [1, 2, 3, 4]})
+        with tempfile.TemporaryDirectory() as root:
+            codes.to_dataset(root, partition_by=["zip", "flag"])
+            loaded = DataKit.from_dataset(root).sort("n")
+            self.assertEqual(loaded.get_column("zip").to_list(), ["007", "1", "true", None])
+            self.assertEqual(loaded.get_column("flag").to_list(), [True, False, True, True])
+            self.assertEqual(DataKit.from_dataset(root, where=col("zip") == "1").get_column("n"), [2])
+            self.assertEqual(len(DataKit.from_dataset(root, where=col("zip") == 1)), 0)
+
+        with tempfile.TemporaryDirectory() as root:
+            dk.to_dataset(root, partition_by="country", format="json")
+            loaded = DataKit.from_dataset(root, where=col("country") == "DE")
+            self.assertEqual(loaded.get_column("note"), ["c/d", "g"])
+            self.assertEqual(loaded.get_column("day"), [1, 3])
+            with self.assertRaises(ValueError):
+                DataKit.from_dataset(root, dtypes={"note": "object"})
+
+        with tempfile.TemporaryDirectory() as root:
+            with self.assertRaises(ValueError):
+                dk.to_dataset(root, format="xlsx")
+            with self.assertRaises(KeyError):
+                dk.to_dataset(root, partition_by="missing")
+            with self.assertRaises(FileNotFoundError):
+                DataKit.from_dataset(os.path.join(root, "missing"))
+
+    def test_async_io(self):
+        n = 5000
+        dk = DataKit.from_columns({"id": list(range(n)), "name": [f"n{i % 7}" for i in range(n)]})
+
+        async def main(root):
+            path, json_path = os.path.join(root, "data.csv"), os.path.join(root, "data.json")
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.create_task(ticker())
+            await asyncio.sleep(0)
+            # The snapshot is written even though the kit changes before the write finishes
+            writing = asyncio.create_task(dk.ato_csv(path))
+            await asyncio.sleep(0)
+            dk.update_row(0, {"id": -1})
+            await writing
+            await dk.ato_json(json_path)
+            loaded = await DataKit.afrom_csv(path)
+            from_json = await DataKit.afrom_json(json_path)
+            batches = [batch async for batch in DataKit.aiter_csv(path, batch_size=2000)]
+
+            # Leaving the loop early closes the reader
+            async for batch in DataKit.aiter_csv(path, batch_size=100):
+                break
+            await asyncio.sleep(0.05)
+            task.cancel()
+            return ticks, loaded, from_json, batches
+
+        with tempfile.TemporaryDirectory() as root:
+            ticks, loaded, from_json, batches = asyncio.run(main(root))
+            self.assertEqual(loaded.get_column("id")[:2], [0, 1])
+            self.assertEqual(loaded.get_column("name"), dk.get_column("name"))
+            self.assertEqual(from_json.get_column("id")[:2], [-1, 1])
+            self.assertEqual([len(batch) for batch in batches], [2000, 2000, 1000])
+            self.assertEqual(DataKit.concat(batches).get_column("id"), loaded.get_column("id"))
+            self.assertGreater(ticks, 1)
+
+            async def broken():
+                with open(os.path.join(root, "bad.csv"), "w") as f:
+                    f.write("a\n1\nx\n")
+                return [batch async for batch in DataKit.aiter_csv(os.path.join(root, "bad.csv"), dtypes={"a": "int64"})]
+
+            with self.assertRaises(ValueError):
+                asyncio.run(broken())
+            with self.assertRaises(FileNotFoundError):
+                asyncio.run(DataKit.afrom_csv(os.path.join(root, "missing.csv")))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file